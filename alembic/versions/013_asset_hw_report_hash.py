@@ -0,0 +1,24 @@
+"""Add assets.hw_report_hash: hash of the last hardware agent report.
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "013"
+down_revision: Union[str, None] = "012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("assets", sa.Column("hw_report_hash", sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("assets", "hw_report_hash")
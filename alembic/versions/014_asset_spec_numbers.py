@@ -0,0 +1,113 @@
+"""Add numeric spec columns assets.ram_mb / disk_gb / diagonal_in with indexes and backfill them.
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-19
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "014"
+down_revision: Union[str, None] = "013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Сколько строк заполнять за один UPDATE (executemany)
+BACKFILL_BATCH = 5000
+
+# Разбор характеристик — замороженная копия app.utils.specs на момент миграции: дальнейшие правки
+# парсера не должны менять результат этой ревизии
+_AMOUNT_RE = re.compile(
+    r"(?<![a-zа-я\d.,])(?:(\d+)\s*[xх×*]\s*)?(\d+(?:[.,]\d+)?)\s*(тб|tb|т|t|гб|gb|г|g|мб|mb|м|m)?(?![a-zа-я])",
+    re.IGNORECASE,
+)
+_DIAGONAL_RE = re.compile(r"(\d+(?:[.,]\d+)?)")
+
+
+def _amount(text):
+    if not text:
+        return None
+    matches = list(_AMOUNT_RE.finditer(str(text)))
+    if not matches:
+        return None
+    m = next((x for x in matches if x.group(3)), matches[0])
+    value = float(m.group(2).replace(",", ".")) * int(m.group(1) or 1)
+    return value, (m.group(3) or "").lower()
+
+
+def _ram_mb(text):
+    amount = _amount(text)
+    if amount is None:
+        return None
+    value, unit = amount
+    if unit in ("тб", "tb", "т", "t"):
+        value *= 1024 * 1024
+    elif unit in ("гб", "gb", "г", "g") or (not unit and value <= 256):
+        value *= 1024
+    return round(value) or None
+
+
+def _disk_gb(text):
+    amount = _amount(text)
+    if amount is None:
+        return None
+    value, unit = amount
+    if unit in ("тб", "tb", "т", "t"):
+        value *= 1000
+    elif unit in ("мб", "mb", "м", "m"):
+        value /= 1000
+    return round(value) or None
+
+
+def _diagonal_in(text):
+    if not text:
+        return None
+    m = _DIAGONAL_RE.search(str(text))
+    if not m:
+        return None
+    value = float(m.group(1).replace(",", "."))
+    return round(value, 1) if 1 <= value <= 200 else None
+
+
+def _spec_numbers(row) -> dict:
+    return {
+        "ram_mb": _ram_mb(row["ram"]),
+        "disk_gb": _disk_gb(row["disk1_capacity"]),
+        "diagonal_in": _diagonal_in(row["screen_diagonal"]) or _diagonal_in(row["monitor_diagonal"]),
+    }
+
+
+def upgrade() -> None:
+    op.add_column("assets", sa.Column("ram_mb", sa.Integer(), nullable=True))
+    op.add_column("assets", sa.Column("disk_gb", sa.Integer(), nullable=True))
+    op.add_column("assets", sa.Column("diagonal_in", sa.Float(), nullable=True))
+
+    # Заполнение разбором, каким он был в приложении на момент миграции (см. _spec_numbers)
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT id, ram, disk1_capacity, screen_diagonal, monitor_diagonal FROM assets "
+        "WHERE ram IS NOT NULL OR disk1_capacity IS NOT NULL "
+        "OR screen_diagonal IS NOT NULL OR monitor_diagonal IS NOT NULL"
+    )).mappings().all()
+    stmt = sa.text("UPDATE assets SET ram_mb = :ram_mb, disk_gb = :disk_gb, diagonal_in = :diagonal_in WHERE id = :id")
+    params = [{"id": row["id"], **_spec_numbers(row)} for row in rows]
+    for i in range(0, len(params), BACKFILL_BATCH):
+        bind.execute(stmt, params[i:i + BACKFILL_BATCH])
+
+    op.create_index("ix_assets_ram_mb", "assets", ["ram_mb"])
+    op.create_index("ix_assets_disk_gb", "assets", ["disk_gb"])
+    op.create_index("ix_assets_diagonal_in", "assets", ["diagonal_in"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_assets_diagonal_in", table_name="assets")
+    op.drop_index("ix_assets_disk_gb", table_name="assets")
+    op.drop_index("ix_assets_ram_mb", table_name="assets")
+    with op.batch_alter_table("assets", schema=None) as batch_op:
+        batch_op.drop_column("diagonal_in")
+        batch_op.drop_column("disk_gb")
+        batch_op.drop_column("ram_mb")
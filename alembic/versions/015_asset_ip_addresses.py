@@ -0,0 +1,100 @@
+"""Add asset_ip_addresses: IP addresses from network_interfaces / network_card with an index for address and subnet lookups.
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-19
+
+"""
+import ipaddress
+import json
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "015"
+down_revision: Union[str, None] = "014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Сколько адресов вставлять за один INSERT (executemany)
+BACKFILL_BATCH = 5000
+
+# Разбор адресов — замороженная копия app.utils.ip_addresses на момент миграции: дальнейшие правки
+# парсера и подписей полей не должны менять результат этой ревизии
+_TOKEN_SPLIT_RE = re.compile(r"[\s,;]+")
+_NETWORK_CARD_LABEL = "IP адрес"
+
+
+def _ip_key(address) -> bytes:
+    if address.version == 4:
+        address = ipaddress.IPv6Address(b"\x00" * 10 + b"\xff\xff" + address.packed)
+    return address.packed
+
+
+def _parse_ip(value):
+    try:
+        return ipaddress.ip_address(str(value or "").strip())
+    except ValueError:
+        return None
+
+
+def _asset_ip_rows(network_interfaces, network_card) -> list[dict]:
+    rows: dict[bytes, dict] = {}
+
+    def add(address, label, iface_type):
+        key = _ip_key(address)
+        rows.setdefault(key, {"ip": str(address), "ip_bin": key, "label": label or None, "type": iface_type})
+
+    try:
+        interfaces = json.loads(network_interfaces) if network_interfaces else []
+    except ValueError:
+        interfaces = []
+    for iface in interfaces if isinstance(interfaces, list) else []:
+        if not isinstance(iface, dict):
+            continue
+        address = _parse_ip(iface.get("ip"))
+        if address is not None:
+            iface_type = "oob" if iface.get("type") == "oob" else "network"
+            add(address, str(iface.get("label") or "").strip(), iface_type)
+    for token in _TOKEN_SPLIT_RE.split(network_card or ""):
+        address = _parse_ip(token)
+        if address is not None:
+            add(address, _NETWORK_CARD_LABEL, "network")
+    return list(rows.values())
+
+
+def upgrade() -> None:
+    table = op.create_table(
+        "asset_ip_addresses",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("asset_id", sa.Integer(), sa.ForeignKey("assets.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("ip", sa.String(45), nullable=False),
+        sa.Column("ip_bin", sa.LargeBinary(16), nullable=False),
+        sa.Column("label", sa.String(128), nullable=True),
+        sa.Column("type", sa.String(16), nullable=False),
+    )
+
+    # Заполнение разбором, каким он был в приложении на момент миграции (см. _asset_ip_rows)
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT id, network_interfaces, network_card FROM assets "
+        "WHERE network_interfaces IS NOT NULL OR network_card IS NOT NULL"
+    )).mappings().all()
+    params = [
+        {"asset_id": row["id"], **ip_row}
+        for row in rows
+        for ip_row in _asset_ip_rows(row["network_interfaces"], row["network_card"])
+    ]
+    for i in range(0, len(params), BACKFILL_BATCH):
+        bind.execute(table.insert(), params[i:i + BACKFILL_BATCH])
+
+    op.create_index("ix_asset_ip_addresses_asset_id", "asset_ip_addresses", ["asset_id"])
+    op.create_index("ix_asset_ip_addresses_ip_bin", "asset_ip_addresses", ["ip_bin", "asset_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_asset_ip_addresses_ip_bin", table_name="asset_ip_addresses")
+    op.drop_index("ix_asset_ip_addresses_asset_id", table_name="asset_ip_addresses")
+    op.drop_table("asset_ip_addresses")
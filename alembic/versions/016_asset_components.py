@@ -0,0 +1,72 @@
+"""Add asset_components: extra components from assets.extra_components, one row each, indexed by type.
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-19
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "016"
+down_revision: Union[str, None] = "015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Сколько строк вставлять за один INSERT (executemany)
+BACKFILL_BATCH = 5000
+
+
+# Разбор устройств — замороженная копия app.utils.components на момент миграции: дальнейшие правки
+# разбора не должны менять результат этой ревизии
+def _component_rows(extra_components) -> list[dict]:
+    try:
+        items = json.loads(extra_components) if extra_components else []
+    except (TypeError, ValueError):
+        return []
+    rows = []
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        rows.append({
+            "position": len(rows),
+            "type": str(item.get("type") or "other").strip()[:32] or "other",
+            "name": str(item.get("name") or "").strip()[:256] or None,
+        })
+    return rows
+
+
+def upgrade() -> None:
+    table = op.create_table(
+        "asset_components",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("asset_id", sa.Integer(), sa.ForeignKey("assets.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("type", sa.String(32), nullable=False),
+        sa.Column("name", sa.String(256), nullable=True),
+    )
+
+    # Заполнение разбором, каким он был в приложении на момент миграции (см. _component_rows)
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT id, extra_components FROM assets WHERE extra_components IS NOT NULL"
+    )).mappings().all()
+    params = [
+        {"asset_id": row["id"], **component}
+        for row in rows
+        for component in _component_rows(row["extra_components"])
+    ]
+    for i in range(0, len(params), BACKFILL_BATCH):
+        bind.execute(table.insert(), params[i:i + BACKFILL_BATCH])
+
+    op.create_index("ix_asset_components_asset_id", "asset_components", ["asset_id"])
+    op.create_index("ix_asset_components_type", "asset_components", ["type", "asset_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_asset_components_type", table_name="asset_components")
+    op.drop_index("ix_asset_components_asset_id", table_name="asset_components")
+    op.drop_table("asset_components")
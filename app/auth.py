@@ -11,6 +11,7 @@ from app.models import User
 from app.models.user import UserRole
 
 serializer = URLSafeTimedSerializer(SECRET_KEY)
+SESSION_MAX_AGE = 86400 * 7  # 7 days
 
 
 def create_session_token(user_id: int) -> str:
@@ -19,7 +20,7 @@ def create_session_token(user_id: int) -> str:
 
 def load_session_token(token: str) -> dict | None:
     try:
-        return serializer.loads(token, max_age=86400 * 7)  # 7 days
+        return serializer.loads(token, max_age=SESSION_MAX_AGE)
     except BadSignature:
         return None
 
@@ -28,8 +29,14 @@ async def get_current_user(
     request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> User | None:
-    """Загружает пользователя из сессии. Возвращает None, если не авторизован."""
+    """
+    Загружает пользователя из сессии (cookie или заголовок Authorization: Bearer для JSON API).
+    Возвращает None, если не авторизован.
+    """
     token = request.cookies.get(SESSION_COOKIE_NAME)
+    if not token:
+        scheme, _, bearer = request.headers.get("authorization", "").partition(" ")
+        token = bearer.strip() if scheme.lower() == "bearer" else None
     if not token:
         return None
     data = load_session_token(token)
@@ -79,7 +86,7 @@ async def login_user(response: Response, user_id: int) -> None:
     response.set_cookie(
         SESSION_COOKIE_NAME,
         token,
-        max_age=86400 * 7,
+        max_age=SESSION_MAX_AGE,
         httponly=True,
         **_cookie_kwargs(),
     )
@@ -12,13 +12,43 @@ DATABASE_URL = os.getenv("DATABASE_URL", _default_url)
 # Sync URL for Alembic (SQLite)
 SYNC_DATABASE_URL = DATABASE_URL.replace("+aiosqlite", "").replace("+asyncpg", "")
 
+# SQLite: сколько миллисекунд ждать снятия блокировки записи (важно при нескольких воркерах)
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+# Число процессов-воркеров uvicorn (scripts/docker_entrypoint.sh); приложение учитывает его для общих данных
+UVICORN_WORKERS = int(os.getenv("UVICORN_WORKERS", "1"))
+
 SECRET_KEY = os.getenv("SECRET_KEY", "change-me-in-production-secret-key-32chars")
 SESSION_COOKIE_NAME = "session"
 CSRF_COOKIE_NAME = "csrf_token"
 # Для HTTPS: установить SECURE_COOKIES=true, чтобы cookie отправлялись только по HTTPS
 SECURE_COOKIES = os.getenv("SECURE_COOKIES", "false").lower() in ("true", "1", "yes")
 INACTIVE_DAYS_THRESHOLD = int(os.getenv("INACTIVE_DAYS_THRESHOLD", "30"))
+# HTTP-кэш страниц: ETag страниц с расчётом «сколько дней назад» (неактивность, возраст техники)
+# меняется не реже, чем раз в столько секунд, даже если данные не менялись
+PAGE_CACHE_TIME_BUCKET = int(os.getenv("PAGE_CACHE_TIME_BUCKET", "300"))
+# Кэш отрендеренных таблиц (список техники, отчёты) в памяти процесса, МБ; 0 — выключен
+FRAGMENT_CACHE_MB = int(os.getenv("FRAGMENT_CACHE_MB", "32"))
+# Токен для сбора метрик (/metrics) системой мониторинга: заголовок Authorization: Bearer <токен>.
+# Без токена метрики доступны только администратору (по сессии).
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+# Токен агентов на устройствах (heartbeat, отчёты об оборудовании): заголовок Authorization: Bearer <токен>.
+# Без токена эти эндпоинты доступны только пользователям с ролью admin/user (по сессии).
+AGENT_TOKEN = os.getenv("AGENT_TOKEN", "")
+# Heartbeat: как часто (с) накопленные в памяти отметки пишутся в last_seen_at и максимум отметок в запросе
+HEARTBEAT_FLUSH_INTERVAL = float(os.getenv("HEARTBEAT_FLUSH_INTERVAL", "5"))
+HEARTBEAT_MAX_BATCH = int(os.getenv("HEARTBEAT_MAX_BATCH", "10000"))
+# Максимум отчётов об оборудовании в одном запросе агента
+HW_REPORT_MAX_BATCH = int(os.getenv("HW_REPORT_MAX_BATCH", "2000"))
+# Профилировщик SQL для разработки (app.query_profiler): медленные запросы и повторы одного запроса (N+1)
+SQL_PROFILE = os.getenv("SQL_PROFILE", "false").lower() in ("true", "1", "yes")
+SLOW_QUERY_MS = int(os.getenv("SLOW_QUERY_MS", "200"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
 
+# Статические файлы (/static); vendor/ — локальные копии Bootstrap, Chart.js, jsQR (scripts.build_static)
+STATIC_DIR = BASE_DIR / "static"
+# Сжатие ответов gzip: минимальный размер тела в байтах и уровень сжатия (1–9)
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", "6"))
 # Папка для загруженных аватарок (относительно BASE_DIR)
 AVATAR_DIR = BASE_DIR / "data" / "avatars"
 ALLOWED_AVATAR_EXTENSIONS = {"jpg", "jpeg", "png", "gif", "webp"}
@@ -27,13 +57,39 @@ MAX_AVATAR_SIZE_MB = 5
 # Максимальный размер файла импорта оборудования (Excel), МБ
 MAX_IMPORT_SIZE_MB = int(os.getenv("MAX_IMPORT_SIZE_MB", "20"))
 
-# Папка для сгенерированных QR-кодов оборудования
+# Папка QR-кодов, сгенерированных старыми версиями (теперь QR рендерятся на лету и на диск не пишутся)
 QR_DIR = BASE_DIR / "data" / "qrcodes"
+# Сколько отрендеренных QR-изображений держать в памяти (LRU)
+QR_CACHE_SIZE = int(os.getenv("QR_CACHE_SIZE", "4096"))
+
+# Листы QR-этикеток (PDF, A4): сетка этикеток на странице и лимит этикеток за один запрос
+QR_LABEL_COLUMNS = int(os.getenv("QR_LABEL_COLUMNS", "3"))
+QR_LABEL_ROWS = int(os.getenv("QR_LABEL_ROWS", "7"))
+MAX_QR_LABELS = int(os.getenv("MAX_QR_LABELS", "5000"))
+
+# Число процессов для CPU-тяжёлых задач (рендер QR, разбор файлов импорта); 0 — по числу ядер
+PROCESS_POOL_WORKERS = int(os.getenv("PROCESS_POOL_WORKERS", "0"))
 
-# Папка для бекапов (БД + аватарки + QR)
+# Папка для бекапов (БД + аватарки)
 DATA_DIR = BASE_DIR / "data"
 BACKUP_DIR = BASE_DIR / "data" / "backups"
 DB_PATH = DATA_DIR / "app.db"
+# Снимок БД для бекапа копируется порциями по столько страниц SQLite (между порциями запись не блокируется)
+BACKUP_STEP_PAGES = int(os.getenv("BACKUP_STEP_PAGES", "1024"))
+# Бекапы по расписанию: cron из 5 полей (например "0 3 * * *" — каждый день в 3:00); пусто — выключено
+BACKUP_SCHEDULE = os.getenv("BACKUP_SCHEDULE", "")
+# Вид планового бекапа: incremental или full (zip)
+BACKUP_SCHEDULE_KIND = os.getenv("BACKUP_SCHEDULE_KIND", "incremental")
+# Ретенция GFS плановых бекапов (ручные не удаляются): сколько последних дней / недель / месяцев хранить (по одному бекапу)
+BACKUP_KEEP_DAILY = int(os.getenv("BACKUP_KEEP_DAILY", "7"))
+BACKUP_KEEP_WEEKLY = int(os.getenv("BACKUP_KEEP_WEEKLY", "4"))
+BACKUP_KEEP_MONTHLY = int(os.getenv("BACKUP_KEEP_MONTHLY", "12"))
+# Максимальный размер архива, загружаемого для восстановления, МБ (больше — 413)
+MAX_RESTORE_UPLOAD_MB = int(os.getenv("MAX_RESTORE_UPLOAD_MB", "2048"))
+# Максимальный объём распакованных из zip app.db и avatars/ при восстановлении, МБ (защита от zip-бомб)
+MAX_RESTORE_UNPACKED_MB = int(os.getenv("MAX_RESTORE_UNPACKED_MB", "10240"))
+# Сколько секунд ждать завершения активных запросов перед подменой файла БД при восстановлении
+DB_DRAIN_TIMEOUT = int(os.getenv("DB_DRAIN_TIMEOUT", "30"))
 
 # Часовой пояс для отображения дат/времени в интерфейсе (история изменений, перемещения и т.д.)
 # Значения в БД хранятся в UTC; при выводе конвертируются в эту зону.
@@ -149,6 +149,7 @@ HTTP_STATUS_TO_CODE = {
     401: "unauthorized",
     403: "forbidden",
     404: "not_found",
+    413: "payload_too_large",
     422: "validation_error",
     500: "server_error",
 }
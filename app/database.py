@@ -1,13 +1,35 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
-from app.config import DATABASE_URL
+from app.config import DATABASE_URL, DB_DRAIN_TIMEOUT, SQLITE_BUSY_TIMEOUT_MS, UVICORN_WORKERS
+from app.utils.file_lock import shared_path
 
 engine = create_async_engine(
     DATABASE_URL,
     echo=False,
 )
 
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, connection_record):
+        """
+        WAL: читатели не блокируют писателя (несколько воркеров на одной БД);
+        busy_timeout: при занятой записи ждать, а не сразу отвечать «database is locked».
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -21,14 +43,91 @@ class Base(DeclarativeBase):
     pass
 
 
+# Число открытых сессий get_db и флаг паузы: пока идёт подмена файла БД, новые сессии ждут
+_active_sessions = 0
+_paused = False
+# Сколько из них открыто текущим запросом (задачей): их drained_connections не ждёт — иначе ждал бы сам себя
+_request_sessions: ContextVar[int] = ContextVar("request_sessions", default=0)
+_POLL_INTERVAL = 0.05
+
+# Маркер «поколения» файла БД: меняется после восстановления/очистки, чтобы остальные воркеры
+# закрыли соединения со старым файлом перед следующим запросом
+_GENERATION_FILE = shared_path("db.generation")
+_seen_generation: int | None = None
+
+
+def read_db_generation() -> int:
+    """Текущее поколение файла БД (mtime маркера в нс; 0 — БД не подменялась)."""
+    try:
+        return _GENERATION_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def bump_db_generation() -> None:
+    """Отмечает, что файл БД заменён (вызывается после восстановления или очистки)."""
+    global _seen_generation
+    _GENERATION_FILE.write_text(str(time.time_ns()))
+    _seen_generation = read_db_generation()
+
+
+async def _sync_db_generation() -> None:
+    global _seen_generation
+    generation = read_db_generation()
+    if _seen_generation is None:
+        _seen_generation = generation
+    elif generation != _seen_generation:
+        _seen_generation = generation
+        await engine.dispose()
+
+
 async def get_db():
     """Сессия БД на один запрос. В конце запроса выполняется commit(), при ошибке — rollback()."""
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-            await session.commit()
-        except Exception:
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
+    global _active_sessions
+    while _paused:
+        await asyncio.sleep(_POLL_INTERVAL)
+    await _sync_db_generation()
+    _active_sessions += 1
+    _request_sessions.set(_request_sessions.get() + 1)
+    try:
+        async with AsyncSessionLocal() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+            finally:
+                await session.close()
+    finally:
+        _active_sessions -= 1
+        _request_sessions.set(_request_sessions.get() - 1)
+
+
+@asynccontextmanager
+async def drained_connections(timeout: float = DB_DRAIN_TIMEOUT):
+    """
+    Освобождает файл БД на время обслуживания (восстановление, очистка): новые сессии ставятся
+    на паузу, текущие дорабатывают (кроме сессий самого вызывающего запроса — их вызывающий закрывает сам),
+    затем пул соединений закрывается. После выхода из блока выдача сессий возобновляется.
+    Пауза действует только в своём процессе: при нескольких воркерах другие держат открытые соединения
+    к старому файлу и пишут в него во время подмены — поэтому обслуживание запрещено (RuntimeError).
+    """
+    global _paused
+    if UVICORN_WORKERS > 1:
+        raise RuntimeError("Обслуживание БД недоступно при нескольких воркерах (UVICORN_WORKERS > 1)")
+    if _paused:
+        raise RuntimeError("Обслуживание БД уже выполняется")
+    _paused = True
+    try:
+        deadline = time.monotonic() + timeout
+        own_sessions = _request_sessions.get()
+        while _active_sessions > own_sessions:
+            if time.monotonic() > deadline:
+                raise TimeoutError("Не дождались завершения активных запросов к БД")
+            await asyncio.sleep(_POLL_INTERVAL)
+        await engine.dispose()
+        yield
+        bump_db_generation()
+    finally:
+        _paused = False
@@ -1,40 +1,121 @@
+import asyncio
+import time
 from contextlib import asynccontextmanager
-from pathlib import Path
 
 from fastapi import FastAPI, Request
 from fastapi.responses import RedirectResponse
-from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import HTTPException
 
+from app import metrics, query_profiler
+from app.config import SQL_PROFILE, STATIC_DIR, UVICORN_WORKERS
 from app.database import engine, Base, get_db
-from app.templates_ctx import _request_ctx
+from app.templates_ctx import _request_ctx, templates
 from app.constants import TIMEZONE_OPTIONS
+from app.utils.compression import CompressionMiddleware
+from app.utils.process_pool import shutdown_process_pool
+from app.utils.static_files import FingerprintedStaticFiles
+from app.services.backup_scheduler import start_backup_scheduler, stop_backup_scheduler
+from app.services import heartbeat_service
 from app.routers import (
     auth_router,
     dashboard_router,
     assets,
     assets_events,
+    assets_bulk,
     qr,
     movements_router,
     inventory_router,
     reports_router,
     admin_router,
     companies_router,
+    metrics_router,
+    api_v1,
 )
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Создание каталогов data, avatars, qrcodes, backups при старте."""
-    from app.config import BASE_DIR, AVATAR_DIR, QR_DIR, BACKUP_DIR
+    """
+    Создание каталогов data, avatars, backups, запуск планировщика бекапов, сброса heartbeat в БД и
+    (при нескольких воркерах) сброса метрик в общий каталог при старте; остановка фоновых задач
+    и пула процессов при завершении.
+    """
+    from app.config import BASE_DIR, AVATAR_DIR, BACKUP_DIR
     (BASE_DIR / "data").mkdir(parents=True, exist_ok=True)
     AVATAR_DIR.mkdir(parents=True, exist_ok=True)
-    QR_DIR.mkdir(parents=True, exist_ok=True)
     BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+    scheduler = start_backup_scheduler()
+    metrics_flush = asyncio.create_task(metrics.flush_loop()) if UVICORN_WORKERS > 1 else None
+    heartbeat_flush = asyncio.create_task(heartbeat_service.flush_loop())
     yield
+    heartbeat_flush.cancel()
+    await asyncio.gather(heartbeat_flush, return_exceptions=True)
+    if metrics_flush is not None:
+        metrics_flush.cancel()
+        try:
+            await metrics_flush
+        except asyncio.CancelledError:
+            pass
+    await stop_backup_scheduler(scheduler)
+    shutdown_process_pool()
 
 
 app = FastAPI(title="Asset Management", lifespan=lifespan)
+# Сжатие — самый внутренний слой: метрики учитывают размер ответа после сжатия
+app.add_middleware(CompressionMiddleware)
+
+metrics.install_db_hooks(engine.sync_engine)
+metrics.instrument_templates(templates)
+
+
+def _route_label(request: Request) -> str:
+    """Шаблон пути маршрута (/assets/{asset_id}), чтобы метрики не дробились по id."""
+    route = request.scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    if request.url.path.startswith("/static/"):
+        return "/static"
+    return "unmatched"
+
+
+@app.middleware("http")
+async def collect_metrics(request: Request, call_next):
+    """Латентность, SQL-запросы, рендер шаблонов и размер ответа по маршрутам (app.metrics)."""
+    stats = metrics.start_request()
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except Exception:
+        metrics.record_request(request.method, _route_label(request), 500, time.perf_counter() - started, stats, 0)
+        raise
+    body = response.body_iterator
+    label = _route_label(request)
+
+    async def counted_body():
+        size = 0
+        try:
+            async for chunk in body:
+                size += len(chunk)
+                yield chunk
+        finally:
+            metrics.record_request(
+                request.method, label, response.status_code, time.perf_counter() - started, stats, size,
+            )
+
+    response.body_iterator = counted_body()
+    return response
+
+
+if SQL_PROFILE:
+    query_profiler.attach(engine.sync_engine)
+
+    @app.middleware("http")
+    async def profile_queries(request: Request, call_next):
+        """Режим разработки: предупреждение в лог о повторяющихся SQL-запросах (N+1) за один запрос."""
+        with query_profiler.trace_queries() as trace:
+            response = await call_next(request)
+        query_profiler.log_repeated(trace, f"{request.method} {_route_label(request)}")
+        return response
 
 
 @app.middleware("http")
@@ -105,16 +186,18 @@ app.include_router(auth_router.router)
 app.include_router(dashboard_router.router)
 app.include_router(assets.router)
 app.include_router(assets_events.router)
+app.include_router(assets_bulk.router)
 app.include_router(qr.router)
 app.include_router(movements_router.router)
 app.include_router(inventory_router.router)
 app.include_router(companies_router.router)
 app.include_router(reports_router.router)
 app.include_router(admin_router.router)
+app.include_router(metrics_router.router)
+app.include_router(api_v1.router)
 
-static_dir = Path(__file__).resolve().parent.parent / "static"
-if static_dir.exists():
-    app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
+if STATIC_DIR.exists():
+    app.mount("/static", FingerprintedStaticFiles(directory=str(STATIC_DIR)), name="static")
 
 
 @app.get("/favicon.ico", include_in_schema=False)
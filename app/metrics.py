@@ -0,0 +1,271 @@
+"""
+Метрики производительности по запросам: латентность по маршрутам (гистограмма), число и время
+SQL-запросов (события SQLAlchemy before/after_cursor_execute), время рендера шаблонов, размер ответа.
+Данные собираются в памяти процесса; отдаются в формате Prometheus (/metrics) и на странице админки.
+При нескольких воркерах каждый периодически сбрасывает свои метрики в общий каталог (flush_loop),
+а /metrics и страница админки суммируют данные всех живых воркеров.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+
+from app.config import UVICORN_WORKERS
+from app.utils.file_lock import shared_path
+
+# Границы корзин гистограммы латентности, секунды
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Как часто воркер сбрасывает свои метрики в общий каталог (режим нескольких воркеров), секунды
+FLUSH_INTERVAL = 5
+_SHARED_DIR = shared_path("metrics")
+_RESET_FILE = _SHARED_DIR / "reset"
+
+
+@dataclass
+class RequestStats:
+    """Счётчики одного запроса (живут в contextvar на время его обработки)."""
+    db_queries: int = 0
+    db_time: float = 0.0
+    template_time: float = 0.0
+
+
+@dataclass
+class RouteStats:
+    """Накопленные метрики одного маршрута (метод + шаблон пути)."""
+    count: int = 0
+    latency_sum: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * len(LATENCY_BUCKETS))
+    db_queries: int = 0
+    db_queries_max: int = 0
+    db_time: float = 0.0
+    template_time: float = 0.0
+    response_bytes: int = 0
+    errors: int = 0
+
+    def quantile(self, q: float) -> float | None:
+        """Оценка квантиля латентности по гистограмме (верхняя граница корзины)."""
+        if not self.count:
+            return None
+        target = q * self.count
+        for bound, n in zip(LATENCY_BUCKETS, self.buckets):
+            if n >= target:
+                return bound
+        return float("inf")
+
+
+_current: contextvars.ContextVar[RequestStats | None] = contextvars.ContextVar("request_stats", default=None)
+_routes: dict[tuple[str, str], RouteStats] = {}
+_lock = threading.Lock()
+
+
+def start_request() -> RequestStats:
+    """Начинает сбор метрик текущего запроса."""
+    stats = RequestStats()
+    _current.set(stats)
+    return stats
+
+
+def current_request_stats() -> RequestStats | None:
+    return _current.get()
+
+
+def record_request(method: str, route: str, status_code: int, duration: float,
+                   stats: RequestStats, response_bytes: int) -> None:
+    """Добавляет завершённый запрос в метрики маршрута."""
+    with _lock:
+        rs = _routes.setdefault((method, route), RouteStats())
+        rs.count += 1
+        rs.latency_sum += duration
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if duration <= bound:
+                rs.buckets[i] += 1
+        rs.db_queries += stats.db_queries
+        rs.db_queries_max = max(rs.db_queries_max, stats.db_queries)
+        rs.db_time += stats.db_time
+        rs.template_time += stats.template_time
+        rs.response_bytes += response_bytes
+        if status_code >= 500:
+            rs.errors += 1
+
+
+def snapshot() -> dict[tuple[str, str], RouteStats]:
+    """Копия накопленных метрик {(метод, маршрут): RouteStats}."""
+    with _lock:
+        return {
+            key: RouteStats(**{**rs.__dict__, "buckets": list(rs.buckets)})
+            for key, rs in _routes.items()
+        }
+
+
+def _clear() -> None:
+    with _lock:
+        _routes.clear()
+
+
+_last_reset = 0
+
+
+def reset() -> None:
+    """Сбрасывает метрики (при нескольких воркерах — во всех, при их следующем сбросе в каталог)."""
+    global _last_reset
+    _clear()
+    if UVICORN_WORKERS > 1:
+        _SHARED_DIR.mkdir(exist_ok=True)
+        _RESET_FILE.write_text(str(time.time_ns()))
+        _last_reset = _RESET_FILE.stat().st_mtime_ns
+        for f in _SHARED_DIR.glob("*.json"):
+            f.unlink(missing_ok=True)
+
+
+def _merge(target: dict[tuple[str, str], RouteStats], source: dict[tuple[str, str], RouteStats]) -> None:
+    for key, rs in source.items():
+        acc = target.setdefault(key, RouteStats())
+        acc.count += rs.count
+        acc.latency_sum += rs.latency_sum
+        acc.buckets = [a + b for a, b in zip(acc.buckets, rs.buckets)]
+        acc.db_queries += rs.db_queries
+        acc.db_queries_max = max(acc.db_queries_max, rs.db_queries_max)
+        acc.db_time += rs.db_time
+        acc.template_time += rs.template_time
+        acc.response_bytes += rs.response_bytes
+        acc.errors += rs.errors
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def dump_worker_snapshot() -> None:
+    """Записывает метрики этого воркера в общий каталог (<pid>.json); учитывает общий сброс."""
+    global _last_reset
+    _SHARED_DIR.mkdir(exist_ok=True)
+    try:
+        reset_at = _RESET_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        reset_at = 0
+    if reset_at > _last_reset:
+        _last_reset = reset_at
+        _clear()
+    data = [[method, route, rs.__dict__] for (method, route), rs in snapshot().items()]
+    path = _SHARED_DIR / f"{os.getpid()}.json"
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def merged_snapshot() -> dict[tuple[str, str], RouteStats]:
+    """Метрики всех воркеров: свои — из памяти, чужие — из общего каталога (файлы умерших удаляются)."""
+    result = snapshot()
+    if UVICORN_WORKERS <= 1 or not _SHARED_DIR.exists():
+        return result
+    for f in _SHARED_DIR.glob("*.json"):
+        pid = int(f.stem)
+        if pid == os.getpid():
+            continue
+        if not _pid_alive(pid):
+            f.unlink(missing_ok=True)
+            continue
+        try:
+            raw = json.loads(f.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        _merge(result, {(method, route): RouteStats(**fields) for method, route, fields in raw})
+    return result
+
+
+async def flush_loop() -> None:
+    """Фоновая задача воркера (из main.lifespan при UVICORN_WORKERS > 1)."""
+    try:
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            await asyncio.to_thread(dump_worker_snapshot)
+    finally:
+        (_SHARED_DIR / f"{os.getpid()}.json").unlink(missing_ok=True)
+
+
+def install_db_hooks(sync_engine) -> None:
+    """Подписывается на события выполнения SQL: число запросов и суммарное время на запрос HTTP."""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_metrics_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("_metrics_started")
+        if not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.db_queries += 1
+            stats.db_time += elapsed
+
+
+def add_template_time(seconds: float) -> None:
+    """Учитывает время рендера шаблона в текущем запросе (в т.ч. фрагментов вне TemplateResponse)."""
+    stats = _current.get()
+    if stats is not None:
+        stats.template_time += seconds
+
+
+def instrument_templates(templates) -> None:
+    """Оборачивает Jinja2Templates.TemplateResponse (рендер происходит в нём) для замера времени."""
+    original = templates.TemplateResponse
+
+    def timed_template_response(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            add_template_time(time.perf_counter() - started)
+
+    templates.TemplateResponse = timed_template_response
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def render_prometheus() -> str:
+    """Метрики в текстовом формате Prometheus (суммарно по воркерам)."""
+    data = merged_snapshot()
+    lines = [
+        "# HELP http_request_duration_seconds Время обработки запроса",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route), rs in sorted(data.items()):
+        labels = f'method="{_label(method)}",route="{_label(route)}"'
+        for bound, n in zip(LATENCY_BUCKETS, rs.buckets):
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {n}')
+        lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {rs.count}')
+        lines.append(f"http_request_duration_seconds_sum{{{labels}}} {rs.latency_sum:.6f}")
+        lines.append(f"http_request_duration_seconds_count{{{labels}}} {rs.count}")
+    for name, help_text, kind, attr in (
+        ("http_db_queries_total", "Число SQL-запросов", "counter", "db_queries"),
+        ("http_db_queries_max", "Максимум SQL-запросов за один HTTP-запрос", "gauge", "db_queries_max"),
+        ("http_db_time_seconds_total", "Суммарное время SQL-запросов", "counter", "db_time"),
+        ("http_template_render_seconds_total", "Суммарное время рендера шаблонов", "counter", "template_time"),
+        ("http_response_bytes_total", "Суммарный размер ответов", "counter", "response_bytes"),
+        ("http_server_errors_total", "Ответы с кодом 5xx", "counter", "errors"),
+    ):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for (method, route), rs in sorted(data.items()):
+            value = getattr(rs, attr)
+            value = f"{value:.6f}" if isinstance(value, float) else str(value)
+            lines.append(f'{name}{{method="{_label(method)}",route="{_label(route)}"}} {value}')
+    return "\n".join(lines) + "\n"
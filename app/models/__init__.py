@@ -1,6 +1,7 @@
 from app.models.user import User
-from app.models.asset import Asset, AssetEvent
+from app.models.asset import Asset, AssetComponent, AssetEvent, AssetIpAddress
 from app.models.inventory import InventoryCampaign, InventoryItem
 from app.models.company import Company
+from app.models.data_version import DataVersion
 
-__all__ = ["User", "Asset", "AssetEvent", "InventoryCampaign", "InventoryItem", "Company"]
+__all__ = ["User", "Asset", "AssetComponent", "AssetEvent", "AssetIpAddress", "InventoryCampaign", "InventoryItem", "Company", "DataVersion"]
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import date, datetime
-from sqlalchemy import String, DateTime, Date, ForeignKey, Text, Enum as SQLEnum, Integer
+from sqlalchemy import String, DateTime, Date, ForeignKey, Text, Enum as SQLEnum, Integer, Float, LargeBinary, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 
@@ -75,7 +75,12 @@ class Asset(Base):
     power_supply: Mapped[str] = mapped_column(String(128), nullable=True)
     monitor_diagonal: Mapped[str] = mapped_column(String(32), nullable=True)
     rack_units: Mapped[int] = mapped_column(Integer, nullable=True)  # сервер: высота в юнитах (U)
-    extra_components: Mapped[str] = mapped_column(Text, nullable=True)  # JSON: доп. устройства
+    # Числа из текстовых ram / disk1_capacity / диагоналей (app.utils.specs) — для фильтров-диапазонов
+    ram_mb: Mapped[int] = mapped_column(Integer, nullable=True, index=True)
+    disk_gb: Mapped[int] = mapped_column(Integer, nullable=True, index=True)
+    diagonal_in: Mapped[float] = mapped_column(Float, nullable=True, index=True)
+    # JSON: доп. устройства; построчно — в asset_components (карточка и поиск по типу)
+    extra_components: Mapped[str] = mapped_column(Text, nullable=True)
     company_id: Mapped[int] = mapped_column(ForeignKey("companies.id", ondelete="SET NULL"), nullable=True)
     # ОС (для ПК, ноутбуков, серверов)
     os: Mapped[str] = mapped_column(String(64), nullable=True)
@@ -86,6 +91,8 @@ class Asset(Base):
     # Дата выпуска (для ПК, ноутбуков, серверов, неттопов — отчёт «Светофор»)
     manufacture_date: Mapped[date] = mapped_column(Date, nullable=True)
     deleted_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)  # мягкое удаление
+    # sha256 последнего отчёта агента об оборудовании: такой же отчёт не требует сравнения полей
+    hw_report_hash: Mapped[str] = mapped_column(String(64), nullable=True)
 
     events: Mapped[list["AssetEvent"]] = relationship(
         "AssetEvent",
@@ -96,6 +103,17 @@ class Asset(Base):
         back_populates="asset",
     )
     company: Mapped["Company"] = relationship("Company", back_populates="assets", lazy="selectin")
+    ip_addresses: Mapped[list["AssetIpAddress"]] = relationship(
+        "AssetIpAddress",
+        back_populates="asset",
+        passive_deletes=True,
+    )
+    components: Mapped[list["AssetComponent"]] = relationship(
+        "AssetComponent",
+        back_populates="asset",
+        order_by="AssetComponent.position",
+        passive_deletes=True,
+    )
 
 
 class AssetEvent(Base):
@@ -112,3 +130,44 @@ class AssetEvent(Base):
 
     asset: Mapped["Asset"] = relationship("Asset", back_populates="events")
     created_by: Mapped["User"] = relationship("User", foreign_keys=[created_by_id])
+
+
+class AssetIpAddress(Base):
+    """
+    IP-адрес техники из network_interfaces / network_card (app.utils.ip_addresses) — для поиска
+    по адресу и подсети без разбора JSON. Пересобирается сервисами при изменении этих полей.
+    """
+    __tablename__ = "asset_ip_addresses"
+    __table_args__ = (
+        # Точный адрес и подсеть (BETWEEN) — по одному индексу; asset_id в нём, чтобы не читать таблицу
+        Index("ix_asset_ip_addresses_ip_bin", "ip_bin", "asset_id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    asset_id: Mapped[int] = mapped_column(ForeignKey("assets.id", ondelete="CASCADE"), nullable=False, index=True)
+    ip: Mapped[str] = mapped_column(String(45), nullable=False)  # каноническая запись
+    ip_bin: Mapped[bytes] = mapped_column(LargeBinary(16), nullable=False)  # 128-битное число, big-endian
+    label: Mapped[str] = mapped_column(String(128), nullable=True)
+    type: Mapped[str] = mapped_column(String(16), nullable=False, default="network")  # network | oob
+
+    asset: Mapped["Asset"] = relationship("Asset", back_populates="ip_addresses")
+
+
+class AssetComponent(Base):
+    """
+    Доп. устройство техники из extra_components (app.utils.components): карточка читает их без разбора
+    JSON, поиск отбирает технику по типу устройства. Пересобирается сервисом при изменении extra_components.
+    """
+    __tablename__ = "asset_components"
+    __table_args__ = (
+        # «У каких машин есть доп. ОЗУ» — по индексу, asset_id в нём, чтобы не читать таблицу
+        Index("ix_asset_components_type", "type", "asset_id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    asset_id: Mapped[int] = mapped_column(ForeignKey("assets.id", ondelete="CASCADE"), nullable=False, index=True)
+    position: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # порядок в списке карточки
+    type: Mapped[str] = mapped_column(String(32), nullable=False)  # значение из EXTRA_COMPONENT_TYPES
+    name: Mapped[str] = mapped_column(String(256), nullable=True)
+
+    asset: Mapped["Asset"] = relationship("Asset", back_populates="components")
@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from sqlalchemy import String, DateTime, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class DataVersion(Base):
+    """
+    Счётчик изменений данных для HTTP-кэширования (ETag/Last-Modified).
+    scope: "global" — любые изменения; "company:<id>" — техника и карточка организации.
+    """
+    __tablename__ = "data_versions"
+
+    scope: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
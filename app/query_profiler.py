@@ -0,0 +1,133 @@
+"""
+Профилировщик SQL для разработки и тестов (включается SQL_PROFILE=1).
+Логирует медленные запросы (дольше SLOW_QUERY_MS) с местом вызова в коде приложения и отмечает
+повторы одного и того же запроса в рамках одного HTTP-запроса (признак N+1).
+В тестах используется через фикстуру query_budget (tests/conftest.py).
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from sqlalchemy import event
+
+from app.config import BASE_DIR, SLOW_QUERY_MS, N_PLUS_ONE_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+_APP_DIR = str(BASE_DIR / "app")
+_THIS_FILE = str(Path(__file__).resolve())
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class QueryRecord:
+    statement: str
+    duration: float
+    call_site: str
+
+
+@dataclass
+class QueryTrace:
+    """Запросы, выполненные внутри одного трейса (HTTP-запрос или блок теста)."""
+    queries: list[QueryRecord] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> list[tuple[str, int, str]]:
+        """Запросы, повторившиеся не меньше threshold раз: [(SQL, число, место первого вызова)]."""
+        counts = Counter(q.statement for q in self.queries)
+        sites = {}
+        for q in self.queries:
+            sites.setdefault(q.statement, q.call_site)
+        return [(st, n, sites[st]) for st, n in counts.most_common() if n >= threshold]
+
+    def report(self) -> str:
+        lines = [f"{i + 1}. [{q.duration * 1000:.1f} мс] {q.call_site}: {q.statement}" for i, q in enumerate(self.queries)]
+        for statement, n, site in self.repeated(2):
+            lines.append(f"повтор ×{n} ({site}): {statement}")
+        return "\n".join(lines)
+
+
+# Активные трейсы текущего контекста (вложенные: фикстура теста + трейс запроса в middleware)
+_traces: contextvars.ContextVar[tuple[QueryTrace, ...]] = contextvars.ContextVar("query_traces", default=())
+
+
+def _normalize(statement: str) -> str:
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+def _app_frame(frame) -> str | None:
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_APP_DIR) and filename != _THIS_FILE:
+            return f"{Path(filename).relative_to(BASE_DIR).as_posix()}:{frame.f_lineno} ({frame.f_code.co_name})"
+        frame = frame.f_back
+    return None
+
+
+def call_site() -> str:
+    """
+    Место вызова в коде приложения. В async-режиме SQLAlchemy выполняет запрос в дочернем greenlet,
+    поэтому, если в своём стеке кода приложения нет, просматривается стек родительского greenlet.
+    """
+    site = _app_frame(sys._getframe(1))
+    if site is None:
+        try:
+            import greenlet
+            parent = greenlet.getcurrent().parent
+            if parent is not None:
+                site = _app_frame(parent.gr_frame)
+        except ImportError:
+            pass
+    return site or "?"
+
+
+def attach(sync_engine) -> None:
+    """Подключает профилировщик к engine (для AsyncEngine передавать engine.sync_engine)."""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_profiler_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("_profiler_started")
+        if not started:
+            return
+        duration = time.perf_counter() - started.pop()
+        traces = _traces.get()
+        slow = duration * 1000 >= SLOW_QUERY_MS
+        if not traces and not slow:
+            return
+        record = QueryRecord(_normalize(statement), duration, call_site())
+        if slow:
+            logger.warning("slow_query ms=%.1f site=%s sql=%s", duration * 1000, record.call_site, record.statement)
+        for trace in traces:
+            trace.queries.append(record)
+
+
+@contextmanager
+def trace_queries():
+    """Собирает запросы, выполненные внутри блока (включая задачи, созданные в нём)."""
+    trace = QueryTrace()
+    token = _traces.set(_traces.get() + (trace,))
+    try:
+        yield trace
+    finally:
+        _traces.reset(token)
+
+
+def log_repeated(trace: QueryTrace, label: str) -> None:
+    """Предупреждение о повторяющихся запросах (N+1) в рамках одного HTTP-запроса."""
+    for statement, n, site in trace.repeated():
+        logger.warning("n_plus_one route=%s count=%s site=%s sql=%s", label, n, site, statement)
@@ -1,12 +1,18 @@
 """
 Доступ к данным активов: выборки по фильтрам, по id, справочные списки (локации, серийники), сводки.
 """
-from sqlalchemy import select, func
+from datetime import datetime
+
+from sqlalchemy import bindparam, delete, false, func, insert, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.models import Asset, AssetEvent, Company
+from app.models import Asset, AssetComponent, AssetEvent, AssetIpAddress, Company
 from app.models.asset import AssetStatus, EquipmentKind
+from app.utils.ip_addresses import ip_key, ip_range, parse_ip
+
+# Сколько значений передавать в один IN (...): лимит параметров SQLite — 999 в старых сборках
+SQL_IN_CHUNK = 900
 
 # Типы техники для отчёта «Светофор» — только enum
 TRAFFIC_LIGHT_KINDS = (EquipmentKind.desktop, EquipmentKind.nettop, EquipmentKind.laptop, EquipmentKind.server)
@@ -67,8 +73,17 @@ async def get_assets_list(
     return list(result.scalars().all())
 
 
-async def advanced_search_assets(
-    db: AsyncSession,
+def _to_number(value) -> float | None:
+    """Число из параметра фильтра («16», «15,6»); пусто или не число — None (фильтр не применяется)."""
+    if value is None or str(value).strip() == "":
+        return None
+    try:
+        return float(str(value).strip().replace(",", "."))
+    except ValueError:
+        return None
+
+
+def _advanced_search_conditions(
     name: str | None = None,
     status: str | None = None,
     equipment_kind: str | None = None,
@@ -90,67 +105,155 @@ async def advanced_search_assets(
     rack_units: str | None = None,
     manufacture_date_from=None,
     manufacture_date_to=None,
-) -> list[Asset]:
+    ram_gb_from=None,
+    ram_gb_to=None,
+    disk_gb_from=None,
+    disk_gb_to=None,
+    diagonal_from=None,
+    diagonal_to=None,
+    ip: str | None = None,
+    component_type: str | None = None,
+) -> list:
     """
-    Расширенный поиск по оборудованию: позволяет комбинировать базовые фильтры
-    (название, статус, тип техники, расположение, организация) с техническими полями.
+    Условия WHERE расширенного поиска (общие для страницы поиска и JSON API).
+    Диапазоны ОЗУ (ГБ), объёма диска (ГБ) и диагонали (дюймы) — по числовым индексируемым колонкам;
+    ip — адрес или подсеть CIDR по таблице asset_ip_addresses; component_type — есть доп. устройство
+    этого типа (asset_components).
     """
-    status_filter = None
+    conds = [Asset.deleted_at.is_(None)]
     if status and status.strip() and status.strip() in ("active", "inactive", "maintenance", "retired"):
-        status_filter = AssetStatus(status.strip())
-    q = select(Asset).options(selectinload(Asset.company)).where(Asset.deleted_at.is_(None))
+        conds.append(Asset.status == AssetStatus(status.strip()))
     if name:
-        q = q.where(Asset.name.ilike(f"%{name}%"))
-    if status_filter is not None:
-        q = q.where(Asset.status == status_filter)
+        conds.append(Asset.name.ilike(f"%{name}%"))
     if equipment_kind:
         try:
-            q = q.where(Asset.equipment_kind == EquipmentKind(equipment_kind))
+            conds.append(Asset.equipment_kind == EquipmentKind(equipment_kind))
         except ValueError:
             pass
     if location and location.strip():
-        q = q.where(Asset.location.ilike(f"%{location.strip()}%"))
-    if company_id and company_id.strip():
+        conds.append(Asset.location.ilike(f"%{location.strip()}%"))
+    if company_id and str(company_id).strip():
         try:
-            q = q.where(Asset.company_id == int(company_id.strip()))
+            conds.append(Asset.company_id == int(str(company_id).strip()))
         except ValueError:
             pass
-    if current_user and current_user.strip():
-        q = q.where(Asset.current_user.ilike(f"%{current_user.strip()}%"))
-    if cpu and cpu.strip():
-        q = q.where(Asset.cpu.ilike(f"%{cpu.strip()}%"))
-    if ram and ram.strip():
-        q = q.where(Asset.ram.ilike(f"%{ram.strip()}%"))
-    if disk1_type and disk1_type.strip():
-        q = q.where(Asset.disk1_type.ilike(f"%{disk1_type.strip()}%"))
-    if disk1_capacity and disk1_capacity.strip():
-        q = q.where(Asset.disk1_capacity.ilike(f"%{disk1_capacity.strip()}%"))
-    if network_card and network_card.strip():
-        q = q.where(Asset.network_card.ilike(f"%{network_card.strip()}%"))
-    if motherboard and motherboard.strip():
-        q = q.where(Asset.motherboard.ilike(f"%{motherboard.strip()}%"))
+    # Текстовые технические поля — поиск по вхождению
+    for column, value in (
+        (Asset.current_user, current_user),
+        (Asset.cpu, cpu),
+        (Asset.ram, ram),
+        (Asset.disk1_type, disk1_type),
+        (Asset.disk1_capacity, disk1_capacity),
+        (Asset.network_card, network_card),
+        (Asset.motherboard, motherboard),
+        (Asset.description, description),
+        (Asset.screen_diagonal, screen_diagonal),
+        (Asset.screen_resolution, screen_resolution),
+        (Asset.monitor_diagonal, monitor_diagonal),
+        (Asset.power_supply, power_supply),
+    ):
+        if value and value.strip():
+            conds.append(column.ilike(f"%{value.strip()}%"))
     if os and os.strip():
-        q = q.where(Asset.os == os.strip())
-    if description and description.strip():
-        q = q.where(Asset.description.ilike(f"%{description.strip()}%"))
-    if screen_diagonal and screen_diagonal.strip():
-        q = q.where(Asset.screen_diagonal.ilike(f"%{screen_diagonal.strip()}%"))
-    if screen_resolution and screen_resolution.strip():
-        q = q.where(Asset.screen_resolution.ilike(f"%{screen_resolution.strip()}%"))
-    if monitor_diagonal and monitor_diagonal.strip():
-        q = q.where(Asset.monitor_diagonal.ilike(f"%{monitor_diagonal.strip()}%"))
-    if power_supply and power_supply.strip():
-        q = q.where(Asset.power_supply.ilike(f"%{power_supply.strip()}%"))
+        conds.append(Asset.os == os.strip())
     if rack_units is not None and str(rack_units).strip() != "":
         try:
-            q = q.where(Asset.rack_units == int(rack_units))
+            conds.append(Asset.rack_units == int(rack_units))
         except ValueError:
             pass
+    # Числовые диапазоны: (колонка, от, до, множитель единицы фильтра в единицы колонки)
+    for column, low, high, scale in (
+        (Asset.ram_mb, ram_gb_from, ram_gb_to, 1024),
+        (Asset.disk_gb, disk_gb_from, disk_gb_to, 1),
+        (Asset.diagonal_in, diagonal_from, diagonal_to, 1),
+    ):
+        low, high = _to_number(low), _to_number(high)
+        if low is not None:
+            conds.append(column >= low * scale)
+        if high is not None:
+            conds.append(column <= high * scale)
+    if ip and ip.strip():
+        # Не адрес и не подсеть — ничего не найдено, а не «фильтр не задан» (иначе опечатка отберёт всю технику)
+        ip_bounds = ip_range(ip)
+        conds.append(false() if ip_bounds is None else Asset.id.in_(
+            select(AssetIpAddress.asset_id).where(AssetIpAddress.ip_bin.between(*ip_bounds))
+        ))
+    if component_type and component_type.strip():
+        conds.append(Asset.id.in_(
+            select(AssetComponent.asset_id).where(AssetComponent.type == component_type.strip())
+        ))
     if manufacture_date_from is not None:
-        q = q.where(Asset.manufacture_date >= manufacture_date_from)
+        conds.append(Asset.manufacture_date >= manufacture_date_from)
     if manufacture_date_to is not None:
-        q = q.where(Asset.manufacture_date <= manufacture_date_to)
-    q = q.order_by(Asset.created_at.desc(), Asset.id.desc())
+        conds.append(Asset.manufacture_date <= manufacture_date_to)
+    return conds
+
+
+async def advanced_search_assets(db: AsyncSession, **filters) -> list[Asset]:
+    """
+    Расширенный поиск по оборудованию: позволяет комбинировать базовые фильтры
+    (название, статус, тип техники, расположение, организация) с техническими полями.
+    Фильтры — именованные аргументы _advanced_search_conditions.
+    """
+    q = (
+        select(Asset)
+        .options(selectinload(Asset.company))
+        .where(*_advanced_search_conditions(**filters))
+        .order_by(Asset.created_at.desc(), Asset.id.desc())
+    )
+    result = await db.execute(q)
+    return list(result.scalars().all())
+
+
+async def get_assets_page(
+    db: AsyncSession,
+    columns: list[str],
+    after_id: int | None = None,
+    limit: int = 100,
+    **filters,
+) -> list[dict]:
+    """
+    Страница активов для API: keyset-пагинация по id (id > after_id, по возрастанию),
+    выбираются только колонки columns. Возвращает до limit + 1 строк — лишняя строка
+    сигнализирует, что есть следующая страница.
+    """
+    q = (
+        select(*(getattr(Asset, c) for c in columns))
+        .where(*_advanced_search_conditions(**filters))
+        .order_by(Asset.id.asc())
+        .limit(limit + 1)
+    )
+    if after_id is not None:
+        q = q.where(Asset.id > after_id)
+    result = await db.execute(q)
+    return [dict(row) for row in result.mappings().all()]
+
+
+async def get_asset_fields(db: AsyncSession, asset_id: int, columns: list[str]) -> dict | None:
+    """Выбранные колонки одного (не удалённого) актива."""
+    result = await db.execute(
+        select(*(getattr(Asset, c) for c in columns))
+        .where(Asset.id == asset_id, Asset.deleted_at.is_(None))
+    )
+    row = result.mappings().one_or_none()
+    return dict(row) if row is not None else None
+
+
+async def get_asset_events_page(
+    db: AsyncSession,
+    asset_id: int,
+    after_id: int | None = None,
+    limit: int = 100,
+) -> list[AssetEvent]:
+    """События актива в порядке id (keyset-пагинация, до limit + 1 строк)."""
+    q = (
+        select(AssetEvent)
+        .where(AssetEvent.asset_id == asset_id)
+        .order_by(AssetEvent.id.asc())
+        .limit(limit + 1)
+    )
+    if after_id is not None:
+        q = q.where(AssetEvent.id > after_id)
     result = await db.execute(q)
     return list(result.scalars().all())
 
@@ -165,7 +268,7 @@ async def get_asset_by_id_with_relations(
     db: AsyncSession,
     asset_id: int,
 ) -> Asset | None:
-    """Актив по id с загрузкой events (и автора каждого события), company, inventory_items."""
+    """Актив по id с загрузкой events (и автора каждого события), company, inventory_items, components."""
     result = await db.execute(
         select(Asset)
         .where(Asset.id == asset_id)
@@ -173,11 +276,20 @@ async def get_asset_by_id_with_relations(
             selectinload(Asset.events).selectinload(AssetEvent.created_by),
             selectinload(Asset.company),
             selectinload(Asset.inventory_items),
+            selectinload(Asset.components),
         )
     )
     return result.scalar_one_or_none()
 
 
+async def get_asset_components(db: AsyncSession, asset_id: int) -> list[AssetComponent]:
+    """Доп. устройства актива в порядке карточки."""
+    result = await db.execute(
+        select(AssetComponent).where(AssetComponent.asset_id == asset_id).order_by(AssetComponent.position)
+    )
+    return list(result.scalars().all())
+
+
 async def get_distinct_locations(db: AsyncSession) -> list[str]:
     """Список уникальных непустых расположений для фильтра (без удалённых)."""
     result = await db.execute(
@@ -191,15 +303,227 @@ async def get_distinct_locations(db: AsyncSession) -> list[str]:
     return [r[0] for r in result.all()]
 
 
-async def get_existing_serial_numbers(db: AsyncSession) -> set[str]:
-    """Множество серийных номеров, уже существующих в БД (без удалённых)."""
-    result = await db.execute(
-        select(Asset.serial_number)
-        .where(Asset.deleted_at.is_(None))
-        .where(Asset.serial_number.isnot(None))
-        .where(Asset.serial_number != "")
+async def get_ids_by_serial_numbers(db: AsyncSession, serials: list[str]) -> dict[str, int]:
+    """Серийный номер -> id (без удалённых), запросами по SQL_IN_CHUNK значений."""
+    found: dict[str, int] = {}
+    for i in range(0, len(serials), SQL_IN_CHUNK):
+        result = await db.execute(
+            select(Asset.serial_number, Asset.id)
+            .where(Asset.serial_number.in_(serials[i:i + SQL_IN_CHUNK]))
+            .where(Asset.deleted_at.is_(None))
+        )
+        found.update(result.tuples().all())
+    return found
+
+
+async def get_rows_by_serial_numbers(db: AsyncSession, serials: list[str], columns: list[str]) -> list:
+    """Строки (id, serial_number и columns) активов с серийными номерами из serials (без удалённых)."""
+    cols = [Asset.id, Asset.serial_number] + [getattr(Asset, c) for c in columns if c != "serial_number"]
+    rows = []
+    for i in range(0, len(serials), SQL_IN_CHUNK):
+        result = await db.execute(
+            select(*cols).where(Asset.serial_number.in_(serials[i:i + SQL_IN_CHUNK])).where(Asset.deleted_at.is_(None))
+        )
+        rows.extend(result.all())
+    return rows
+
+
+async def get_deleted_serial_numbers(db: AsyncSession, serials: list[str]) -> set[str]:
+    """Какие из serials принадлежат удалённым активам (уникальность серийного номера действует и для них)."""
+    found: set[str] = set()
+    for i in range(0, len(serials), SQL_IN_CHUNK):
+        result = await db.execute(
+            select(Asset.serial_number)
+            .where(Asset.serial_number.in_(serials[i:i + SQL_IN_CHUNK]))
+            .where(Asset.deleted_at.isnot(None))
+        )
+        found.update(result.scalars().all())
+    return found
+
+
+async def get_existing_ids(db: AsyncSession, asset_ids: list[int]) -> set[int]:
+    """Какие из asset_ids существуют (без удалённых)."""
+    found: set[int] = set()
+    for i in range(0, len(asset_ids), SQL_IN_CHUNK):
+        result = await db.execute(
+            select(Asset.id).where(Asset.id.in_(asset_ids[i:i + SQL_IN_CHUNK])).where(Asset.deleted_at.is_(None))
+        )
+        found.update(result.scalars().all())
+    return found
+
+
+async def get_ids_by_ips(db: AsyncSession, ips: list[str]) -> dict[str, int]:
+    """
+    Адрес -> id актива по таблице asset_ip_addresses (без удалённых активов).
+    Адрес на нескольких карточках — меньший id.
+    """
+    keys = {ip_key(address): ip for ip in ips if (address := parse_ip(ip)) is not None}
+    found: dict[str, int] = {}
+    key_list = list(keys)
+    for i in range(0, len(key_list), SQL_IN_CHUNK):
+        result = await db.execute(
+            select(AssetIpAddress.ip_bin, func.min(AssetIpAddress.asset_id))
+            .join(Asset, Asset.id == AssetIpAddress.asset_id)
+            .where(AssetIpAddress.ip_bin.in_(key_list[i:i + SQL_IN_CHUNK]))
+            .where(Asset.deleted_at.is_(None))
+            .group_by(AssetIpAddress.ip_bin)
+        )
+        found.update((keys[key], asset_id) for key, asset_id in result.tuples().all())
+    return found
+
+
+async def replace_asset_ips(db: AsyncSession, rows_by_asset: dict[int, list[dict]]) -> None:
+    """
+    Пересобирает адреса активов: rows_by_asset — id -> строки asset_ip_rows (пустой список — адресов нет).
+    Старые строки удаляются по SQL_IN_CHUNK id, новые вставляются одним INSERT.
+    """
+    asset_ids = list(rows_by_asset)
+    for i in range(0, len(asset_ids), SQL_IN_CHUNK):
+        await db.execute(delete(AssetIpAddress).where(AssetIpAddress.asset_id.in_(asset_ids[i:i + SQL_IN_CHUNK])))
+    rows = [{"asset_id": asset_id, **row} for asset_id, ip_rows in rows_by_asset.items() for row in ip_rows]
+    if rows:
+        await db.execute(insert(AssetIpAddress), rows)
+
+
+async def replace_asset_components(db: AsyncSession, rows_by_asset: dict[int, list[dict]]) -> None:
+    """
+    Пересобирает доп. устройства активов: rows_by_asset — id -> строки component_rows (пустой список — нет).
+    Старые строки удаляются по SQL_IN_CHUNK id, новые вставляются одним INSERT.
+    """
+    asset_ids = list(rows_by_asset)
+    for i in range(0, len(asset_ids), SQL_IN_CHUNK):
+        await db.execute(delete(AssetComponent).where(AssetComponent.asset_id.in_(asset_ids[i:i + SQL_IN_CHUNK])))
+    rows = [{"asset_id": asset_id, **row} for asset_id, components in rows_by_asset.items() for row in components]
+    if rows:
+        await db.execute(insert(AssetComponent), rows)
+
+
+async def count_inactive_among(db: AsyncSession, asset_ids: list[int], threshold) -> int:
+    """Сколько из asset_ids неактивны: last_seen_at пуст или раньше threshold."""
+    total = 0
+    for i in range(0, len(asset_ids), SQL_IN_CHUNK):
+        result = await db.execute(
+            select(func.count(Asset.id))
+            .where(Asset.id.in_(asset_ids[i:i + SQL_IN_CHUNK]))
+            .where((Asset.last_seen_at.is_(None)) | (Asset.last_seen_at < threshold))
+        )
+        total += result.scalar() or 0
+    return total
+
+
+async def bulk_update_last_seen(db: AsyncSession, seen: dict[int, datetime]) -> None:
+    """
+    Один UPDATE (executemany) last_seen_at по id; более ранняя отметка не затирает более позднюю.
+    """
+    if not seen:
+        return
+    table = Asset.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("_id"))
+        .where(or_(table.c.last_seen_at.is_(None), table.c.last_seen_at < bindparam("_seen")))
+        .values(last_seen_at=bindparam("_seen"))
     )
-    return {r[0] for r in result.all()}
+    await db.execute(stmt, [{"_id": asset_id, "_seen": ts} for asset_id, ts in seen.items()])
+
+
+async def get_hw_report_hashes(db: AsyncSession, asset_ids: list[int]) -> dict[int, str | None]:
+    """id -> hw_report_hash для существующих (не удалённых) активов из asset_ids."""
+    found: dict[int, str | None] = {}
+    for i in range(0, len(asset_ids), SQL_IN_CHUNK):
+        result = await db.execute(
+            select(Asset.id, Asset.hw_report_hash)
+            .where(Asset.id.in_(asset_ids[i:i + SQL_IN_CHUNK]))
+            .where(Asset.deleted_at.is_(None))
+        )
+        found.update(result.tuples().all())
+    return found
+
+
+async def get_assets_by_ids(db: AsyncSession, asset_ids: list[int]) -> list[Asset]:
+    """Активы по списку id (без связей), запросами по SQL_IN_CHUNK id."""
+    assets: list[Asset] = []
+    for i in range(0, len(asset_ids), SQL_IN_CHUNK):
+        result = await db.execute(
+            select(Asset).where(Asset.id.in_(asset_ids[i:i + SQL_IN_CHUNK])).where(Asset.deleted_at.is_(None))
+        )
+        assets.extend(result.scalars().all())
+    return assets
+
+
+async def bulk_update_assets(db: AsyncSession, rows: list[dict], touch: bool = True) -> None:
+    """
+    Пакетное обновление: rows — словари с ключом id и новыми значениями колонок.
+    Строки с одинаковым набором колонок уходят одним UPDATE (executemany);
+    touch — проставить updated_at (для служебных колонок не нужно).
+    """
+    table = Asset.__table__
+    now = datetime.utcnow()
+    groups: dict[tuple[str, ...], list[dict]] = {}
+    for row in rows:
+        keys = tuple(sorted(k for k in row if k != "id"))
+        if touch:
+            keys += ("updated_at",)
+        params = {"_id": row["id"], "_updated_at": now}
+        params.update({f"_{k}": row[k] for k in keys if k != "updated_at"})
+        groups.setdefault(keys, []).append(params)
+    for keys, params in groups.items():
+        # Имена параметров с «_»: имена колонок в bindparam зарезервированы для SET
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("_id"))
+            .values({k: bindparam(f"_{k}") for k in keys})
+        )
+        await db.execute(stmt, params)
+
+
+async def bulk_insert_assets(db: AsyncSession, rows: list[dict]) -> list[int]:
+    """
+    Пакетная вставка активов (словари с одинаковым набором полей Asset).
+    Возвращает id новых записей в порядке rows.
+    """
+    if not rows:
+        return []
+    result = await db.execute(insert(Asset).returning(Asset.id, sort_by_parameter_order=True), rows)
+    return list(result.scalars().all())
+
+
+async def bulk_insert_events(db: AsyncSession, rows: list[dict]) -> None:
+    """Пакетная вставка событий (словари с полями AssetEvent) одним INSERT."""
+    if rows:
+        await db.execute(insert(AssetEvent), rows)
+
+
+async def get_bulk_edit_targets(
+    db: AsyncSession,
+    columns: list[str],
+    asset_ids: list[int] | None = None,
+    **filters,
+) -> list:
+    """
+    Строки (id и columns) активов для массового изменения: по списку id (запросами по SQL_IN_CHUNK)
+    или по фильтрам расширенного поиска.
+    """
+    cols = [Asset.id] + [getattr(Asset, c) for c in columns]
+    if asset_ids is None:
+        result = await db.execute(select(*cols).where(*_advanced_search_conditions(**filters)).order_by(Asset.id))
+        return list(result.all())
+    rows = []
+    for i in range(0, len(asset_ids), SQL_IN_CHUNK):
+        result = await db.execute(
+            select(*cols).where(Asset.id.in_(asset_ids[i:i + SQL_IN_CHUNK])).where(Asset.deleted_at.is_(None))
+        )
+        rows.extend(result.all())
+    return rows
+
+
+async def set_fields_by_ids(db: AsyncSession, asset_ids: list[int], values: dict) -> None:
+    """Одинаковые значения values для всех asset_ids: UPDATE ... WHERE id IN (...) по SQL_IN_CHUNK id."""
+    values = {**values, "updated_at": datetime.utcnow()}
+    for i in range(0, len(asset_ids), SQL_IN_CHUNK):
+        await db.execute(
+            update(Asset.__table__).where(Asset.__table__.c.id.in_(asset_ids[i:i + SQL_IN_CHUNK])).values(**values)
+        )
 
 
 async def get_traffic_light_assets(
@@ -107,3 +107,18 @@ async def get_asset_ids_for_scope(db: AsyncSession, company_id: int | None) -> l
         q = q.where(Asset.company_id == company_id)
     result = await db.execute(q)
     return [r[0] for r in result.all()]
+
+
+async def get_campaigns(
+    db: AsyncSession,
+    company_id: int | None = None,
+    active_only: bool = False,
+) -> list[InventoryCampaign]:
+    """Кампании по убыванию started_at с фильтром по организации и незавершённости (для JSON API)."""
+    q = select(InventoryCampaign).order_by(InventoryCampaign.started_at.desc(), InventoryCampaign.id.desc())
+    if company_id is not None:
+        q = q.where(InventoryCampaign.company_id == company_id)
+    if active_only:
+        q = q.where(InventoryCampaign.finished_at.is_(None))
+    result = await db.execute(q)
+    return list(result.scalars().all())
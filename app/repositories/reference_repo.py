@@ -5,7 +5,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.models import Company
+from app.models import Company, DataVersion
 
 
 async def get_companies_ordered(db: AsyncSession) -> list[Company]:
@@ -34,3 +34,14 @@ async def find_company_by_name(db: AsyncSession, name: str) -> Company | None:
         return None
     result = await db.execute(select(Company).where(Company.name.ilike(name.strip())))
     return result.scalar_one_or_none()
+
+
+async def get_company_ids_by_name(db: AsyncSession) -> dict[str, int]:
+    """Имя организации в нижнем регистре -> id (для пакетного сопоставления при импорте)."""
+    result = await db.execute(select(Company.name, Company.id))
+    return {name.strip().lower(): company_id for name, company_id in result.tuples().all()}
+
+
+async def get_data_version(db: AsyncSession, scope: str) -> DataVersion | None:
+    """Версия данных (счётчик изменений) по scope; None — изменений ещё не было."""
+    return await db.get(DataVersion, scope)
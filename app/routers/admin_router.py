@@ -1,20 +1,28 @@
+import asyncio
 from datetime import datetime
 from pathlib import Path
 
 from fastapi import APIRouter, Depends, Request, Form, File, UploadFile, HTTPException
-from fastapi.responses import RedirectResponse, FileResponse
+from fastapi.responses import RedirectResponse, FileResponse, StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from werkzeug.security import generate_password_hash
 
-from app.config import AVATAR_DIR, ALLOWED_AVATAR_EXTENSIONS, MAX_AVATAR_SIZE_MB
-from app.database import get_db, engine
+from app.config import (
+    AVATAR_DIR, ALLOWED_AVATAR_EXTENSIONS, MAX_AVATAR_SIZE_MB, MAX_RESTORE_UPLOAD_MB, UVICORN_WORKERS,
+)
+from app.database import get_db, drained_connections
 from app.models import User
 from app.models.user import UserRole
 from app.auth import require_role
 from app.templates_ctx import templates
 from app.constants import ROLE_CHOICES, ROLE_LABELS
-from app.services.backup import create_backup, list_backups, get_backup_path, restore_backup, drop_database
+from app.services.backup import (
+    list_backups, get_backup_path, stage_restore, stage_restore_from_zip, apply_restore, discard_restore,
+    drop_database, new_upload_path, iter_backup_zip, new_backup_filename,
+)
+from app.services.backup_scheduler import read_backup_status, run_backup_in_background
+from app.utils.uploads import UploadTooLargeError, receive_file
 
 router = APIRouter(prefix="", tags=["admin"])
 
@@ -250,6 +258,7 @@ async def admin_backups_page(
             "request": request,
             "user": current_user,
             "backups": backups,
+            "backup_status": read_backup_status(),
         },
     )
 
@@ -258,8 +267,20 @@ async def admin_backups_page(
 async def admin_backup_create(
     current_user: User = Depends(require_role(UserRole.admin)),
 ):
-    name = create_backup()
-    return RedirectResponse(url=f"/admin/backups?created={name}", status_code=302)
+    """Полный бекап (zip) запускается в фоне; результат виден на странице бекапов."""
+    if not run_backup_in_background("full"):
+        return RedirectResponse(url="/admin/backups?error=busy", status_code=302)
+    return RedirectResponse(url="/admin/backups?started=1", status_code=302)
+
+
+@router.post("/admin/backups/create-incremental", name="admin_backup_create_incremental", include_in_schema=False)
+async def admin_backup_create_incremental(
+    current_user: User = Depends(require_role(UserRole.admin)),
+):
+    """Инкрементальный бекап в фоне: сохраняются только изменившиеся блоки БД и файлы."""
+    if not run_backup_in_background("incremental"):
+        return RedirectResponse(url="/admin/backups?error=busy", status_code=302)
+    return RedirectResponse(url="/admin/backups?started=1", status_code=302)
 
 
 @router.get("/admin/backups/download/{filename}", name="admin_backup_download", include_in_schema=False)
@@ -268,7 +289,7 @@ async def admin_backup_download(
     current_user: User = Depends(require_role(UserRole.admin)),
 ):
     path = get_backup_path(filename)
-    if not path:
+    if not path or path.suffix != ".zip":
         raise HTTPException(404, "Бекап не найден")
     return FileResponse(
         path,
@@ -277,37 +298,110 @@ async def admin_backup_download(
     )
 
 
+@router.get("/admin/backups/download-current", name="admin_backup_download_current", include_in_schema=False)
+async def admin_backup_download_current(
+    current_user: User = Depends(require_role(UserRole.admin)),
+):
+    """Скачать бекап текущих данных: свежий снимок БД упаковывается в zip на лету, без записи в data/backups/."""
+    filename = new_backup_filename()
+    return StreamingResponse(
+        iter_backup_zip(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _require_single_worker() -> None:
+    """
+    Восстановление и очистка подменяют файл БД; соединения закрываются только в текущем процессе,
+    поэтому при нескольких воркерах они запрещены (409) — до подготовки данных, а не после.
+    """
+    if UVICORN_WORKERS > 1:
+        raise HTTPException(
+            409, "Восстановление и очистка базы доступны только при одном воркере: запустите с UVICORN_WORKERS=1",
+        )
+
+
+async def _apply_staged_restore(db: AsyncSession, staging: Path) -> None:
+    """Подменяет данные подготовленными в staging: с паузой новых запросов и закрытием соединений."""
+    try:
+        await db.close()
+        async with drained_connections():
+            await asyncio.to_thread(apply_restore, staging)
+    except Exception as e:
+        await asyncio.to_thread(discard_restore, staging)
+        raise HTTPException(500, f"Ошибка восстановления: {e}")
+
+
 @router.post("/admin/backups/restore", name="admin_backup_restore", include_in_schema=False)
 async def admin_backup_restore(
     request: Request,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(UserRole.admin)),
     filename: str = Form(...),
     confirm: str = Form(None),
 ):
+    """
+    Восстановление: данные готовятся и проверяются в фоне, пока приложение работает;
+    затем новые запросы к БД ставятся на паузу, текущие дорабатывают, и файл БД подменяется атомарно.
+    """
     if confirm != "yes":
         return RedirectResponse(url="/admin/backups?error=confirm", status_code=302)
+    _require_single_worker()
     path = get_backup_path(filename)
     if not path:
         raise HTTPException(404, "Бекап не найден")
     try:
-        await engine.dispose()
-        restore_backup(filename)
+        staging = await asyncio.to_thread(stage_restore, filename)
     except Exception as e:
         raise HTTPException(500, f"Ошибка восстановления: {e}")
+    await _apply_staged_restore(db, staging)
+    return RedirectResponse(url="/admin/backups?restored=1", status_code=302)
+
+
+@router.post("/admin/backups/upload-restore", name="admin_backup_upload_restore", include_in_schema=False)
+async def admin_backup_upload_restore(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(UserRole.admin)),
+):
+    """
+    Восстановление из загруженного zip (форма: file, confirm): тело запроса пишется прямо во временный
+    файл на диске (не больше MAX_RESTORE_UPLOAD_MB, иначе 413), из архива по одной записи извлекаются
+    app.db и avatars/, БД проверяется и только затем подменяет текущую.
+    """
+    _require_single_worker()
+    upload_path = await asyncio.to_thread(new_upload_path)
+    try:
+        with upload_path.open("wb") as out:
+            form = await receive_file(request, "file", out, MAX_RESTORE_UPLOAD_MB * 1024 * 1024)
+        if form.get("confirm") != "yes":
+            return RedirectResponse(url="/admin/backups?error=confirm", status_code=302)
+        staging = await asyncio.to_thread(stage_restore_from_zip, upload_path)
+    except UploadTooLargeError as e:
+        raise HTTPException(413, str(e))
+    except ValueError as e:
+        raise HTTPException(400, f"Архив не подходит для восстановления: {e}")
+    finally:
+        upload_path.unlink(missing_ok=True)
+    await _apply_staged_restore(db, staging)
     return RedirectResponse(url="/admin/backups?restored=1", status_code=302)
 
 
 @router.post("/admin/backups/drop", name="admin_backup_drop", include_in_schema=False)
 async def admin_backup_drop(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(UserRole.admin)),
     confirm: str = Form(None),
 ):
     """Очистить базу: удалить все данные и создать пустую БД с одним админом (admin/admin)."""
     if confirm != "yes":
         return RedirectResponse(url="/admin/backups?error=drop_confirm", status_code=302)
+    _require_single_worker()
     try:
-        await engine.dispose()
-        drop_database()
+        await db.close()
+        async with drained_connections():
+            await asyncio.to_thread(drop_database)
     except Exception as e:
         raise HTTPException(500, f"Ошибка очистки базы: {e}")
     return RedirectResponse(url="/login?dropped=1", status_code=302)
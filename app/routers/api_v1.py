@@ -0,0 +1,239 @@
+"""
+JSON API v1: техника (расширенный поиск, keyset-пагинация, выборочные поля fields=), события,
+организации, кампании инвентаризации, heartbeat агентов. Авторизация — cookie сессии или
+Authorization: Bearer (токен сессии; для агентов — AGENT_TOKEN).
+"""
+import secrets
+from typing import Annotated
+
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from werkzeug.security import check_password_hash
+
+from app.auth import SESSION_MAX_AGE, create_session_token, get_optional_user, require_role, require_user
+from app.config import AGENT_TOKEN, HEARTBEAT_MAX_BATCH, HW_REPORT_MAX_BATCH
+from app.database import get_db
+from app.models import User
+from app.models.user import UserRole
+from app.repositories import asset_repo, inventory_repo, reference_repo
+from app.schemas.api import (
+    ASSET_FIELDS,
+    PAGE_LIMIT_DEFAULT,
+    PAGE_LIMIT_MAX,
+    AssetEventOut,
+    AssetEventPage,
+    AssetListQuery,
+    AssetOut,
+    AssetPage,
+    BulkEditRequest,
+    BulkEditResult,
+    CampaignOut,
+    CompanyOut,
+    HardwareIngestResult,
+    HardwareReport,
+    HeartbeatAccepted,
+    HeartbeatPing,
+    TokenOut,
+    TokenRequest,
+)
+from app.services.assets_service import bulk_edit_assets
+from app.services.heartbeat_service import heartbeat_buffer
+from app.services.hw_ingest_service import ingest_hw_reports
+
+router = APIRouter(prefix="/api/v1", tags=["api v1"])
+
+FieldsQuery = Annotated[
+    str | None,
+    Query(description="Поля через запятую (id отдаётся всегда); по умолчанию — все"),
+]
+CursorQuery = Annotated[str | None, Query(description="next_cursor предыдущей страницы")]
+LimitQuery = Annotated[int, Query(ge=1, le=PAGE_LIMIT_MAX)]
+
+
+async def require_agent(
+    request: Request,
+    current_user: User | None = Depends(get_optional_user),
+) -> User | None:
+    """
+    Агент по токену AGENT_TOKEN (Bearer) — возвращает None; иначе пользователь с ролью admin/user.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if AGENT_TOKEN and scheme.lower() == "bearer" and secrets.compare_digest(token.strip(), AGENT_TOKEN):
+        return None
+    if current_user is None:
+        raise HTTPException(status_code=401, detail="Authentication required")
+    if current_user.role not in (UserRole.admin, UserRole.user):
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    return current_user
+
+
+def _parse_fields(fields: str | None) -> list[str]:
+    """Список колонок для выборки; неизвестное поле — 400."""
+    if not fields or not fields.strip():
+        return list(ASSET_FIELDS)
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in ASSET_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Неизвестные поля: {', '.join(unknown)}")
+    return ["id"] + [f for f in dict.fromkeys(requested) if f != "id"]
+
+
+def _parse_cursor(cursor: str | None) -> int | None:
+    if not cursor:
+        return None
+    try:
+        return int(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Некорректный cursor")
+
+
+def _split_page(rows: list, limit: int, last_id) -> tuple[list, str | None]:
+    """Отрезает лишнюю (limit + 1) строку и возвращает курсор следующей страницы."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, str(last_id(rows[-1]))
+
+
+@router.post("/auth/token", response_model=TokenOut)
+async def api_token(payload: TokenRequest, db: AsyncSession = Depends(get_db)):
+    """Токен для Authorization: Bearer (тот же, что в cookie сессии, срок — 7 дней)."""
+    result = await db.execute(select(User).where(User.username == payload.username))
+    user = result.scalar_one_or_none()
+    if not user or not check_password_hash(user.password_hash, payload.password):
+        raise HTTPException(status_code=401, detail="Неверный логин или пароль")
+    if not getattr(user, "is_active", True):
+        raise HTTPException(status_code=403, detail="Учётная запись заблокирована")
+    return TokenOut(access_token=create_session_token(user.id), expires_in=SESSION_MAX_AGE)
+
+
+@router.get("/assets", response_model=AssetPage, response_model_exclude_unset=True)
+async def api_assets(
+    query: Annotated[AssetListQuery, Query()],
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_user),
+):
+    """Техника по фильтрам расширенного поиска в порядке id; выбираются только колонки из fields."""
+    rows = await asset_repo.get_assets_page(
+        db, _parse_fields(query.fields), after_id=_parse_cursor(query.cursor), limit=query.limit,
+        **query.repo_kwargs(),
+    )
+    rows, next_cursor = _split_page(rows, query.limit, lambda row: row["id"])
+    return AssetPage(items=[AssetOut.model_validate(row) for row in rows], next_cursor=next_cursor)
+
+
+@router.post("/assets/bulk-update", response_model=BulkEditResult)
+async def api_assets_bulk_update(
+    payload: BulkEditRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(UserRole.admin, UserRole.user)),
+):
+    """Одно изменение (статус, расположение, организация, пользователь) для списка ids или результата фильтра."""
+    if (payload.ids is None) == (payload.filter is None):
+        raise HTTPException(status_code=400, detail="Укажите либо ids, либо filter")
+    data = payload.changes.to_data()
+    if not data:
+        raise HTTPException(status_code=400, detail="Нет изменений")
+    if "status" in data and data["status"] is None:
+        raise HTTPException(status_code=400, detail="Статус не может быть пустым")
+    try:
+        result = await bulk_edit_assets(
+            db, data, current_user.id,
+            asset_ids=list(dict.fromkeys(payload.ids)) if payload.ids is not None else None,
+            filters=payload.filter.repo_kwargs() if payload.filter is not None else None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await db.commit()
+    return BulkEditResult(**result)
+
+
+@router.get("/assets/{asset_id}", response_model=AssetOut, response_model_exclude_unset=True)
+async def api_asset(
+    asset_id: int,
+    fields: FieldsQuery = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_user),
+):
+    row = await asset_repo.get_asset_fields(db, asset_id, _parse_fields(fields))
+    if row is None:
+        raise HTTPException(status_code=404, detail="Оборудование не найдено")
+    return AssetOut.model_validate(row)
+
+
+@router.get("/assets/{asset_id}/events", response_model=AssetEventPage)
+async def api_asset_events(
+    asset_id: int,
+    cursor: CursorQuery = None,
+    limit: LimitQuery = PAGE_LIMIT_DEFAULT,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_user),
+):
+    """История актива от старых событий к новым."""
+    if await asset_repo.get_asset_fields(db, asset_id, ["id"]) is None:
+        raise HTTPException(status_code=404, detail="Оборудование не найдено")
+    events = await asset_repo.get_asset_events_page(db, asset_id, after_id=_parse_cursor(cursor), limit=limit)
+    events, next_cursor = _split_page(events, limit, lambda e: e.id)
+    return AssetEventPage(items=[AssetEventOut.model_validate(e) for e in events], next_cursor=next_cursor)
+
+
+@router.get("/companies", response_model=list[CompanyOut])
+async def api_companies(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_user),
+):
+    return await reference_repo.get_companies_ordered(db)
+
+
+@router.get("/companies/{company_id}", response_model=CompanyOut)
+async def api_company(
+    company_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_user),
+):
+    company = await reference_repo.get_company_by_id(db, company_id)
+    if company is None:
+        raise HTTPException(status_code=404, detail="Организация не найдена")
+    return company
+
+
+@router.get("/campaigns", response_model=list[CampaignOut])
+async def api_campaigns(
+    company_id: int | None = None,
+    active: bool = Query(False, description="Только незавершённые"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_user),
+):
+    return await inventory_repo.get_campaigns(db, company_id=company_id, active_only=active)
+
+
+@router.post("/heartbeat", response_model=HeartbeatAccepted, status_code=202, dependencies=[Depends(require_agent)])
+async def api_heartbeat(payload: Annotated[HeartbeatPing | list[HeartbeatPing], Body()]):
+    """
+    Одна отметка или массив. Отметки копятся в памяти и пишутся в last_seen_at пакетно
+    (heartbeat_service.flush_loop), поэтому ответ не ждёт БД.
+    """
+    pings = payload if isinstance(payload, list) else [payload]
+    if len(pings) > HEARTBEAT_MAX_BATCH:
+        raise HTTPException(status_code=413, detail=f"Не больше {HEARTBEAT_MAX_BATCH} отметок за запрос")
+    accepted = sum(heartbeat_buffer.add(p.asset_id, p.serial_number, p.ip, p.seen_at) for p in pings)
+    return HeartbeatAccepted(accepted=accepted, rejected=len(pings) - accepted, pending=heartbeat_buffer.pending())
+
+
+@router.post("/hardware-reports", response_model=HardwareIngestResult)
+async def api_hardware_reports(
+    payload: Annotated[HardwareReport | list[HardwareReport], Body()],
+    db: AsyncSession = Depends(get_db),
+    agent_user: User | None = Depends(require_agent),
+):
+    """
+    Отчёты агентов об оборудовании (один или массив). Пишутся только изменившиеся карточки,
+    с событием «было → стало»; повтор того же отчёта сводится к сравнению хеша.
+    """
+    reports = payload if isinstance(payload, list) else [payload]
+    if len(reports) > HW_REPORT_MAX_BATCH:
+        raise HTTPException(status_code=413, detail=f"Не больше {HW_REPORT_MAX_BATCH} отчётов за запрос")
+    result = await ingest_hw_reports(db, reports, created_by_id=agent_user.id if agent_user else None)
+    await db.commit()
+    return HardwareIngestResult(**result)
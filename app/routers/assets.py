@@ -8,10 +8,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import INACTIVE_DAYS_THRESHOLD, MAX_IMPORT_SIZE_MB
 from app.repositories import asset_repo, reference_repo, inventory_repo
-from app.services.attachments_service import get_qr_path
+from app.utils.asset_changes import build_asset_changes
 from app.utils.asset_helpers import is_asset_inactive
 from app.constants import (
-    ASSET_FIELD_LABELS,
     EQUIPMENT_KIND_CHOICES,
     EQUIPMENT_KIND_HAS_MANUFACTURE_DATE,
     EQUIPMENT_KIND_HAS_OS,
@@ -33,7 +32,13 @@ from app.models.user import User, UserRole
 from app.templates_ctx import templates
 from app.services.assets_service import create_asset as service_create_asset, update_asset as service_update_asset, delete_asset as service_delete_asset
 from app.services.export_xlsx import export_assets_xlsx
-from app.services.import_xlsx import parse_import_xlsx, build_import_template_xlsx
+from app.services.import_report import build_import_report_xlsx, iter_import_report_csv
+from app.services.import_service import import_assets
+from app.services.import_sources import IMPORT_EXTENSIONS, import_file_extension, parse_import_files
+from app.services.import_xlsx import build_import_template_xlsx
+from app.services.data_version_service import page_validators
+from app.utils.fragment_cache import fragment_cache, fragment_key, render_fragment
+from app.utils.ip_addresses import ip_range
 
 router = APIRouter(prefix="", tags=["assets"])
 
@@ -51,12 +56,26 @@ async def assets_list(
     company_id: str | None = Query(None),
     sort: str | None = Query("newest", description="Сортировка по дате добавления: newest / oldest"),
 ):
-    assets = await asset_repo.get_assets_list(
-        db, name=name, status=status, inactive_by_activity=inactive_by_activity,
+    validators = await page_validators(db, request, current_user)
+    if validators.is_fresh(request):
+        return validators.not_modified()
+    key = fragment_key(
+        "assets_table", request, validators.data_key, name=name, status=status, inactive_by_activity=inactive_by_activity,
         equipment_kind=equipment_kind, location=location, company_id=company_id, sort=sort,
     )
-    if inactive_by_activity:
-        assets = [a for a in assets if is_asset_inactive(a)]
+    table_html = fragment_cache.get(key)
+    if table_html is None:
+        assets = await asset_repo.get_assets_list(
+            db, name=name, status=status, inactive_by_activity=inactive_by_activity,
+            equipment_kind=equipment_kind, location=location, company_id=company_id, sort=sort,
+        )
+        # Неактивность считается один раз на строку (и для таблицы, и для мобильных карточек)
+        inactive_ids = {a.id for a in assets if is_asset_inactive(a)}
+        if inactive_by_activity:
+            assets = [a for a in assets if a.id in inactive_ids]
+        table_html = fragment_cache.put(key, render_fragment(
+            "partials/assets_table.html", {"request": request, "assets": assets, "inactive_ids": inactive_ids},
+        ))
     companies = await reference_repo.get_companies_ordered(db)
     location_choices = await asset_repo.get_distinct_locations(db)
     sort_val = "newest" if sort not in ("newest", "oldest") else sort
@@ -75,24 +94,27 @@ async def assets_list(
     }
     base_export_url = request.url_for("assets_export")
     export_url = str(base_export_url.include_query_params(**qp)) if qp else str(base_export_url)
-    return templates.TemplateResponse(
+    labels_qp = {k: v for k, v in qp.items() if k != "sort"}
+    base_labels_url = request.url_for("qr_labels_pdf")
+    labels_url = str(base_labels_url.include_query_params(**labels_qp)) if labels_qp else str(base_labels_url)
+    return validators.apply(templates.TemplateResponse(
         "assets_list.html",
         {
             "request": request,
             "user": current_user,
-            "assets": assets,
+            "table_html": table_html,
             "companies": companies,
             "location_choices": location_choices,
             "export_url": export_url,
+            "labels_url": labels_url,
             "filters": {"name": name, "status": status, "inactive_by_activity": inactive_by_activity, "equipment_kind": equipment_kind, "location": location or "", "company_id": company_id or "", "sort": sort_val},
             "status_choices": AssetStatus,
             "status_labels": STATUS_LABELS,
             "equipment_kind_choices": EQUIPMENT_KIND_CHOICES,
             "equipment_kind_labels": EQUIPMENT_KIND_LABELS,
-            "is_inactive_fn": is_asset_inactive,
             "inactive_days_threshold": INACTIVE_DAYS_THRESHOLD,
         },
-    )
+    ))
 
 
 @router.get("/assets/advanced-search", name="assets_advanced_search", include_in_schema=False)
@@ -121,6 +143,14 @@ async def assets_advanced_search(
     rack_units: str | None = Query(None),
     manufacture_from: str | None = Query(None, description="Дата выпуска с (YYYY-MM-DD)"),
     manufacture_to: str | None = Query(None, description="Дата выпуска по (YYYY-MM-DD)"),
+    ram_gb_from: str | None = Query(None, description="ОЗУ от, ГБ"),
+    ram_gb_to: str | None = Query(None, description="ОЗУ до, ГБ"),
+    disk_gb_from: str | None = Query(None, description="Объём диска от, ГБ"),
+    disk_gb_to: str | None = Query(None, description="Объём диска до, ГБ"),
+    diagonal_from: str | None = Query(None, description="Диагональ от, дюймы"),
+    diagonal_to: str | None = Query(None, description="Диагональ до, дюймы"),
+    ip: str | None = Query(None, description="IP-адрес или подсеть CIDR"),
+    component_type: str | None = Query(None, description="Есть доп. устройство этого типа"),
 ):
     from datetime import date as _date
 
@@ -159,6 +189,14 @@ async def assets_advanced_search(
         rack_units=rack_units,
         manufacture_date_from=md_from,
         manufacture_date_to=md_to,
+        ram_gb_from=ram_gb_from,
+        ram_gb_to=ram_gb_to,
+        disk_gb_from=disk_gb_from,
+        disk_gb_to=disk_gb_to,
+        diagonal_from=diagonal_from,
+        diagonal_to=diagonal_to,
+        ip=ip,
+        component_type=component_type,
     )
     companies = await reference_repo.get_companies_ordered(db)
     location_choices = await asset_repo.get_distinct_locations(db)
@@ -186,11 +224,21 @@ async def assets_advanced_search(
             ("rack_units", rack_units),
             ("manufacture_from", manufacture_from),
             ("manufacture_to", manufacture_to),
+            ("ram_gb_from", ram_gb_from),
+            ("ram_gb_to", ram_gb_to),
+            ("disk_gb_from", disk_gb_from),
+            ("disk_gb_to", disk_gb_to),
+            ("diagonal_from", diagonal_from),
+            ("diagonal_to", diagonal_to),
+            ("ip", ip),
+            ("component_type", component_type),
         ]
         if v is not None and v != ""
     }
     base_export_url = request.url_for("assets_advanced_search_export")
     export_url = str(base_export_url.include_query_params(**qp)) if qp else str(base_export_url)
+    base_bulk_url = request.url_for("assets_bulk_edit")
+    bulk_edit_url = str(base_bulk_url.include_query_params(**qp)) if qp else str(base_bulk_url)
     return templates.TemplateResponse(
         "assets_advanced_search.html",
         {
@@ -200,6 +248,8 @@ async def assets_advanced_search(
             "companies": companies,
             "location_choices": location_choices,
             "export_url": export_url,
+            "bulk_edit_url": bulk_edit_url,
+            "ip_error": bool(ip and ip.strip()) and ip_range(ip) is None,
             "filters": {
                 "name": name or "",
                 "status": status or "",
@@ -222,12 +272,21 @@ async def assets_advanced_search(
                 "rack_units": rack_units or "",
                 "manufacture_from": manufacture_from or "",
                 "manufacture_to": manufacture_to or "",
+                "ram_gb_from": ram_gb_from or "",
+                "ram_gb_to": ram_gb_to or "",
+                "disk_gb_from": disk_gb_from or "",
+                "disk_gb_to": disk_gb_to or "",
+                "diagonal_from": diagonal_from or "",
+                "diagonal_to": diagonal_to or "",
+                "ip": ip or "",
+                "component_type": component_type or "",
             },
             "status_choices": AssetStatus,
             "status_labels": STATUS_LABELS,
             "equipment_kind_choices": EQUIPMENT_KIND_CHOICES,
             "equipment_kind_labels": EQUIPMENT_KIND_LABELS,
             "os_options": OS_OPTIONS,
+            "component_types": EXTRA_COMPONENT_TYPES,
         },
     )
 
@@ -257,6 +316,14 @@ async def assets_advanced_search_export(
     rack_units: str | None = Query(None),
     manufacture_from: str | None = Query(None),
     manufacture_to: str | None = Query(None),
+    ram_gb_from: str | None = Query(None, description="ОЗУ от, ГБ"),
+    ram_gb_to: str | None = Query(None, description="ОЗУ до, ГБ"),
+    disk_gb_from: str | None = Query(None, description="Объём диска от, ГБ"),
+    disk_gb_to: str | None = Query(None, description="Объём диска до, ГБ"),
+    diagonal_from: str | None = Query(None, description="Диагональ от, дюймы"),
+    diagonal_to: str | None = Query(None, description="Диагональ до, дюймы"),
+    ip: str | None = Query(None, description="IP-адрес или подсеть CIDR"),
+    component_type: str | None = Query(None, description="Есть доп. устройство этого типа"),
 ):
     from datetime import date as _date
 
@@ -295,6 +362,14 @@ async def assets_advanced_search_export(
         rack_units=rack_units,
         manufacture_date_from=md_from,
         manufacture_date_to=md_to,
+        ram_gb_from=ram_gb_from,
+        ram_gb_to=ram_gb_to,
+        disk_gb_from=disk_gb_from,
+        disk_gb_to=disk_gb_to,
+        diagonal_from=diagonal_from,
+        diagonal_to=diagonal_to,
+        ip=ip,
+        component_type=component_type,
     )
     buf = export_assets_xlsx(assets)
     return StreamingResponse(
@@ -337,6 +412,8 @@ async def assets_import_page(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(UserRole.admin, UserRole.user)),
     imported: int | None = Query(None),
+    updated: int | None = Query(None),
+    unchanged: int | None = Query(None),
     errors: str | None = Query(None),
 ):
     return templates.TemplateResponse(
@@ -345,9 +422,12 @@ async def assets_import_page(
             "request": request,
             "user": current_user,
             "imported_count": imported,
+            "updated_count": updated,
+            "unchanged_count": unchanged,
             "import_errors": errors or "",
             "status_options": list(STATUS_LABELS.values()),
             "equipment_kind_options": [c["label"] for c in EQUIPMENT_KIND_CHOICES],
+            "import_extensions": IMPORT_EXTENSIONS,
         },
     )
 
@@ -369,21 +449,35 @@ async def assets_import_upload(
     request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_role(UserRole.admin, UserRole.user)),
-    file: UploadFile = File(...),
+    file: list[UploadFile] = File(...),
+    mode: str = Form("create"),
+    all_sheets: bool = Form(False),
+    dry_run: bool = Form(False),
+    report_format: str = Form("csv"),
 ):
+    """
+    Один или несколько файлов (поле file повторяется) — один пакет и одна транзакция.
+    mode: create — существующие серийные номера пропускаются; upsert — обновляются изменившиеся поля.
+    all_sheets — все листы книг, иначе только активный (первый).
+    dry_run — только проверка: ничего не записывается, в ответ — отчёт по каждой строке (CSV или XLSX).
+    """
     base = request.url_for("assets_import")
-    if not file.filename or not file.filename.lower().endswith(".xlsx"):
-        return RedirectResponse(
-            str(base.include_query_params(errors="Выберите файл Excel")),
-            status_code=302,
-        )
-    content = await file.read()
-    if len(content) > MAX_IMPORT_SIZE_MB * 1024 * 1024:
+    if any(import_file_extension(f.filename) is None for f in file):
         return RedirectResponse(
-            str(base.include_query_params(errors=f"Файл слишком большой (макс. {MAX_IMPORT_SIZE_MB} МБ)")),
+            str(base.include_query_params(errors=f"Выберите файл: {', '.join(IMPORT_EXTENSIONS)}")),
             status_code=302,
         )
-    rows, parse_errors = parse_import_xlsx(content)
+    uploads, total_size = [], 0
+    for f in file:
+        content = await f.read()
+        total_size += len(content)
+        if total_size > MAX_IMPORT_SIZE_MB * 1024 * 1024:
+            return RedirectResponse(
+                str(base.include_query_params(errors=f"Файлы слишком большие (макс. {MAX_IMPORT_SIZE_MB} МБ всего)")),
+                status_code=302,
+            )
+        uploads.append((f.filename, content))
+    rows, parse_errors = await parse_import_files(uploads, all_sheets=all_sheets)
     if parse_errors:
         err_str = "; ".join(parse_errors[:5])
         if len(parse_errors) > 5:
@@ -397,81 +491,37 @@ async def assets_import_upload(
             str(base.include_query_params(errors="Нет строк для импорта (обязателен столбец Название)")),
             status_code=302,
         )
-    existing_serials = await asset_repo.get_existing_serial_numbers(db)
-    seen_serials_in_batch = set()
-    imported = 0
-    skip_messages = []
-    for idx, r in enumerate(rows, start=2):
-        serial = (r.get("serial_number") or "").strip()
-        if serial:
-            if serial in existing_serials:
-                skip_messages.append(f"Строка {idx}: серийный номер «{serial}» уже есть в базе")
-                continue
-            if serial in seen_serials_in_batch:
-                skip_messages.append(f"Строка {idx}: серийный номер «{serial}» повторяется в файле")
-                continue
-        try:
-            company_id = None
-            if r.get("company_name"):
-                company = await reference_repo.find_company_by_name(db, r["company_name"].strip())
-                if company:
-                    company_id = company.id
-            equipment_kind_val = r.get("equipment_kind")
-            equipment_kind_enum = None
-            if equipment_kind_val:
-                try:
-                    equipment_kind_enum = EquipmentKind(equipment_kind_val)
-                except ValueError:
-                    pass
-            data = {
-                "name": r["name"],
-                "model": r.get("model"),
-                "equipment_kind": equipment_kind_enum,
-                "serial_number": serial or None,
-                "location": r.get("location") or None,
-                "status": r["status"],
-                "asset_type": r.get("asset_type"),
-                "description": r.get("description"),
-                "company_id": company_id,
-                "current_user": r.get("current_user"),
-                "cpu": r.get("cpu"),
-                "ram": r.get("ram"),
-                "disk1_type": r.get("disk1_type"),
-                "disk1_capacity": r.get("disk1_capacity"),
-                "network_card": r.get("network_card"),
-                "motherboard": r.get("motherboard"),
-                "os": r.get("os"),
-                "power_supply": r.get("power_supply"),
-                "screen_diagonal": r.get("screen_diagonal"),
-                "screen_resolution": r.get("screen_resolution"),
-                "monitor_diagonal": r.get("monitor_diagonal"),
-                "rack_units": r.get("rack_units"),
-                "manufacture_date": r.get("manufacture_date"),
-            }
-            await service_create_asset(db, data, current_user.id, event_description="Импорт из Excel")
-            imported += 1
-            if serial:
-                existing_serials.add(serial)
-                seen_serials_in_batch.add(serial)
-        except IntegrityError as e:
-            await db.rollback()
-            msg = "Серийный номер уже существует в базе" if "serial_number" in str(e.orig) else str(e.orig)
-            return RedirectResponse(
-                str(base.include_query_params(errors=f"Строка {idx}: {msg}")),
-                status_code=302,
+    try:
+        result = await import_assets(db, rows, current_user.id, mode=mode, dry_run=dry_run)
+    except ValueError as e:
+        return RedirectResponse(str(base.include_query_params(errors=str(e))), status_code=302)
+    except IntegrityError as e:
+        await db.rollback()
+        msg = "Серийный номер уже существует в базе" if "serial_number" in str(e.orig) else str(e.orig)
+        return RedirectResponse(str(base.include_query_params(errors=msg)), status_code=302)
+    if dry_run:
+        if report_format == "xlsx":
+            return StreamingResponse(
+                build_import_report_xlsx(result["report"]),
+                media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                headers={"Content-Disposition": "attachment; filename=import_check.xlsx"},
             )
+        return StreamingResponse(
+            iter_import_report_csv(result["report"]),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": "attachment; filename=import_check.csv"},
+        )
+    await db.commit()
+    params = {"imported": result["created"]}
+    if mode == "upsert":
+        params.update(updated=result["updated"], unchanged=result["unchanged"])
+    skip_messages = result["messages"]
     if skip_messages:
         err_param = "; ".join(skip_messages[:5])
         if len(skip_messages) > 5:
             err_param += f" (пропущено {len(skip_messages)} строк)"
-        return RedirectResponse(
-            str(request.url_for("assets_import").include_query_params(imported=imported, errors=err_param)),
-            status_code=302,
-        )
-    return RedirectResponse(
-        str(request.url_for("assets_import").include_query_params(imported=imported)),
-        status_code=302,
-    )
+        params["errors"] = err_param
+    return RedirectResponse(str(base.include_query_params(**params)), status_code=302)
 
 
 @router.get("/assets/{asset_id:int}", name="asset_detail", include_in_schema=False)
@@ -494,9 +544,8 @@ async def asset_detail(
                 e.changes_list = _json.loads(e.changes_json)
             except (TypeError, ValueError, _json.JSONDecodeError):
                 pass
-    extra_components_list = _parse_extra_components(asset)
+    extra_components_list = asset.components
     component_type_labels = {t["value"]: t["label"] for t in EXTRA_COMPONENT_TYPES}
-    qr_path = get_qr_path(asset.id)
     network_interfaces_list = _parse_network_interfaces(asset)
     os_labels = {o["value"]: o["label"] for o in OS_OPTIONS}
 
@@ -520,7 +569,6 @@ async def asset_detail(
             "equipment_kind_labels": EQUIPMENT_KIND_LABELS,
             "extra_components_list": extra_components_list,
             "component_type_labels": component_type_labels,
-            "qr_exists": qr_path.exists(),
             "inventory_campaign": inventory_campaign,
             "inventory_item": inventory_item,
             "network_interfaces_list": network_interfaces_list,
@@ -595,97 +643,6 @@ def _parse_asset_form(
     return data
 
 
-def _parse_extra_components(asset):
-    import json
-    if not getattr(asset, "extra_components", None):
-        return []
-    try:
-        return json.loads(asset.extra_components)
-    except (json.JSONDecodeError, TypeError):
-        return []
-
-
-def _format_event_value(val) -> str:
-    if val is None:
-        return "—"
-    if hasattr(val, "value"):
-        return str(val.value)
-    if hasattr(val, "isoformat"):
-        return val.isoformat()[:19].replace("T", " ")
-    return str(val)
-
-
-def _format_network_interfaces_for_changes(json_str) -> str:
-    import json
-    if not json_str:
-        return "—"
-    try:
-        arr = json.loads(json_str)
-        if not isinstance(arr, list) or not arr:
-            return "—"
-        parts = []
-        for x in arr:
-            label = str(x.get("label") or "Интерфейс").strip()
-            ip = str(x.get("ip") or "").strip()
-            kind = str(x.get("type") or "network")
-            if kind == "oob":
-                parts.append(f"OOB: {ip}" if ip else "OOB")
-            else:
-                parts.append(f"{label}: {ip}" if ip else label)
-        return "; ".join(parts)
-    except (TypeError, json.JSONDecodeError):
-        return "—"
-
-
-def _format_extra_components_for_changes(json_str) -> str:
-    import json
-    if not json_str:
-        return "—"
-    try:
-        arr = json.loads(json_str)
-        if not isinstance(arr, list) or not arr:
-            return "—"
-        type_labels = {t["value"]: t["label"] for t in EXTRA_COMPONENT_TYPES}
-        parts = []
-        for x in arr:
-            t = x.get("type") or "other"
-            name = (x.get("name") or "").strip()
-            lbl = type_labels.get(t, t)
-            parts.append(f"{lbl}: {name}" if name else lbl)
-        return "; ".join(parts)
-    except (TypeError, json.JSONDecodeError):
-        return "—"
-
-
-def _build_asset_changes(asset: Asset, data: dict) -> list[dict]:
-    import json
-    changes = []
-    for key, new_val in data.items():
-        if key == "extra_components":
-            old_raw = getattr(asset, key, None)
-            old_str = _format_extra_components_for_changes(old_raw)
-            new_str = _format_extra_components_for_changes(new_val)
-            if old_str != new_str:
-                changes.append({"field_label": ASSET_FIELD_LABELS.get(key, key), "old": old_str, "new": new_str})
-            continue
-        if key == "network_interfaces":
-            old_raw = getattr(asset, key, None)
-            old_str = _format_network_interfaces_for_changes(old_raw)
-            new_str = _format_network_interfaces_for_changes(new_val)
-            if old_str != new_str:
-                changes.append({"field_label": ASSET_FIELD_LABELS.get(key, key), "old": old_str, "new": new_str})
-            continue
-        old_val = getattr(asset, key, None)
-        if old_val == new_val:
-            continue
-        old_str = _format_event_value(old_val)
-        new_str = _format_event_value(new_val)
-        if old_str == new_str:
-            continue
-        changes.append({"field_label": ASSET_FIELD_LABELS.get(key, key), "old": old_str, "new": new_str})
-    return changes
-
-
 def _parse_network_interfaces(asset) -> list[dict]:
     import json
     if not getattr(asset, "network_interfaces", None):
@@ -788,6 +745,7 @@ async def asset_edit_form(
     if asset.deleted_at:
         return RedirectResponse(url=f"/assets/{asset_id}", status_code=302)
     companies = await reference_repo.get_companies_ordered(db)
+    components = await asset_repo.get_asset_components(db, asset_id)
     return templates.TemplateResponse(
         "asset_form.html",
         {
@@ -804,7 +762,7 @@ async def asset_edit_form(
             "equipment_kind_has_os": EQUIPMENT_KIND_HAS_OS,
             "equipment_kind_has_manufacture_date": EQUIPMENT_KIND_HAS_MANUFACTURE_DATE,
             "extra_component_types": EXTRA_COMPONENT_TYPES,
-            "extra_components_list": _parse_extra_components(asset),
+            "extra_components_list": [{"type": c.type, "name": c.name or ""} for c in components],
             "os_options": OS_OPTIONS,
             "network_interfaces_list": _parse_network_interfaces(asset),
         },
@@ -856,7 +814,7 @@ async def asset_edit(
         os=os, network_interfaces_json=network_interfaces, current_user=assigned_user,
         manufacture_date=manufacture_date,
     )
-    changes = _build_asset_changes(asset, data)
+    changes = build_asset_changes(asset, data)
     try:
         await service_update_asset(db, asset, data, changes, current_user.id)
     except ValueError as e:
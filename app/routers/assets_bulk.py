@@ -0,0 +1,115 @@
+"""Массовое изменение техники: одно изменение для результата расширенного поиска или списка id."""
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, Depends, Form, HTTPException, Request
+from fastapi.responses import RedirectResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth import require_role
+from app.constants import STATUS_LABELS
+from app.database import get_db
+from app.models.asset import AssetStatus
+from app.models.user import User, UserRole
+from app.repositories import asset_repo, reference_repo
+from app.schemas.api import AssetSearchFilter
+from app.services.assets_service import bulk_edit_assets
+from app.templates_ctx import templates
+
+router = APIRouter(prefix="", tags=["assets_bulk"])
+
+# Query-параметры с итогом предыдущего применения (не фильтры)
+RESULT_PARAMS = ("updated", "unchanged", "skipped")
+
+
+def _targets_from_query(request: Request) -> tuple[list[int] | None, dict, str]:
+    """Список id (ids=1,2,3) или фильтры расширенного поиска из query-строки; плюс сама строка без итогов."""
+    params = {k: v for k, v in request.query_params.items() if k not in RESULT_PARAMS and v != ""}
+    query = urlencode(params)
+    if params.get("ids"):
+        try:
+            return list(dict.fromkeys(int(x) for x in params["ids"].split(",") if x.strip())), {}, query
+        except ValueError:
+            raise HTTPException(400, "Некорректный список ids")
+    try:
+        return None, AssetSearchFilter.model_validate(params).repo_kwargs(), query
+    except ValidationError:
+        raise HTTPException(400, "Некорректные параметры фильтра")
+
+
+@router.get("/assets/bulk-edit", name="assets_bulk_edit", include_in_schema=False)
+async def assets_bulk_edit_form(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(UserRole.admin, UserRole.user)),
+):
+    asset_ids, filters, query = _targets_from_query(request)
+    rows = await asset_repo.get_bulk_edit_targets(db, ["status"], asset_ids, **filters)
+    result = None
+    if "updated" in request.query_params:
+        result = {k: request.query_params.get(k, "0") for k in RESULT_PARAMS}
+    return templates.TemplateResponse(
+        "assets_bulk_edit.html",
+        {
+            "request": request,
+            "user": current_user,
+            "matched": len(rows),
+            "retired": sum(1 for r in rows if r.status == AssetStatus.retired),
+            "query": query,
+            "result": result,
+            "companies": await reference_repo.get_companies_ordered(db),
+            "status_choices": AssetStatus,
+            "status_labels": STATUS_LABELS,
+        },
+    )
+
+
+@router.post("/assets/bulk-edit", name="assets_bulk_edit_post", include_in_schema=False)
+async def assets_bulk_edit(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(UserRole.admin, UserRole.user)),
+    status: str | None = Form(None),
+    company_id: str | None = Form(None),
+    location: str | None = Form(None),
+    clear_location: bool = Form(False),
+    assigned_user: str | None = Form(None),
+    clear_assigned_user: bool = Form(False),
+):
+    """Пустое поле — «не менять»; company_id=none и флажки «очистить» — сбросить значение."""
+    asset_ids, filters, query = _targets_from_query(request)
+    data = {}
+    if status:
+        try:
+            data["status"] = AssetStatus(status)
+        except ValueError:
+            raise HTTPException(400, "Некорректный статус")
+    if company_id == "none":
+        data["company_id"] = None
+    elif company_id:
+        try:
+            data["company_id"] = int(company_id)
+        except ValueError:
+            raise HTTPException(400, "Некорректная организация")
+    if clear_location:
+        data["location"] = None
+    elif location and location.strip():
+        data["location"] = location.strip()
+    if clear_assigned_user:
+        data["current_user"] = None
+    elif assigned_user and assigned_user.strip():
+        data["current_user"] = assigned_user.strip()
+    if not data:
+        return RedirectResponse(url=f"{request.url_for('assets_bulk_edit')}?{query}", status_code=302)
+    try:
+        result = await bulk_edit_assets(db, data, current_user.id, asset_ids=asset_ids, filters=filters)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    await db.commit()
+    summary = urlencode({
+        "updated": result["updated"], "unchanged": result["unchanged"], "skipped": result["skipped_retired"],
+    })
+    return RedirectResponse(
+        url=f"{request.url_for('assets_bulk_edit')}?{'&'.join(filter(None, [query, summary]))}",
+        status_code=302,
+    )
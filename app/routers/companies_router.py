@@ -9,6 +9,7 @@ from app.models.user import UserRole, User
 from app.templates_ctx import templates
 from app.repositories import asset_repo, reference_repo
 from app.services.company_service import create_company, update_company, delete_company
+from app.services.data_version_service import company_scope, page_validators
 
 router = APIRouter(prefix="", tags=["companies"])
 
@@ -36,8 +37,11 @@ async def company_detail(
     company = await reference_repo.get_company_by_id(db, company_id)
     if not company:
         raise HTTPException(404, "Organization not found")
+    validators = await page_validators(db, request, current_user, company_scope(company_id), time_dependent=False)
+    if validators.is_fresh(request):
+        return validators.not_modified()
     summary = await asset_repo.get_company_asset_summary(db, company_id)
-    return templates.TemplateResponse(
+    return validators.apply(templates.TemplateResponse(
         "company_detail.html",
         {
             "request": request,
@@ -45,7 +49,7 @@ async def company_detail(
             "company": company,
             "summary": summary,
         },
-    )
+    ))
 
 
 @router.get("/companies/create", name="company_create", include_in_schema=False)
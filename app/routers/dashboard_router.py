@@ -9,6 +9,7 @@ from app.auth import require_user
 from app.models.user import User
 from app.templates_ctx import templates
 from app.repositories import asset_repo, inventory_repo
+from app.services.data_version_service import page_validators
 
 router = APIRouter(prefix="", tags=["pages"])
 
@@ -35,6 +36,9 @@ async def dashboard(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_user),
 ):
+    validators = await page_validators(db, request, current_user)
+    if validators.is_fresh(request):
+        return validators.not_modified()
     now = datetime.utcnow()
     threshold_7 = now - timedelta(days=7)
 
@@ -119,7 +123,7 @@ async def dashboard(
     if alert_movements > 0:
         alert_lines.append(f"{alert_movements} {_plural(alert_movements, 'перемещение', 'перемещения', 'перемещений')} ожидают подтверждения")
 
-    return templates.TemplateResponse(
+    return validators.apply(templates.TemplateResponse(
         "dashboard.html",
         {
             "request": request,
@@ -139,4 +143,4 @@ async def dashboard(
             "chart_inactivity": chart_inactivity,
             "alert_lines": alert_lines,
         },
-    )
+    ))
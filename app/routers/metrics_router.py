@@ -0,0 +1,84 @@
+"""
+Метрики производительности: /metrics (формат Prometheus) и страница админки /admin/metrics.
+"""
+import secrets
+
+from fastapi import APIRouter, Depends, Request, HTTPException
+from fastapi.responses import PlainTextResponse, RedirectResponse
+
+from app import metrics
+from app.auth import get_optional_user, require_role
+from app.config import METRICS_TOKEN
+from app.models import User
+from app.models.user import UserRole
+from app.templates_ctx import templates
+from app.utils.fragment_cache import fragment_cache
+
+router = APIRouter(prefix="", tags=["metrics"])
+
+
+def _has_metrics_token(request: Request) -> bool:
+    if not METRICS_TOKEN:
+        return False
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    return scheme.lower() == "bearer" and secrets.compare_digest(token.strip(), METRICS_TOKEN)
+
+
+@router.get("/metrics", name="metrics", include_in_schema=False)
+async def metrics_endpoint(
+    request: Request,
+    current_user: User | None = Depends(get_optional_user),
+):
+    """Метрики для Prometheus: доступ по токену METRICS_TOKEN или для администратора."""
+    if not _has_metrics_token(request):
+        if current_user is None:
+            raise HTTPException(status_code=401, detail="Authentication required")
+        if current_user.role != UserRole.admin:
+            raise HTTPException(status_code=403, detail="Insufficient permissions")
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/admin/metrics", name="admin_metrics", include_in_schema=False)
+async def admin_metrics_page(
+    request: Request,
+    sort: str = "total",
+    current_user: User = Depends(require_role(UserRole.admin)),
+):
+    """Таблица маршрутов: число запросов, латентность, SQL-запросы, рендер шаблонов, размер ответов."""
+    rows = []
+    for (method, route), rs in metrics.merged_snapshot().items():
+        p95 = rs.quantile(0.95)
+        rows.append({
+            "method": method,
+            "route": route,
+            "count": rs.count,
+            "total_ms": rs.latency_sum * 1000,
+            "avg_ms": rs.latency_sum / rs.count * 1000,
+            "p95_ms": p95 * 1000 if p95 != float("inf") else None,
+            "avg_queries": rs.db_queries / rs.count,
+            "max_queries": rs.db_queries_max,
+            "avg_db_ms": rs.db_time / rs.count * 1000,
+            "avg_template_ms": rs.template_time / rs.count * 1000,
+            "avg_kb": rs.response_bytes / rs.count / 1024,
+            "errors": rs.errors,
+        })
+    sort_keys = {"total": "total_ms", "avg": "avg_ms", "queries": "max_queries", "count": "count"}
+    rows.sort(key=lambda r: r[sort_keys.get(sort, "total_ms")], reverse=True)
+    return templates.TemplateResponse(
+        "admin_metrics.html",
+        {
+            "request": request,
+            "user": current_user,
+            "rows": rows,
+            "sort": sort,
+            "fragment_cache": fragment_cache,
+        },
+    )
+
+
+@router.post("/admin/metrics/reset", name="admin_metrics_reset", include_in_schema=False)
+async def admin_metrics_reset(
+    current_user: User = Depends(require_role(UserRole.admin)),
+):
+    metrics.reset()
+    return RedirectResponse(url="/admin/metrics", status_code=302)
@@ -1,48 +1,101 @@
-"""Генерация и выдача QR-кодов, страница сканирования."""
-from fastapi import APIRouter, Depends, Request, HTTPException
-from fastapi.responses import RedirectResponse, FileResponse
+"""Выдача QR-кодов (рендер на лету), листы этикеток, страница сканирования."""
+import asyncio
+
+from fastapi import APIRouter, Depends, Request, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import MAX_QR_LABELS
 from app.database import get_db
 from app.auth import require_user
 from app.models.user import User
 from app.templates_ctx import templates
 from app.repositories import asset_repo, inventory_repo
-from app.services.attachments_service import generate_qr_for_asset, get_qr_path
+from app.services.attachments_service import (
+    QR_MEDIA_TYPES,
+    asset_url,
+    build_labels_pdf,
+    qr_etag,
+    render_qr,
+)
+from app.utils.asset_helpers import is_asset_inactive
+from app.utils.http_cache import etag_matches
 
 router = APIRouter(prefix="", tags=["qr"])
 
+# QR зависит только от ссылки: браузеры и прокси могут не перезапрашивать его год
+QR_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
 
 @router.get("/assets/{asset_id:int}/qr-image", name="asset_qr_image", include_in_schema=False)
 async def asset_qr_image(
+    request: Request,
     asset_id: int,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_user),
+    format: str = Query("png", description="png или svg"),
 ):
-    """Отдаёт PNG QR-кода для актива (если сгенерирован)."""
-    path = get_qr_path(asset_id)
-    if not path.is_file():
-        raise HTTPException(404, "QR-код не сгенерирован")
+    """
+    QR-код актива, отрендеренный на лету (PNG или SVG) из id и base URL.
+    Содержимое неизменно для пары (ссылка, формат): ETag, Cache-Control immutable, 304 по If-None-Match
+    (слабое сравнение: сжатый SVG уходит с W/-ETag).
+    """
+    fmt = format if format in QR_MEDIA_TYPES else "png"
+    url = asset_url(str(request.base_url), asset_id)
+    etag = qr_etag(url, fmt)
+    headers = {"ETag": etag, "Cache-Control": QR_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
     if not await asset_repo.get_asset_by_id(db, asset_id):
         raise HTTPException(404, "Asset not found")
-    return FileResponse(path, media_type="image/png")
+    content = await asyncio.to_thread(render_qr, url, fmt)
+    return Response(content=content, media_type=QR_MEDIA_TYPES[fmt], headers=headers)
+
+
+async def _assets_for_filters(
+    db: AsyncSession,
+    name: str | None,
+    status: str | None,
+    inactive_by_activity: bool,
+    equipment_kind: str | None,
+    location: str | None,
+    company_id: str | None,
+):
+    """Активы по тем же фильтрам, что и список оборудования (организация, расположение и т.д.)."""
+    assets = await asset_repo.get_assets_list(
+        db, name=name, status=status, inactive_by_activity=inactive_by_activity,
+        equipment_kind=equipment_kind, location=location, company_id=company_id, sort="oldest",
+    )
+    if inactive_by_activity:
+        assets = [a for a in assets if is_asset_inactive(a)]
+    return assets
 
 
-@router.post("/assets/{asset_id:int}/generate-qr", name="asset_generate_qr", include_in_schema=False)
-async def asset_generate_qr(
+@router.get("/qr/labels.pdf", name="qr_labels_pdf", include_in_schema=False)
+async def qr_labels_pdf(
     request: Request,
-    asset_id: int,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_user),
+    name: str | None = Query(None),
+    status: str | None = Query(None),
+    inactive_by_activity: bool = Query(False),
+    equipment_kind: str | None = Query(None),
+    location: str | None = Query(None),
+    company_id: str | None = Query(None),
 ):
-    """Генерирует или перезаписывает QR-код для актива, редирект на карточку."""
-    if not await asset_repo.get_asset_by_id(db, asset_id):
-        raise HTTPException(404, "Asset not found")
+    """Листы QR-этикеток (PDF, A4) для результата фильтра: организация, расположение и т.д."""
+    assets = await _assets_for_filters(db, name, status, inactive_by_activity, equipment_kind, location, company_id)
+    if not assets:
+        raise HTTPException(404, "Нет оборудования для печати этикеток")
+    if len(assets) > MAX_QR_LABELS:
+        raise HTTPException(400, f"Слишком много этикеток за один раз (макс. {MAX_QR_LABELS}). Уточните фильтр.")
+    labels = [{"id": a.id, "name": a.name, "serial_number": a.serial_number} for a in assets]
     base_url = str(request.base_url).rstrip("/")
-    generate_qr_for_asset(asset_id, base_url)
-    return RedirectResponse(
-        request.url_for("asset_detail", asset_id=asset_id),
-        status_code=303,
+    buf = await build_labels_pdf(labels, base_url)
+    return StreamingResponse(
+        buf,
+        media_type="application/pdf",
+        headers={"Content-Disposition": "attachment; filename=qr_labels.pdf"},
     )
 
 
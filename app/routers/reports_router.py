@@ -13,6 +13,8 @@ from app.constants import EQUIPMENT_KIND_CHOICES, EQUIPMENT_KIND_LABELS, STATUS_
 from app.utils.asset_helpers import is_asset_inactive
 from app.repositories import asset_repo, reference_repo, inventory_repo
 from app.schemas.reports import EquipmentReportFilter, TrafficLightReportFilter
+from app.services.data_version_service import page_validators
+from app.utils.fragment_cache import fragment_cache, fragment_key, render_fragment
 from app.services.report_service import (
     build_traffic_light_rows,
     export_equipment_xlsx,
@@ -28,10 +30,13 @@ async def reports(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_user),
 ):
+    validators = await page_validators(db, request, current_user, time_dependent=False)
+    if validators.is_fresh(request):
+        return validators.not_modified()
     total_assets = await asset_repo.get_total_assets_count(db)
     status_counts = await asset_repo.get_asset_status_counts(db)
     total_campaigns = await inventory_repo.get_campaigns_count(db)
-    return templates.TemplateResponse(
+    return validators.apply(templates.TemplateResponse(
         "reports.html",
         {
             "request": request,
@@ -42,7 +47,7 @@ async def reports(
             "status_labels": STATUS_LABELS,
             "total_campaigns": total_campaigns,
         },
-    )
+    ))
 
 
 def _equipment_filter_from_query(
@@ -79,19 +84,29 @@ async def reports_equipment(
     company_id: str | None = Query(None),
     sort: str | None = Query("newest"),
 ):
+    validators = await page_validators(db, request, current_user)
+    if validators.is_fresh(request):
+        return validators.not_modified()
     filters = _equipment_filter_from_query(name, status, inactive_by_activity, equipment_kind, location, company_id, sort)
-    assets = await asset_repo.get_assets_list(
-        db,
-        name=filters.name,
-        status=filters.status,
-        inactive_by_activity=filters.inactive_by_activity,
-        equipment_kind=filters.equipment_kind,
-        location=filters.location,
-        company_id=filters.company_id,
-        sort=filters.sort_value(),
-    )
-    if filters.inactive_by_activity:
-        assets = [a for a in assets if is_asset_inactive(a)]
+    key = fragment_key("reports_equipment_table", request, validators.data_key, **filters.model_dump())
+    table_html = fragment_cache.get(key)
+    if table_html is None:
+        assets = await asset_repo.get_assets_list(
+            db,
+            name=filters.name,
+            status=filters.status,
+            inactive_by_activity=filters.inactive_by_activity,
+            equipment_kind=filters.equipment_kind,
+            location=filters.location,
+            company_id=filters.company_id,
+            sort=filters.sort_value(),
+        )
+        inactive_ids = {a.id for a in assets if is_asset_inactive(a)}
+        if filters.inactive_by_activity:
+            assets = [a for a in assets if a.id in inactive_ids]
+        table_html = fragment_cache.put(key, render_fragment(
+            "partials/reports_equipment_table.html", {"request": request, "assets": assets, "inactive_ids": inactive_ids},
+        ))
     companies = await reference_repo.get_companies_ordered(db)
     location_choices = await asset_repo.get_distinct_locations(db)
     qp = {
@@ -109,12 +124,12 @@ async def reports_equipment(
     }
     base_export_url = request.url_for("reports_equipment_export")
     export_url = str(base_export_url.include_query_params(**qp)) if qp else str(base_export_url)
-    return templates.TemplateResponse(
+    return validators.apply(templates.TemplateResponse(
         "reports_equipment.html",
         {
             "request": request,
             "user": current_user,
-            "assets": assets,
+            "table_html": table_html,
             "companies": companies,
             "location_choices": location_choices,
             "export_url": export_url,
@@ -123,10 +138,9 @@ async def reports_equipment(
             "status_labels": STATUS_LABELS,
             "equipment_kind_choices": EQUIPMENT_KIND_CHOICES,
             "equipment_kind_labels": EQUIPMENT_KIND_LABELS,
-            "is_inactive_fn": is_asset_inactive,
             "inactive_days_threshold": INACTIVE_DAYS_THRESHOLD,
         },
-    )
+    ))
 
 
 @router.get("/reports/equipment/export.xlsx", name="reports_equipment_export", include_in_schema=False)
@@ -173,11 +187,21 @@ async def reports_traffic_light(
     company_id: str | None = Query(None, description="Организация"),
     threshold_years: int = Query(5, ge=1, le=20, description="Порог устаревания (лет), красный цвет"),
 ):
+    validators = await page_validators(db, request, current_user)
+    if validators.is_fresh(request):
+        return validators.not_modified()
     filters = _traffic_light_filter_from_query(company_id, threshold_years)
     companies = await reference_repo.get_companies_ordered(db)
-    assets = await asset_repo.get_traffic_light_assets(db, filters.company_id)
-    rows = build_traffic_light_rows(assets, filters.threshold_years)
-    return templates.TemplateResponse(
+    key = fragment_key("reports_traffic_light_table", request, validators.data_key, **filters.model_dump())
+    table_html = fragment_cache.get(key)
+    if table_html is None:
+        assets = await asset_repo.get_traffic_light_assets(db, filters.company_id)
+        rows = build_traffic_light_rows(assets, filters.threshold_years)
+        table_html = fragment_cache.put(key, render_fragment(
+            "partials/reports_traffic_light_table.html",
+            {"request": request, "rows": rows, "threshold_years": filters.threshold_years},
+        ))
+    return validators.apply(templates.TemplateResponse(
         "reports_traffic_light.html",
         {
             "request": request,
@@ -185,10 +209,9 @@ async def reports_traffic_light(
             "companies": companies,
             "company_id": filters.company_id,
             "threshold_years": filters.threshold_years,
-            "rows": rows,
-            "equipment_kind_labels": EQUIPMENT_KIND_LABELS,
+            "table_html": table_html,
         },
-    )
+    ))
 
 
 @router.get("/reports/traffic-light/export.xlsx", name="reports_traffic_light_export", include_in_schema=False)
@@ -0,0 +1,262 @@
+"""
+Модели JSON API v1: фильтры поиска (query-параметры) и ответы по технике, событиям, организациям, кампаниям.
+"""
+import json
+from datetime import date, datetime
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+from app.models.asset import AssetEventType, AssetStatus, EquipmentKind
+from app.utils.ip_addresses import ip_range
+
+
+# Размер страницы списков API по умолчанию и максимальный
+PAGE_LIMIT_DEFAULT = 100
+PAGE_LIMIT_MAX = 1000
+
+
+def _json_list(value):
+    """JSON-строка из БД -> список; битый JSON или не список отдаётся как null."""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None
+    return value if isinstance(value, list) else None
+
+
+class AssetSearchFilter(BaseModel):
+    """Фильтры списка техники — те же, что у страницы расширенного поиска."""
+    name: str | None = None
+    status: str | None = None
+    equipment_kind: str | None = None
+    location: str | None = None
+    company_id: str | None = None
+    assigned_user: str | None = Field(None, description="Пользователь (кто использует)")
+    cpu: str | None = None
+    ram: str | None = None
+    disk1_type: str | None = None
+    disk1_capacity: str | None = None
+    network_card: str | None = None
+    motherboard: str | None = None
+    os: str | None = None
+    description: str | None = None
+    screen_diagonal: str | None = None
+    screen_resolution: str | None = None
+    monitor_diagonal: str | None = None
+    power_supply: str | None = None
+    rack_units: str | None = None
+    manufacture_from: date | None = Field(None, description="Дата выпуска с (YYYY-MM-DD)")
+    manufacture_to: date | None = Field(None, description="Дата выпуска по (YYYY-MM-DD)")
+    ram_gb_from: float | None = Field(None, description="ОЗУ от, ГБ")
+    ram_gb_to: float | None = Field(None, description="ОЗУ до, ГБ")
+    disk_gb_from: float | None = Field(None, description="Объём диска от, ГБ")
+    disk_gb_to: float | None = Field(None, description="Объём диска до, ГБ")
+    diagonal_from: float | None = Field(None, description="Диагональ от, дюймы")
+    diagonal_to: float | None = Field(None, description="Диагональ до, дюймы")
+    ip: str | None = Field(None, description="IP-адрес или подсеть CIDR (10.2.3.4, 10.2.0.0/16) по всем интерфейсам")
+    component_type: str | None = Field(None, description="Есть доп. устройство этого типа (cpu, ram, disk, network_card, other)")
+
+    @field_validator("ip")
+    @classmethod
+    def _check_ip(cls, value):
+        if value is not None and value.strip() and ip_range(value) is None:
+            raise ValueError("ожидается IP-адрес или подсеть CIDR")
+        return value
+
+    def repo_kwargs(self) -> dict:
+        """Аргументы для asset_repo (имена как у advanced_search_assets)."""
+        data = self.model_dump(include=set(AssetSearchFilter.model_fields) - {"assigned_user", "manufacture_from", "manufacture_to"})
+        data["current_user"] = self.assigned_user
+        data["manufacture_date_from"] = self.manufacture_from
+        data["manufacture_date_to"] = self.manufacture_to
+        return data
+
+
+class AssetListQuery(AssetSearchFilter):
+    """Query-параметры GET /api/v1/assets: фильтры поиска, выборочные поля и keyset-пагинация."""
+    fields: str | None = Field(None, description="Поля через запятую (id отдаётся всегда); по умолчанию — все")
+    cursor: str | None = Field(None, description="next_cursor предыдущей страницы")
+    limit: int = Field(PAGE_LIMIT_DEFAULT, ge=1, le=PAGE_LIMIT_MAX)
+
+
+class AssetOut(BaseModel):
+    """
+    Техника. Все поля необязательные: при fields= в ответ попадают только запрошенные
+    (ответ сериализуется с exclude_unset).
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int | None = None
+    name: str | None = None
+    serial_number: str | None = None
+    asset_type: str | None = None
+    equipment_kind: EquipmentKind | None = None
+    model: str | None = None
+    location: str | None = None
+    status: AssetStatus | None = None
+    description: str | None = None
+    current_user: str | None = None
+    company_id: int | None = None
+    os: str | None = None
+    cpu: str | None = None
+    ram: str | None = None
+    disk1_type: str | None = None
+    disk1_capacity: str | None = None
+    network_card: str | None = None
+    motherboard: str | None = None
+    screen_diagonal: str | None = None
+    screen_resolution: str | None = None
+    power_supply: str | None = None
+    monitor_diagonal: str | None = None
+    rack_units: int | None = None
+    ram_mb: int | None = None
+    disk_gb: int | None = None
+    diagonal_in: float | None = None
+    manufacture_date: date | None = None
+    network_interfaces: list[dict] | None = None
+    extra_components: list[dict] | None = None
+    last_seen_at: datetime | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+    @field_validator("network_interfaces", "extra_components", mode="before")
+    @classmethod
+    def _parse_json_list(cls, value):
+        return _json_list(value)
+
+
+# Поля, доступные в fields= (совпадают с колонками модели Asset)
+ASSET_FIELDS = tuple(AssetOut.model_fields)
+
+
+class AssetPage(BaseModel):
+    """Страница техники; next_cursor передаётся в cursor= для следующей страницы."""
+    items: list[AssetOut]
+    next_cursor: str | None = None
+
+
+class AssetEventOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    asset_id: int
+    event_type: AssetEventType
+    description: str | None = None
+    created_at: datetime | None = None
+    created_by_id: int | None = None
+    changes: list[dict] | None = Field(None, validation_alias="changes_json")
+
+    @field_validator("changes", mode="before")
+    @classmethod
+    def _parse_changes(cls, value):
+        return _json_list(value)
+
+
+class AssetEventPage(BaseModel):
+    items: list[AssetEventOut]
+    next_cursor: str | None = None
+
+
+class CompanyOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    short_info: str | None = None
+
+
+class CampaignOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    description: str | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    company_id: int | None = None
+
+
+class TokenRequest(BaseModel):
+    username: str
+    password: str
+
+
+class TokenOut(BaseModel):
+    """Токен для заголовка Authorization: Bearer <access_token>."""
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
+
+
+class HeartbeatPing(BaseModel):
+    """Отметка агента: устройство ищется по asset_id, иначе по serial_number, иначе по ip."""
+    asset_id: int | None = None
+    serial_number: str | None = None
+    ip: str | None = None
+    seen_at: datetime | None = Field(None, description="Время отметки; по умолчанию — время приёма")
+
+
+class HeartbeatAccepted(BaseModel):
+    accepted: int
+    rejected: int = Field(description="Отметки без пригодного идентификатора")
+    pending: int = Field(description="Устройств в буфере до следующего сброса в БД")
+
+
+class NetworkInterfaceIn(BaseModel):
+    label: str | None = None
+    type: str = Field("network", description="network или oob")
+    ip: str | None = None
+
+
+class HardwareReport(BaseModel):
+    """
+    Отчёт агента об оборудовании одного устройства (по asset_id или serial_number).
+    Необязательные поля, не переданные агентом, в карточке не меняются.
+    """
+    asset_id: int | None = None
+    serial_number: str | None = None
+    cpu: str | None = None
+    ram: str | None = None
+    disk1_type: str | None = None
+    disk1_capacity: str | None = None
+    network_card: str | None = None
+    motherboard: str | None = None
+    os: str | None = None
+    network_interfaces: list[NetworkInterfaceIn] | None = None
+
+
+class HardwareIngestResult(BaseModel):
+    received: int
+    updated: int = Field(description="Карточки, в которых изменились поля")
+    unchanged: int = Field(description="Отчёт совпал с предыдущим или с карточкой")
+    unmatched: int = Field(description="Устройство не найдено")
+
+
+class BulkAssetChanges(BaseModel):
+    """Новые значения для массового изменения; не переданные поля не меняются, null — очистить."""
+    status: AssetStatus | None = None
+    location: str | None = None
+    company_id: int | None = None
+    current_user: str | None = None
+
+    def to_data(self) -> dict:
+        data = {}
+        for key in self.model_fields_set:
+            value = getattr(self, key)
+            data[key] = value.strip() or None if isinstance(value, str) else value
+        return data
+
+
+class BulkEditRequest(BaseModel):
+    """Кого менять: список ids или фильтры расширенного поиска (ровно одно из двух)."""
+    ids: list[int] | None = Field(None, max_length=100_000)
+    filter: AssetSearchFilter | None = None
+    changes: BulkAssetChanges
+
+
+class BulkEditResult(BaseModel):
+    matched: int
+    updated: int
+    unchanged: int
+    skipped_retired: int = Field(description="Списанные: перемещение и выдача запрещены")
@@ -1,6 +1,7 @@
 """
-Бизнес-логика активов: создание, обновление с обязательной записью события (AssetEvent).
+Бизнес-логика активов: создание, обновление (в том числе массовое) с обязательной записью события (AssetEvent).
 Мягкое удаление: deleted_at + событие «Удалён». Роутер передаёт подготовленные данные.
+Каждое изменение увеличивает версию данных (HTTP-кэш страниц).
 """
 import json
 import logging
@@ -10,9 +11,21 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Asset, AssetEvent
 from app.models.asset import AssetEventType, AssetStatus
+from app.repositories import asset_repo, reference_repo
+from app.services.data_version_service import bump_data_version
+from app.services.hw_ingest_service import HW_REPORT_FIELDS
+from app.utils.asset_changes import build_asset_changes
+from app.utils.components import component_rows_for
+from app.utils.ip_addresses import ip_rows_for
+from app.utils.specs import spec_numbers
 
 logger = logging.getLogger(__name__)
 
+# Поля, которые можно менять массово
+BULK_EDIT_FIELDS = ("status", "location", "company_id", "current_user")
+# Поля «перемещения и выдачи», запрещённые для списанного оборудования
+MOVE_FIELDS = ("location", "current_user")
+
 
 async def create_asset(
     db: AsyncSession,
@@ -25,9 +38,15 @@ async def create_asset(
     Возвращает созданный Asset (после flush у него есть id).
     event_description — описание события (по умолчанию "Asset created", для импорта — "Импорт из Excel").
     """
-    asset = Asset(**data)
+    asset = Asset(**data, **spec_numbers(data))
     db.add(asset)
     await db.flush()
+    ip_rows = ip_rows_for(data)
+    if ip_rows:
+        await asset_repo.replace_asset_ips(db, {asset.id: ip_rows})
+    components = component_rows_for(data)
+    if components:
+        await asset_repo.replace_asset_components(db, {asset.id: components})
     event = AssetEvent(
         asset_id=asset.id,
         event_type=AssetEventType.created,
@@ -35,7 +54,7 @@ async def create_asset(
         created_by_id=created_by_id,
     )
     db.add(event)
-    await db.flush()
+    await bump_data_version(db, asset.company_id)
     logger.info("asset_created asset_id=%s name=%s created_by_id=%s", asset.id, getattr(asset, "name", ""), created_by_id)
     return asset
 
@@ -51,14 +70,26 @@ async def update_asset(
     Обновляет поля актива из data и создаёт событие «Изменение» с changes_json.
     changes — список {field_label, old, new} для журнала «было → стало».
     Выдача/перемещение (location, current_user) запрещены для статуса «Списано» (3.2).
+    Изменение network_interfaces / network_card пересобирает адреса в asset_ip_addresses,
+    extra_components — доп. устройства в asset_components.
     """
     if asset.status == AssetStatus.retired:
-        for key in ("location", "current_user"):
+        for key in MOVE_FIELDS:
             if key in data and getattr(asset, key, None) != data.get(key):
                 raise ValueError("Перемещение и выдача запрещены для списанного оборудования")
-    for key, value in data.items():
+    old_company_id = asset.company_id
+    if any(key in HW_REPORT_FIELDS and getattr(asset, key, None) != value for key, value in data.items()):
+        # Поля агента правились вручную — следующий такой же отчёт агента снова применится
+        asset.hw_report_hash = None
+    ip_rows = ip_rows_for(data, asset)
+    components = component_rows_for(data, asset)
+    for key, value in {**data, **spec_numbers(data, asset)}.items():
         setattr(asset, key, value)
     await db.flush()
+    if ip_rows is not None:
+        await asset_repo.replace_asset_ips(db, {asset.id: ip_rows})
+    if components is not None:
+        await asset_repo.replace_asset_components(db, {asset.id: components})
     event = AssetEvent(
         asset_id=asset.id,
         event_type=AssetEventType.updated,
@@ -67,10 +98,60 @@ async def update_asset(
         changes_json=json.dumps(changes, ensure_ascii=False) if changes else None,
     )
     db.add(event)
-    await db.flush()
+    await bump_data_version(db, old_company_id, asset.company_id)
     logger.info("asset_updated asset_id=%s updated_by_id=%s", asset.id, updated_by_id)
 
 
+async def bulk_edit_assets(
+    db: AsyncSession,
+    data: dict,
+    updated_by_id: int,
+    asset_ids: list[int] | None = None,
+    filters: dict | None = None,
+) -> dict:
+    """
+    Массовое изменение: одинаковые значения data (ключи из BULK_EDIT_FIELDS) для активов из asset_ids
+    или результата расширенного поиска по filters. Один UPDATE по id изменяемых активов и пакетная
+    вставка событий «Изменение» с changes_json. Списанные активы, у которых меняется расположение
+    или пользователь, пропускаются (правило 3.2). Возвращает счётчики matched / updated / unchanged / skipped_retired.
+    """
+    unknown = set(data) - set(BULK_EDIT_FIELDS)
+    if unknown:
+        raise ValueError(f"Массово нельзя менять поля: {', '.join(sorted(unknown))}")
+    if data.get("company_id") is not None and await reference_repo.get_company_by_id(db, data["company_id"]) is None:
+        raise ValueError("Организация не найдена")
+    rows = await asset_repo.get_bulk_edit_targets(db, list(BULK_EDIT_FIELDS), asset_ids, **(filters or {}))
+    ids, events, company_ids, skipped = [], [], {data.get("company_id")}, 0
+    for row in rows:
+        changes = build_asset_changes(row, data)
+        if not changes:
+            continue
+        if row.status == AssetStatus.retired and any(k in data and getattr(row, k) != data[k] for k in MOVE_FIELDS):
+            skipped += 1
+            continue
+        ids.append(row.id)
+        company_ids.add(row.company_id)
+        events.append({
+            "asset_id": row.id,
+            "event_type": AssetEventType.updated,
+            "description": "Массовое изменение",
+            "created_by_id": updated_by_id,
+            "changes_json": json.dumps(changes, ensure_ascii=False),
+        })
+    if ids:
+        await asset_repo.set_fields_by_ids(db, ids, data)
+        await asset_repo.bulk_insert_events(db, events)
+        await bump_data_version(db, *company_ids)
+    logger.info("assets_bulk_edit fields=%s updated=%s skipped_retired=%s updated_by_id=%s",
+                ",".join(data), len(ids), skipped, updated_by_id)
+    return {
+        "matched": len(rows),
+        "updated": len(ids),
+        "unchanged": len(rows) - len(ids) - skipped,
+        "skipped_retired": skipped,
+    }
+
+
 async def add_asset_event(
     db: AsyncSession,
     asset_id: int,
@@ -86,7 +167,7 @@ async def add_asset_event(
         created_by_id=created_by_id,
     )
     db.add(event)
-    await db.flush()
+    await bump_data_version(db)
     logger.info("asset_event asset_id=%s event_type=%s created_by_id=%s", asset_id, event_type.value, created_by_id)
 
 
@@ -106,5 +187,5 @@ async def delete_asset(db: AsyncSession, asset: Asset, deleted_by_id: int) -> No
         created_by_id=deleted_by_id,
     )
     db.add(event)
-    await db.flush()
+    await bump_data_version(db, asset.company_id)
     logger.info("asset_deleted (soft) asset_id=%s name=%s deleted_by_id=%s", asset.id, getattr(asset, "name", ""), deleted_by_id)
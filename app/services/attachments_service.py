@@ -1,28 +1,173 @@
 """
 Загрузка и генерация вложений: QR-коды, аватарки (проверка типов и размеров).
+QR-коды не хранятся на диске: рендерятся на лету по id актива и base URL (с LRU-кэшем байтов).
+Листы этикеток (PDF) рендерятся в пуле процессов.
 """
-from pathlib import Path
+from __future__ import annotations
 
-from app.config import QR_DIR
+import asyncio
+import hashlib
+from functools import lru_cache
+from io import BytesIO
 
+from app.config import QR_CACHE_SIZE, QR_LABEL_COLUMNS, QR_LABEL_ROWS
+from app.utils.process_pool import run_in_process
 
-def generate_qr_for_asset(asset_id: int, base_url: str) -> Path:
-    """
-    Генерирует PNG QR-кода с ссылкой на карточку актива, сохраняет в data/qrcodes.
-    Возвращает путь к файлу.
-    """
+# Лист этикеток: A4 при 150 dpi, поля страницы и отступы внутри этикетки (в пикселях)
+LABEL_DPI = 150
+LABEL_PAGE_SIZE = (1240, 1754)
+LABEL_PAGE_MARGIN = 40
+LABEL_PADDING = 10
+
+# Форматы QR-изображений, отдаваемых на лету, и их MIME-типы
+QR_MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+# Версия рендера: входит в ETag, меняется при изменении параметров отрисовки
+QR_RENDER_VERSION = "1"
+
+
+def asset_url(base_url: str, asset_id: int) -> str:
+    """Ссылка на карточку актива, которая кодируется в QR."""
+    return f"{base_url.rstrip('/')}/assets/{asset_id}"
+
+
+def _make_qr_image(url: str, box_size: int = 8):
+    """PIL-изображение QR-кода (режим «1») для ссылки."""
     import qrcode
-    QR_DIR.mkdir(parents=True, exist_ok=True)
-    url = f"{base_url.rstrip('/')}/assets/{asset_id}"
-    qr = qrcode.QRCode(version=1, box_size=8, border=2)
+    qr = qrcode.QRCode(version=1, box_size=box_size, border=2)
     qr.add_data(url)
     qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
-    path = QR_DIR / f"{asset_id}.png"
-    img.save(path, "PNG")
-    return path
+    return qr.make_image(fill_color="black", back_color="white").get_image()
+
+
+@lru_cache(maxsize=QR_CACHE_SIZE)
+def render_qr(url: str, fmt: str = "png") -> bytes:
+    """
+    Рендерит QR-код ссылки в PNG или SVG и возвращает байты.
+    Результат кэшируется в памяти (LRU): повторный показ карточки не перерисовывает QR.
+    """
+    buf = BytesIO()
+    if fmt == "svg":
+        import qrcode
+        import qrcode.image.svg
+        img = qrcode.make(url, image_factory=qrcode.image.svg.SvgPathImage, box_size=10, border=2)
+        img.save(buf)
+    else:
+        _make_qr_image(url).save(buf, "PNG", optimize=True)
+    return buf.getvalue()
+
+
+def qr_etag(url: str, fmt: str) -> str:
+    """Сильный ETag QR-изображения: зависит только от ссылки, формата и версии рендера."""
+    digest = hashlib.sha256(f"{QR_RENDER_VERSION}:{fmt}:{url}".encode()).hexdigest()[:32]
+    return f'"qr-{digest}"'
+
+
+def _load_font(size: int):
+    """Шрифт с кириллицей (DejaVu Sans / Arial), иначе встроенный шрифт Pillow."""
+    from PIL import ImageFont
+    for name in ("DejaVuSans.ttf", "arial.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=size)
+
+
+def _wrap_text(draw, text: str, font, max_width: int, max_lines: int) -> list[str]:
+    """Переносит текст по словам в пределах ширины; лишнее обрезается многоточием."""
+    lines: list[str] = []
+    current = ""
+    for word in text.split():
+        candidate = f"{current} {word}".strip()
+        if draw.textlength(candidate, font=font) <= max_width or not current:
+            current = candidate
+        else:
+            lines.append(current)
+            current = word
+    if current:
+        lines.append(current)
+    if len(lines) > max_lines:
+        lines = lines[:max_lines]
+        lines[-1] = lines[-1].rstrip() + "…"
+    out = []
+    for line in lines:
+        # Каждый шаг укорачивает строку на символ; «…» шире колонки — остаётся одно «…»
+        while len(line) > 1 and draw.textlength(line, font=font) > max_width:
+            line = line[:-2] + "…"
+        out.append(line)
+    return out
+
+
+def label_layout(columns: int, rows: int) -> tuple[int, int, int, int]:
+    """
+    Геометрия этикетки для сетки columns x rows: (ширина, высота, сторона QR, ширина текста).
+    ValueError, если в этикетке не остаётся места под QR или текст.
+    """
+    if columns < 1 or rows < 1:
+        raise ValueError(f"Сетка этикеток {columns}x{rows}: нужно не меньше одной колонки и строки")
+    cell_w = (LABEL_PAGE_SIZE[0] - 2 * LABEL_PAGE_MARGIN) // columns
+    cell_h = (LABEL_PAGE_SIZE[1] - 2 * LABEL_PAGE_MARGIN) // rows
+    qr_side = cell_h - 2 * LABEL_PADDING
+    text_width = cell_w - qr_side - 3 * LABEL_PADDING
+    if qr_side <= 0 or text_width <= 0:
+        raise ValueError(
+            f"Сетка этикеток {columns}x{rows} слишком плотная: не остаётся места под QR-код и текст "
+            "(уменьшите QR_LABEL_COLUMNS или увеличьте QR_LABEL_ROWS)"
+        )
+    return cell_w, cell_h, qr_side, text_width
+
+
+# Проверка сетки из конфигурации при старте, а не при первом запросе листа
+label_layout(QR_LABEL_COLUMNS, QR_LABEL_ROWS)
+
+
+def render_label_page(labels: list[dict], base_url: str, columns: int, rows: int):
+    """
+    Выполняется в процессе пула: рисует одну страницу A4 с сеткой этикеток
+    (QR-код, название, серийный номер, ID). labels — [{id, name, serial_number}, ...].
+    """
+    from PIL import Image, ImageDraw
+    page = Image.new("1", LABEL_PAGE_SIZE, 1)
+    draw = ImageDraw.Draw(page)
+    cell_w, cell_h, qr_side, text_width = label_layout(columns, rows)
+    text_x_offset = qr_side + 2 * LABEL_PADDING
+    font_name = _load_font(20)
+    font_small = _load_font(16)
+    for idx, label in enumerate(labels[: columns * rows]):
+        x = LABEL_PAGE_MARGIN + (idx % columns) * cell_w
+        y = LABEL_PAGE_MARGIN + (idx // columns) * cell_h
+        draw.rectangle((x, y, x + cell_w - 1, y + cell_h - 1), outline=0)
+        qr = _make_qr_image(asset_url(base_url, label["id"]), box_size=4)
+        qr = qr.resize((qr_side, qr_side), Image.NEAREST)
+        page.paste(qr, (x + LABEL_PADDING, y + LABEL_PADDING))
+        ty = y + LABEL_PADDING
+        for line in _wrap_text(draw, label.get("name") or "", font_name, text_width, 4):
+            draw.text((x + text_x_offset, ty), line, font=font_name, fill=0)
+            ty += 24
+        ty += 6
+        if label.get("serial_number"):
+            for line in _wrap_text(draw, f"S/N {label['serial_number']}", font_small, text_width, 2):
+                draw.text((x + text_x_offset, ty), line, font=font_small, fill=0)
+                ty += 20
+        draw.text((x + text_x_offset, y + cell_h - LABEL_PADDING - 20), f"ID {label['id']}", font=font_small, fill=0)
+    return page
+
+
+async def build_labels_pdf(labels: list[dict], base_url: str) -> BytesIO:
+    """
+    Формирует PDF с листами этикеток: страницы рендерятся параллельно в пуле процессов,
+    сборка PDF — в отдельном потоке. Возвращает BytesIO с курсором в начале.
+    """
+    per_page = QR_LABEL_COLUMNS * QR_LABEL_ROWS
+    chunks = [labels[i:i + per_page] for i in range(0, len(labels), per_page)]
+    pages = await asyncio.gather(
+        *(run_in_process(render_label_page, chunk, base_url, QR_LABEL_COLUMNS, QR_LABEL_ROWS) for chunk in chunks)
+    )
 
+    def _save() -> BytesIO:
+        buf = BytesIO()
+        pages[0].save(buf, "PDF", save_all=True, append_images=list(pages[1:]), resolution=LABEL_DPI)
+        buf.seek(0)
+        return buf
 
-def get_qr_path(asset_id: int) -> Path:
-    """Возвращает путь к файлу QR-кода актива (без проверки существования)."""
-    return QR_DIR / f"{asset_id}.png"
+    return await asyncio.to_thread(_save)
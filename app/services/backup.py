@@ -1,70 +1,207 @@
 """
-Создание и восстановление бекапов: БД (app.db), папки avatars и qrcodes.
-Бекап — один zip-файл в data/backups/ с именем backup_YYYY-MM-DD_HH-MM-SS.zip.
+Создание и восстановление бекапов: БД (app.db) и папка avatars.
+QR-коды в бекап не входят — они рендерятся на лету из id актива.
+Полный бекап — один zip-файл в data/backups/ с именем backup_YYYY-MM-DD_HH-MM-SS.zip.
+Инкрементальный бекап — манифест backup_YYYY-MM-DD_HH-MM-SS.json: снимок БД (online backup API SQLite)
+режется на блоки, блоки и файлы хранятся в data/backups/objects/ по SHA-256 и не дублируются между бекапами.
+Снимок БД всегда делается через online backup API SQLite порциями страниц — приложение продолжает работать.
+Восстановление: данные готовятся и проверяются (PRAGMA integrity_check) во временной папке рядом с БД,
+затем файл БД подменяется атомарно (os.replace) — вызывающий код должен на это время освободить
+соединения (database.drained_connections).
 Очистка базы (drop): удаление всех данных и пересоздание пустой схемы с одним админом.
+Все функции синхронные и долгие: из обработчиков запросов вызывать через asyncio.to_thread.
 """
 from __future__ import annotations
 
+import hashlib
+import io
+import json
+import os
 import shutil
+import sqlite3
+import tempfile
 import zipfile
+import zlib
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+from typing import Iterator
 
+from alembic.script import ScriptDirectory
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from werkzeug.security import generate_password_hash
 
-from app.config import BACKUP_DIR, DATA_DIR, DB_PATH, AVATAR_DIR, QR_DIR, SYNC_DATABASE_URL
+from app.config import (
+    AVATAR_DIR, BACKUP_DIR, BACKUP_STEP_PAGES, BASE_DIR, DATA_DIR, DB_PATH, MAX_RESTORE_UNPACKED_MB, QR_DIR,
+    SYNC_DATABASE_URL,
+)
 from app.database import Base
 from app.models import User, Asset, AssetEvent, Company, InventoryCampaign, InventoryItem
 from app.models.user import UserRole
+from app.utils.file_lock import FileLock
+
+
+# Размер блока снимка БД в инкрементальном бекапе: неизменённые блоки не сохраняются повторно
+DB_CHUNK_SIZE = 1024 * 1024
+OBJECTS_DIRNAME = "objects"
+MANIFEST_VERSION = 1
+# Размер порции при потоковом чтении/записи архивов
+STREAM_CHUNK_SIZE = 1024 * 1024
+# Таблицы, без которых восстановленная БД не годится для приложения
+REQUIRED_TABLES = ("alembic_version", "assets", "users")
+
+# Префикс имён бекапов по расписанию: ретенция прореживает только их, ручные и загруженные бекапы
+# хранятся, пока их не удалит администратор
+SCHEDULED_PREFIX = "backup_auto_"
+
+# Блокировка хранилища бекапов (общая для всех воркеров): создание бекапа, ретенция и сборка мусора
+# объектов не выполняются одновременно — иначе GC удалит объект, на который ссылается создаваемый манифест
+backup_lock = FileLock("backup")
+
+
+class BackupBusyError(RuntimeError):
+    """Хранилище бекапов занято: выполняется бекап или очистка."""
+
+
+@contextmanager
+def _storage_locked(lock_held: bool):
+    """Держит backup_lock на время операции; lock_held — вызывающий код уже держит её сам."""
+    if lock_held:
+        yield
+        return
+    if not backup_lock.acquire():
+        raise BackupBusyError("Выполняется бекап — повторите позже")
+    try:
+        yield
+    finally:
+        backup_lock.release()
 
 
 def _ensure_backup_dir() -> None:
     BACKUP_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def create_backup() -> str:
+def _backup_name(suffix: str, scheduled: bool = False) -> str:
+    """Имя нового бекапа по текущему времени; при совпадении в ту же секунду добавляется номер."""
+    prefix = SCHEDULED_PREFIX if scheduled else "backup_"
+    stem = f"{prefix}{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}"
+    name, n = f"{stem}{suffix}", 1
+    while (BACKUP_DIR / name).exists():
+        name, n = f"{stem}_{n}{suffix}", n + 1
+    return name
+
+
+def create_backup(scheduled: bool = False) -> str:
     """
-    Создаёт zip-бекап: app.db, avatars/, qrcodes/.
-    Возвращает имя файла бекапа (например backup_2026-02-09_12-30-00.zip).
+    Создаёт zip-бекап: app.db, avatars/.
+    Возвращает имя файла бекапа (например backup_2026-02-09_12-30-00.zip; scheduled — backup_auto_...).
     """
     _ensure_backup_dir()
-    name = f"backup_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.zip"
+    name = _backup_name(".zip", scheduled)
     path = BACKUP_DIR / name
-    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
-        if DB_PATH.exists():
-            zf.write(DB_PATH, "app.db")
-        if AVATAR_DIR.exists():
-            for f in AVATAR_DIR.iterdir():
-                if f.is_file():
-                    zf.write(f, f"avatars/{f.name}")
-        if QR_DIR.exists():
-            for f in QR_DIR.iterdir():
-                if f.is_file():
-                    zf.write(f, f"qrcodes/{f.name}")
+    tmp_zip = BACKUP_DIR / f"{name}.tmp"
+    with tempfile.TemporaryDirectory(prefix="vkr_snapshot_") as tmp:
+        with zipfile.ZipFile(tmp_zip, "w", zipfile.ZIP_DEFLATED) as zf:
+            if DB_PATH.exists():
+                snapshot = Path(tmp) / "app.db"
+                _snapshot_db(snapshot)
+                zf.write(snapshot, "app.db")
+            if AVATAR_DIR.exists():
+                for f in AVATAR_DIR.iterdir():
+                    if f.is_file():
+                        zf.write(f, f"avatars/{f.name}")
+    os.replace(tmp_zip, path)
     return name
 
 
+# Кэш списка бекапов: (папка, mtime папки в нс, список); сбрасывается при любом изменении состава папки
+_index_cache: tuple[Path, int, list[dict]] | None = None
+
+
 def list_backups() -> list[dict]:
     """
-    Список бекапов: [{name, size_bytes, mtime}, ...], по дате создания (новые первые).
+    Список бекапов: [{name, size_bytes, mtime, incremental, scheduled}, ...], по дате создания (новые первые).
+    Для инкрементального бекапа size_bytes — объём данных, впервые сохранённых этим бекапом.
+    Результат кэшируется до изменения mtime папки бекапов.
     """
+    global _index_cache
     _ensure_backup_dir()
+    dir_mtime = BACKUP_DIR.stat().st_mtime_ns
+    if _index_cache and _index_cache[0] == BACKUP_DIR and _index_cache[1] == dir_mtime:
+        return list(_index_cache[2])
     out = []
-    for f in sorted(BACKUP_DIR.glob("backup_*.zip"), key=lambda p: p.stat().st_mtime, reverse=True):
+    files = [*BACKUP_DIR.glob("backup_*.zip"), *BACKUP_DIR.glob("backup_*.json")]
+    for f in sorted(files, key=lambda p: p.stat().st_mtime, reverse=True):
         st = f.stat()
+        incremental = f.suffix == ".json"
+        size = st.st_size
+        if incremental:
+            try:
+                size = _read_manifest(f).get("stored_bytes", 0)
+            except (OSError, ValueError):
+                continue
         out.append({
             "name": f.name,
-            "size_bytes": st.st_size,
+            "size_bytes": size,
             "mtime": datetime.fromtimestamp(st.st_mtime),
+            "incremental": incremental,
+            "scheduled": f.name.startswith(SCHEDULED_PREFIX),
         })
-    return out
+    _index_cache = (BACKUP_DIR, dir_mtime, out)
+    return list(out)
+
+
+def delete_backups(filenames: list[str], lock_held: bool = False) -> None:
+    """
+    Удаляет бекапы (zip и манифесты) и затем объекты, на которые больше не ссылается ни один манифест.
+    Под backup_lock; если идёт бекап — BackupBusyError (lock_held — блокировку уже держит вызывающий).
+    """
+    with _storage_locked(lock_held):
+        for filename in filenames:
+            path = get_backup_path(filename)
+            if path:
+                path.unlink()
+        _collect_garbage()
+
+
+def collect_garbage(lock_held: bool = False) -> int:
+    """
+    Удаляет из objects/ объекты, не упомянутые ни в одном манифесте; возвращает их число.
+    Под backup_lock, как delete_backups.
+    """
+    with _storage_locked(lock_held):
+        return _collect_garbage()
+
+
+def _collect_garbage() -> int:
+    objects = _objects_dir()
+    if not objects.exists():
+        return 0
+    referenced: set[str] = set()
+    for path in BACKUP_DIR.glob("backup_*.json"):
+        try:
+            manifest = _read_manifest(path)
+        except (OSError, ValueError):
+            # Нечитаемый манифест: ничего не удаляем, чтобы не потерять данные
+            return 0
+        if manifest.get("db"):
+            referenced.update(manifest["db"]["chunks"])
+        referenced.update(entry["sha256"] for entry in manifest.get("files", {}).values())
+    removed = 0
+    for obj in objects.glob("*/*"):
+        if obj.name not in referenced:
+            obj.unlink()
+            removed += 1
+    return removed
 
 
 def get_backup_path(filename: str) -> Path | None:
     """Путь к файлу бекапа, если он существует и имя безопасное."""
-    if not filename or ".." in filename or not filename.endswith(".zip"):
+    if not filename or ".." in filename or "/" in filename or "\\" in filename:
+        return None
+    if not filename.endswith((".zip", ".json")):
         return None
     if not filename.startswith("backup_"):
         return None
@@ -72,44 +209,371 @@ def get_backup_path(filename: str) -> Path | None:
     return path if path.is_file() else None
 
 
-def restore_backup(filename: str) -> None:
+def _new_staging_dir() -> Path:
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    return Path(tempfile.mkdtemp(prefix=".restore_", dir=DB_PATH.parent))
+
+
+def stage_restore(filename: str) -> Path:
     """
-    Восстанавливает данные из бекапа: распаковывает во временную папку,
-    затем копирует app.db, содержимое avatars и qrcodes в data/.
-    Перед вызовом желательно закрыть соединения с БД (engine.dispose()).
+    Готовит восстановление, не трогая рабочие данные: во временной папке рядом с БД
+    собирает app.db и avatars/ из zip или манифеста и проверяет целостность БД.
+    Возвращает путь к папке; её передают в apply_restore (или удаляют discard_restore).
     """
     path = get_backup_path(filename)
     if not path:
         raise ValueError("Недопустимое имя бекапа или файл не найден")
-    import tempfile
-    with tempfile.TemporaryDirectory(prefix="vkr_restore_") as tmp:
-        tmp_path = Path(tmp)
-        with zipfile.ZipFile(path, "r") as zf:
-            zf.extractall(tmp_path)
-        # app.db
-        db_src = tmp_path / "app.db"
-        if db_src.exists():
-            shutil.copy2(db_src, DB_PATH)
-        # avatars
-        avatars_src = tmp_path / "avatars"
-        if avatars_src.exists():
+    if path.suffix == ".json":
+        return _stage(lambda staging: _stage_incremental(path, staging))
+    return stage_restore_from_zip(path)
+
+
+def stage_restore_from_zip(path: Path) -> Path:
+    """То же, что stage_restore, для произвольного zip-архива (например загруженного администратором)."""
+    return _stage(lambda staging: _extract_zip(path, staging))
+
+
+def _stage(fill) -> Path:
+    staging = _new_staging_dir()
+    try:
+        fill(staging)
+        db_file = staging / "app.db"
+        if db_file.exists():
+            _validate_db(db_file)
+        elif not (staging / "avatars").exists():
+            raise ValueError("В архиве нет ни app.db, ни avatars/")
+    except Exception:
+        discard_restore(staging)
+        raise
+    return staging
+
+
+def _extract_zip(path: Path, staging: Path) -> None:
+    """
+    Потоково распаковывает из zip только app.db и файлы avatars/<имя> (по одной записи,
+    без extractall); записи с путями вне этих мест, каталоги и прочее пропускаются.
+    Объём распакованного ограничен MAX_RESTORE_UNPACKED_MB: по заявленным размерам записей
+    и по фактически записанным байтам (заголовки zip могут врать) — иначе ValueError.
+    """
+    limit = MAX_RESTORE_UNPACKED_MB * 1024 * 1024
+    too_large = f"Распакованный архив больше {MAX_RESTORE_UNPACKED_MB} МБ"
+    try:
+        zf = zipfile.ZipFile(path, "r")
+    except zipfile.BadZipFile as e:
+        raise ValueError("Файл не является zip-архивом") from e
+    with zf:
+        entries = []
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            if info.filename == "app.db":
+                entries.append((info, staging / "app.db"))
+                continue
+            folder, _, fname = info.filename.partition("/")
+            if folder != "avatars" or not fname or "/" in fname or "\\" in fname or fname in (".", ".."):
+                continue
+            entries.append((info, staging / "avatars" / fname))
+        if sum(info.file_size for info, _ in entries) > limit:
+            raise ValueError(too_large)
+        written = 0
+        for info, dest in entries:
+            dest.parent.mkdir(exist_ok=True)
+            with zf.open(info) as src, open(dest, "wb") as out:
+                while block := src.read(STREAM_CHUNK_SIZE):
+                    written += len(block)
+                    if written > limit:
+                        raise ValueError(too_large)
+                    out.write(block)
+
+
+def new_upload_path() -> Path:
+    """Пустой временный файл рядом с БД (на том же диске, что и staging) для загружаемого архива."""
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".upload_", suffix=".zip", dir=DB_PATH.parent)
+    os.close(fd)
+    return Path(tmp)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Неперематываемый поток для zipfile: записанные байты забираются порциями через take()."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_backup_zip() -> Iterator[bytes]:
+    """
+    Генерирует zip-бекап текущих данных порциями, не сохраняя архив в BACKUP_DIR:
+    снимок БД (online backup API) во временный файл, затем app.db и avatars/ сжимаются на лету.
+    Синхронный генератор — для StreamingResponse (выполняется в пуле потоков).
+    """
+    sink = _ChunkSink()
+    with tempfile.TemporaryDirectory(prefix="vkr_snapshot_") as tmp:
+        files: list[tuple[Path, str]] = []
+        if DB_PATH.exists():
+            snapshot = Path(tmp) / "app.db"
+            _snapshot_db(snapshot)
+            files.append((snapshot, "app.db"))
+        if AVATAR_DIR.exists():
+            files.extend((f, f"avatars/{f.name}") for f in AVATAR_DIR.iterdir() if f.is_file())
+        with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as zf:
+            for path, arcname in files:
+                with open(path, "rb") as src, zf.open(arcname, "w", force_zip64=True) as dest:
+                    while block := src.read(STREAM_CHUNK_SIZE):
+                        dest.write(block)
+                        if data := sink.take():
+                            yield data
+        if data := sink.take():
+            yield data
+
+
+def new_backup_filename() -> str:
+    """Имя для скачиваемого на лету бекапа."""
+    return f"backup_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.zip"
+
+
+def apply_restore(staging: Path) -> None:
+    """
+    Применяет подготовленное восстановление: атомарно подменяет файл БД (журналы -wal/-shm
+    старой БД удаляются) и переносит аватарки. Соединения с БД к этому моменту должны быть закрыты.
+    Папка staging удаляется.
+    """
+    try:
+        db_file = staging / "app.db"
+        if db_file.exists():
+            for suffix in ("-wal", "-shm", "-journal"):
+                DB_PATH.with_name(DB_PATH.name + suffix).unlink(missing_ok=True)
+            os.replace(db_file, DB_PATH)
+        avatars_src = staging / "avatars"
+        if avatars_src.is_dir():
             AVATAR_DIR.mkdir(parents=True, exist_ok=True)
             for f in avatars_src.iterdir():
                 if f.is_file():
-                    shutil.copy2(f, AVATAR_DIR / f.name)
-        # qrcodes
-        qrcodes_src = tmp_path / "qrcodes"
-        if qrcodes_src.exists():
-            QR_DIR.mkdir(parents=True, exist_ok=True)
-            for f in qrcodes_src.iterdir():
-                if f.is_file():
-                    shutil.copy2(f, QR_DIR / f.name)
+                    shutil.move(str(f), AVATAR_DIR / f.name)
+    finally:
+        discard_restore(staging)
+
+
+def discard_restore(staging: Path) -> None:
+    """Удаляет временную папку восстановления."""
+    shutil.rmtree(staging, ignore_errors=True)
+
+
+def restore_backup(filename: str) -> None:
+    """
+    Восстанавливает данные из бекапа (zip или манифест): stage_restore + apply_restore.
+    Перед вызовом нужно закрыть соединения с БД; в приложении — через database.drained_connections.
+    Папка qrcodes из старых бекапов пропускается.
+    """
+    apply_restore(stage_restore(filename))
+
+
+@lru_cache(maxsize=1)
+def _known_revisions() -> frozenset[str]:
+    """Ревизии миграций, известные этой версии приложения (alembic/versions)."""
+    script = ScriptDirectory(str(BASE_DIR / "alembic"))
+    return frozenset(rev.revision for rev in script.walk_revisions())
+
+
+def _validate_db(path: Path) -> None:
+    """
+    Проверяет, что файл — целая БД SQLite (PRAGMA integrity_check) именно этого приложения:
+    есть REQUIRED_TABLES, а ревизия схемы известна коду (не новее головы миграций).
+    """
+    try:
+        conn = sqlite3.connect(f"file:{path.as_posix()}?mode=ro", uri=True)
+        try:
+            result = conn.execute("PRAGMA integrity_check").fetchone()
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            revision = None
+            if "alembic_version" in tables:
+                row = conn.execute("SELECT version_num FROM alembic_version").fetchone()
+                revision = row[0] if row else None
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError as e:
+        raise ValueError(f"Файл БД в бекапе повреждён: {e}") from e
+    if not result or result[0] != "ok":
+        raise ValueError(f"Файл БД в бекапе повреждён: {result[0] if result else 'нет ответа'}")
+    missing = [t for t in REQUIRED_TABLES if t not in tables]
+    if missing:
+        raise ValueError(f"БД в бекапе не от этого приложения: нет таблиц {', '.join(missing)}")
+    if revision is None:
+        raise ValueError("В БД из бекапа не указана версия схемы (alembic_version пуста)")
+    if revision not in _known_revisions():
+        raise ValueError(f"Схема БД в бекапе (ревизия {revision}) новее этой версии приложения")
+
+
+def _objects_dir() -> Path:
+    return BACKUP_DIR / OBJECTS_DIRNAME
+
+
+def _object_path(digest: str) -> Path:
+    return _objects_dir() / digest[:2] / digest
+
+
+def _put_object(data: bytes) -> tuple[str, int]:
+    """
+    Сохраняет блок в хранилище по SHA-256 (сжатым zlib), если его там ещё нет.
+    Возвращает (хеш, сколько байт записано на диск; 0 — объект уже был).
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    path = _object_path(digest)
+    if path.exists():
+        return digest, 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    packed = zlib.compress(data, 6)
+    tmp = path.with_name(f"{digest}.tmp")
+    tmp.write_bytes(packed)
+    os.replace(tmp, path)
+    return digest, len(packed)
+
+
+def _get_object(digest: str) -> bytes:
+    """Читает объект из хранилища и проверяет его хеш."""
+    path = _object_path(digest)
+    if not path.is_file():
+        raise ValueError(f"В хранилище бекапов нет объекта {digest}")
+    data = zlib.decompress(path.read_bytes())
+    if hashlib.sha256(data).hexdigest() != digest:
+        raise ValueError(f"Объект {digest} повреждён")
+    return data
+
+
+def _read_manifest(path: Path) -> dict:
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise ValueError("Неподдерживаемая версия манифеста бекапа")
+    return manifest
+
+
+def _latest_manifest() -> dict | None:
+    """Последний инкрементальный манифест (для переиспользования хешей неизменённых файлов)."""
+    manifests = sorted(BACKUP_DIR.glob("backup_*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for path in manifests:
+        try:
+            return _read_manifest(path)
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+def _snapshot_db(dest: Path) -> None:
+    """
+    Согласованный снимок БД через online backup API SQLite: копирование порциями
+    по BACKUP_STEP_PAGES страниц, между порциями блокировка чтения снимается и запись продолжается.
+    Если БД изменилась во время копирования, SQLite сам перезапускает снимок.
+    """
+    src = sqlite3.connect(DB_PATH)
+    try:
+        dst = sqlite3.connect(dest)
+        try:
+            src.backup(dst, pages=BACKUP_STEP_PAGES, sleep=0.05)
+        finally:
+            dst.close()
+    finally:
+        src.close()
+
+
+def create_incremental_backup(scheduled: bool = False) -> dict:
+    """
+    Инкрементальный бекап: снимок БД (_snapshot_db) режется на блоки по DB_CHUNK_SIZE, блоки и аватарки
+    сохраняются в objects/ по хешу (только новые), состав бекапа записывается в манифест.
+    Хеш аватарки не пересчитывается, если размер и mtime совпадают с предыдущим манифестом.
+    Возвращает {name, new_objects, stored_bytes}.
+    """
+    _ensure_backup_dir()
+    name = _backup_name(".json", scheduled)
+    previous = _latest_manifest() or {}
+    prev_files = previous.get("files", {})
+    new_objects = 0
+    stored_bytes = 0
+    db_entry = None
+    if DB_PATH.exists():
+        with tempfile.TemporaryDirectory(prefix="vkr_snapshot_") as tmp:
+            snapshot = Path(tmp) / "app.db"
+            _snapshot_db(snapshot)
+            chunks = []
+            with open(snapshot, "rb") as f:
+                while block := f.read(DB_CHUNK_SIZE):
+                    digest, written = _put_object(block)
+                    chunks.append(digest)
+                    new_objects += 1 if written else 0
+                    stored_bytes += written
+            db_entry = {"size": snapshot.stat().st_size, "chunks": chunks}
+    files = {}
+    if AVATAR_DIR.exists():
+        for f in sorted(AVATAR_DIR.iterdir()):
+            if not f.is_file():
+                continue
+            st = f.stat()
+            key = f"avatars/{f.name}"
+            prev = prev_files.get(key)
+            if (
+                prev
+                and prev["size"] == st.st_size
+                and prev["mtime_ns"] == st.st_mtime_ns
+                and _object_path(prev["sha256"]).exists()
+            ):
+                digest = prev["sha256"]
+            else:
+                digest, written = _put_object(f.read_bytes())
+                new_objects += 1 if written else 0
+                stored_bytes += written
+            files[key] = {"sha256": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "db": db_entry,
+        "files": files,
+        "new_objects": new_objects,
+        "stored_bytes": stored_bytes,
+    }
+    tmp_manifest = BACKUP_DIR / f"{name}.tmp"
+    tmp_manifest.write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+    os.replace(tmp_manifest, BACKUP_DIR / name)
+    return {"name": name, "new_objects": new_objects, "stored_bytes": stored_bytes}
+
+
+def _stage_incremental(path: Path, staging: Path) -> None:
+    """
+    Собирает данные по манифесту в папку staging: БД — из блоков (каждый блок проверяется по хешу),
+    аватарки — из объектов.
+    """
+    manifest = _read_manifest(path)
+    db_entry = manifest.get("db")
+    if db_entry:
+        db_file = staging / "app.db"
+        with open(db_file, "wb") as out:
+            for digest in db_entry["chunks"]:
+                out.write(_get_object(digest))
+        if db_file.stat().st_size != db_entry["size"]:
+            raise ValueError("Размер восстановленной БД не совпадает с манифестом")
+    avatars = staging / "avatars"
+    for key, entry in manifest.get("files", {}).items():
+        folder, _, fname = key.partition("/")
+        if folder != "avatars" or not fname or "/" in fname or "\\" in fname or fname in (".", ".."):
+            continue
+        avatars.mkdir(exist_ok=True)
+        (avatars / fname).write_bytes(_get_object(entry["sha256"]))
 
 
 def drop_database() -> None:
     """
     Аннулирует все данные: удаляет таблицы, создаёт пустую схему, создаёт учётную запись
-    администратора (admin/admin), очищает папки avatars и qrcodes.
+    администратора (admin/admin), очищает папку avatars и QR-коды старых версий (qrcodes).
     Перед вызовом нужно закрыть соединения с БД (engine.dispose()).
     """
     engine = create_engine(SYNC_DATABASE_URL, echo=False)
@@ -0,0 +1,268 @@
+"""
+Бекапы по расписанию и в фоне.
+Расписание — cron-выражение из 5 полей (минута час день месяц день_недели) в BACKUP_SCHEDULE;
+задача планировщика запускается из main.lifespan. После каждого планового бекапа старые плановые
+бекапы (backup_auto_*) прореживаются по схеме GFS (ежедневные / еженедельные / ежемесячные),
+неиспользуемые объекты инкрементальных бекапов удаляются. Ручные бекапы ретенция не трогает.
+Ручной бекап из админки тоже выполняется в фоне (run_backup_in_background), не блокируя запрос.
+При нескольких воркерах плановый бекап выполняет один из них (файловая блокировка), состояние
+последнего бекапа хранится в общем файле.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from app.config import (
+    BACKUP_SCHEDULE, BACKUP_SCHEDULE_KIND, BACKUP_KEEP_DAILY, BACKUP_KEEP_WEEKLY, BACKUP_KEEP_MONTHLY,
+)
+from app.services.backup import (
+    backup_lock, create_backup, create_incremental_backup, list_backups, delete_backups,
+)
+from app.utils.file_lock import FileLock, shared_path
+
+logger = logging.getLogger(__name__)
+
+# (минимум, максимум) для полей cron: минута, час, день месяца, месяц, день недели (0 и 7 — воскресенье)
+_CRON_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+
+@dataclass(frozen=True)
+class CronSchedule:
+    minutes: frozenset[int]
+    hours: frozenset[int]
+    days: frozenset[int]
+    months: frozenset[int]
+    weekdays: frozenset[int]
+    days_restricted: bool
+    weekdays_restricted: bool
+
+    def matches_day(self, dt: datetime) -> bool:
+        """День подходит: как в cron, при заданных и дне месяца, и дне недели достаточно одного."""
+        if dt.month not in self.months:
+            return False
+        in_days = dt.day in self.days
+        in_weekdays = (dt.isoweekday() % 7) in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return in_days or in_weekdays
+        return in_days and in_weekdays
+
+    def next_run(self, after: datetime) -> datetime:
+        """Ближайший момент строго после after, подходящий под расписание."""
+        dt = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            if not self.matches_day(dt):
+                dt = dt.replace(hour=0, minute=0) + timedelta(days=1)
+            elif dt.hour not in self.hours:
+                dt = dt.replace(minute=0) + timedelta(hours=1)
+            elif dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+            else:
+                return dt
+        raise ValueError("Расписание никогда не срабатывает")
+
+
+def _parse_field(field: str, lo: int, hi: int) -> frozenset[int]:
+    values: set[int] = set()
+    for part in field.split(","):
+        base, _, step_s = part.partition("/")
+        step = int(step_s) if step_s else 1
+        if base == "*":
+            start, end = lo, hi
+        elif "-" in base:
+            a, b = base.split("-", 1)
+            start, end = int(a), int(b)
+        else:
+            start = int(base)
+            end = hi if step_s else start
+        if step < 1 or start < lo or end > hi or start > end:
+            raise ValueError(f"Недопустимое поле cron: {field}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+def parse_cron(expr: str) -> CronSchedule:
+    """
+    Разбирает cron-выражение из 5 полей: '*', числа, диапазоны 'a-b', списки 'a,b', шаг '/n'.
+    Выражение, которое никогда не срабатывает (например «0 0 31 2 *»), — ValueError.
+    """
+    fields = expr.split()
+    if len(fields) != 5:
+        raise ValueError("Cron-выражение должно состоять из 5 полей")
+    try:
+        parsed = [_parse_field(f, lo, hi) for f, (lo, hi) in zip(fields, _CRON_RANGES)]
+    except ValueError as e:
+        raise ValueError(f"Недопустимое cron-выражение «{expr}»: {e}") from e
+    weekdays = frozenset(d % 7 for d in parsed[4])
+    schedule = CronSchedule(
+        minutes=parsed[0], hours=parsed[1], days=parsed[2], months=parsed[3], weekdays=weekdays,
+        days_restricted=fields[2] != "*", weekdays_restricted=fields[4] != "*",
+    )
+    # Проверка при разборе, а не в цикле планировщика: иначе задача молча упадёт на первом проходе
+    try:
+        schedule.next_run(datetime.now())
+    except ValueError as e:
+        raise ValueError(f"Недопустимое cron-выражение «{expr}»: {e}") from e
+    return schedule
+
+
+def select_backups_to_keep(
+    backups: list[tuple[str, datetime]], daily: int, weekly: int, monthly: int,
+) -> set[str]:
+    """
+    GFS-ретенция: самый свежий бекап за каждый из последних daily дней, weekly недель (ISO)
+    и monthly месяцев. Самый свежий бекап сохраняется всегда. backups — [(имя, время создания)].
+    """
+    ordered = sorted(backups, key=lambda b: b[1], reverse=True)
+    keep: set[str] = {ordered[0][0]} if ordered else set()
+    for count, period in (
+        (daily, lambda d: d.date()),
+        (weekly, lambda d: d.isocalendar()[:2]),
+        (monthly, lambda d: (d.year, d.month)),
+    ):
+        seen = set()
+        for name, created in ordered:
+            key = period(created)
+            if key in seen:
+                continue
+            if len(seen) >= count:
+                break
+            seen.add(key)
+            keep.add(name)
+    return keep
+
+
+def apply_retention(lock_held: bool = False) -> list[str]:
+    """
+    Удаляет плановые бекапы, не попавшие в GFS-ретенцию; возвращает имена удалённых.
+    Выполняется под блокировкой бекапов (lock_held — её уже держит вызывающий, см. run_backup).
+    """
+    backups = [(b["name"], b["mtime"]) for b in list_backups() if b["scheduled"]]
+    keep = select_backups_to_keep(backups, BACKUP_KEEP_DAILY, BACKUP_KEEP_WEEKLY, BACKUP_KEEP_MONTHLY)
+    to_delete = [name for name, _ in backups if name not in keep]
+    if to_delete:
+        delete_backups(to_delete, lock_held=lock_held)
+        logger.info("backup_retention deleted=%s", len(to_delete))
+    return to_delete
+
+
+# Бекап выполняется не более чем в одном воркере сразу (блокировка хранилища из backup); состояние
+# последнего бекапа — в общем файле, чтобы страница админки в любом воркере показывала одно и то же
+_backup_lock = backup_lock
+_STATUS_FILE = shared_path("backup-status.json")
+# Плановые бекапы делает один воркер — тот, кто держит эту блокировку
+_scheduler_lock = FileLock("scheduler")
+
+
+def _write_status(**fields) -> None:
+    status = read_backup_status()
+    status.update(fields)
+    status.pop("running", None)
+    tmp = _STATUS_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(status, ensure_ascii=False, default=str), encoding="utf-8")
+    os.replace(tmp, _STATUS_FILE)
+
+
+def is_backup_running() -> bool:
+    """
+    Выполняется ли бекап: в этом процессе (блокировка занята) или в другом воркере
+    (проверка блокировки отдельным дескриптором).
+    """
+    if _backup_lock.held:
+        return True
+    probe = FileLock("backup")
+    if probe.acquire():
+        probe.release()
+        return False
+    return True
+
+
+def read_backup_status() -> dict:
+    """Состояние для страницы админки: {running, last_name, last_error, finished_at}."""
+    try:
+        status = json.loads(_STATUS_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        status = {"last_name": None, "last_error": None, "finished_at": None}
+    status["running"] = is_backup_running()
+    return status
+
+
+def _run_backup(kind: str, scheduled: bool = False) -> str:
+    if kind == "incremental":
+        return create_incremental_backup(scheduled)["name"]
+    return create_backup(scheduled)
+
+
+async def run_backup(kind: str, scheduled: bool = False) -> str | None:
+    """
+    Создаёт бекап в потоке; одновременно (во всех воркерах) выполняется не более одного бекапа.
+    scheduled — плановый бекап (backup_auto_*): затем, не отпуская блокировку, прореживает старые
+    плановые бекапы и удаляет ненужные объекты.
+    """
+    if not _backup_lock.acquire():
+        return None
+    try:
+        name = await asyncio.to_thread(_run_backup, kind, scheduled)
+        _write_status(last_name=name, last_error=None, finished_at=datetime.now().isoformat(timespec="seconds"))
+        logger.info("backup_created name=%s kind=%s", name, kind)
+        if scheduled:
+            try:
+                await asyncio.to_thread(apply_retention, True)
+            except Exception:
+                logger.exception("backup_retention_failed")
+        return name
+    except Exception as e:
+        _write_status(last_name=None, last_error=str(e), finished_at=datetime.now().isoformat(timespec="seconds"))
+        logger.exception("backup_failed kind=%s", kind)
+        return None
+    finally:
+        _backup_lock.release()
+
+
+_background_tasks: set[asyncio.Task] = set()
+
+
+def run_backup_in_background(kind: str) -> bool:
+    """Запускает бекап фоновой задачей; False — если бекап уже выполняется."""
+    if is_backup_running():
+        return False
+    task = asyncio.create_task(run_backup(kind))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return True
+
+
+async def _scheduler_loop(schedule: CronSchedule) -> None:
+    while True:
+        next_at = schedule.next_run(datetime.now())
+        await asyncio.sleep(max(0.0, (next_at - datetime.now()).total_seconds()))
+        # Блокировка держится до завершения процесса; если ведущий воркер упал, её захватит другой
+        if not (_scheduler_lock.held or _scheduler_lock.acquire()):
+            continue
+        await run_backup(BACKUP_SCHEDULE_KIND, scheduled=True)
+
+
+def start_backup_scheduler() -> asyncio.Task | None:
+    """Запускает планировщик, если задан BACKUP_SCHEDULE (иначе None); неверное расписание — ValueError при старте."""
+    if not BACKUP_SCHEDULE.strip():
+        return None
+    schedule = parse_cron(BACKUP_SCHEDULE)
+    logger.info("backup_scheduler_started schedule=%s kind=%s", BACKUP_SCHEDULE, BACKUP_SCHEDULE_KIND)
+    return asyncio.create_task(_scheduler_loop(schedule))
+
+
+async def stop_backup_scheduler(task: asyncio.Task | None) -> None:
+    """Останавливает задачу планировщика (при завершении приложения)."""
+    if task is None:
+        return
+    task.cancel()
+    _scheduler_lock.release()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
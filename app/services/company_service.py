@@ -5,6 +5,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import Company
+from app.services.data_version_service import bump_data_version
 
 
 async def create_company(
@@ -19,6 +20,7 @@ async def create_company(
     )
     db.add(company)
     await db.flush()
+    await bump_data_version(db, company.id)
     return company
 
 
@@ -31,10 +33,11 @@ async def update_company(
     """Обновляет поля организации."""
     company.name = name.strip()
     company.short_info = (short_info or "").strip() or None
-    await db.flush()
+    await bump_data_version(db, company.id)
 
 
 async def delete_company(db: AsyncSession, company: Company) -> None:
     """Удаляет организацию из БД."""
+    company_id = company.id
     await db.delete(company)
-    await db.flush()
+    await bump_data_version(db, company_id)
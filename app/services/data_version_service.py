@@ -0,0 +1,47 @@
+"""
+Версии данных для HTTP-кэширования страниц: счётчики изменений увеличиваются сервисами
+техники, организаций и инвентаризации в той же транзакции, что и сами изменения.
+Страницы сравнивают ETag из версий с If-None-Match и отвечают 304 без тяжёлых запросов.
+"""
+from datetime import datetime, timezone
+
+from fastapi import Request
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import DataVersion, User
+from app.repositories import reference_repo
+from app.utils.http_cache import PageValidators, make_page_validators
+
+GLOBAL_SCOPE = "global"
+
+
+def company_scope(company_id: int) -> str:
+    return f"company:{company_id}"
+
+
+async def bump_data_version(db: AsyncSession, *company_ids: int | None) -> None:
+    """Увеличивает глобальную версию и версии перечисленных организаций (None пропускаются)."""
+    now = datetime.now(timezone.utc)
+    scopes = [GLOBAL_SCOPE] + [company_scope(c) for c in dict.fromkeys(company_ids) if c is not None]
+    for scope in scopes:
+        result = await db.execute(
+            update(DataVersion)
+            .where(DataVersion.scope == scope)
+            .values(version=DataVersion.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            db.add(DataVersion(scope=scope, version=1, updated_at=now))
+    await db.flush()
+
+
+async def page_validators(
+    db: AsyncSession,
+    request: Request,
+    user: User,
+    scope: str = GLOBAL_SCOPE,
+    time_dependent: bool = True,
+) -> PageValidators:
+    """ETag/Last-Modified страницы по версии данных scope (один запрос по первичному ключу)."""
+    version = await reference_repo.get_data_version(db, scope)
+    return make_page_validators(request, user, version, time_dependent=time_dependent)
@@ -0,0 +1,164 @@
+"""
+Heartbeat агентов: отметки «устройство в сети» копятся в памяти процесса (по id, серийному номеру, IP;
+на устройство хранится самая поздняя) и раз в HEARTBEAT_FLUSH_INTERVAL секунд пишутся в
+Asset.last_seen_at одним UPDATE. Тысячи пингов одного устройства между сбросами — одна запись.
+"""
+import asyncio
+import ipaddress
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import HEARTBEAT_FLUSH_INTERVAL, INACTIVE_DAYS_THRESHOLD
+from app.repositories import asset_repo
+from app.services.data_version_service import bump_data_version
+
+logger = logging.getLogger(__name__)
+
+
+def _utc_naive(ts: datetime | None, now: datetime) -> datetime:
+    """last_seen_at хранится в UTC без tzinfo; отметки из будущего обрезаются до now."""
+    if ts is None:
+        return now
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return min(ts, now)
+
+
+def normalize_ip(value: str) -> str | None:
+    """Каноническая запись IPv4/IPv6 или None, если это не адрес."""
+    try:
+        return str(ipaddress.ip_address(value.strip()))
+    except ValueError:
+        return None
+
+
+class HeartbeatBuffer:
+    """Несброшенные отметки: ключ устройства -> самое позднее время."""
+
+    def __init__(self) -> None:
+        self.by_id: dict[int, datetime] = {}
+        self.by_serial: dict[str, datetime] = {}
+        self.by_ip: dict[str, datetime] = {}
+        self.received = 0
+        self.flushed = 0
+        self.unmatched = 0
+
+    def add(
+        self,
+        asset_id: int | None = None,
+        serial_number: str | None = None,
+        ip: str | None = None,
+        seen_at: datetime | None = None,
+    ) -> bool:
+        """Запоминает отметку; False — нет ни одного пригодного идентификатора."""
+        ts = _utc_naive(seen_at, datetime.utcnow())
+        if asset_id is not None:
+            target, key = self.by_id, asset_id
+        elif serial_number and serial_number.strip():
+            target, key = self.by_serial, serial_number.strip()
+        elif ip and (key := normalize_ip(ip)):
+            target = self.by_ip
+        else:
+            return False
+        prev = target.get(key)
+        if prev is None or ts > prev:
+            target[key] = ts
+        self.received += 1
+        return True
+
+    def pending(self) -> int:
+        return len(self.by_id) + len(self.by_serial) + len(self.by_ip)
+
+    def drain(self) -> tuple[dict[int, datetime], dict[str, datetime], dict[str, datetime]]:
+        """Забирает накопленное и начинает новый буфер (пинги во время сброса не теряются)."""
+        drained = self.by_id, self.by_serial, self.by_ip
+        self.by_id, self.by_serial, self.by_ip = {}, {}, {}
+        return drained
+
+    def restore(self, drained: tuple[dict[int, datetime], dict[str, datetime], dict[str, datetime]]) -> None:
+        """Возвращает забранное drain (запись не удалась); при совпадении ключа остаётся более поздняя отметка."""
+        for target, source in zip((self.by_id, self.by_serial, self.by_ip), drained):
+            for key, ts in source.items():
+                prev = target.get(key)
+                if prev is None or ts > prev:
+                    target[key] = ts
+
+
+heartbeat_buffer = HeartbeatBuffer()
+
+
+async def flush_heartbeats(db: AsyncSession, buffer: HeartbeatBuffer = heartbeat_buffer, commit: bool = False) -> int:
+    """
+    Сбрасывает буфер в БД: серийные номера и IP (таблица asset_ip_addresses) переводятся в id
+    пакетными запросами, затем один UPDATE last_seen_at. Если хотя бы одно устройство было неактивным, версия данных
+    увеличивается (меняется подсветка списков и дашборд). Возвращает число обновлённых активов.
+    commit — зафиксировать транзакцию здесь же (фоновый сброс). Если запись или commit не удались,
+    забранные отметки возвращаются в буфер и уйдут со следующим сбросом.
+    """
+    drained = buffer.drain()
+    try:
+        updated, unmatched = await _write_heartbeats(db, *drained)
+        if commit:
+            await db.commit()
+    except Exception:
+        buffer.restore(drained)
+        raise
+    buffer.unmatched += unmatched
+    buffer.flushed += updated
+    return updated
+
+
+async def _write_heartbeats(
+    db: AsyncSession, by_id: dict[int, datetime], by_serial: dict[str, datetime], by_ip: dict[str, datetime],
+) -> tuple[int, int]:
+    """Один UPDATE last_seen_at по отметкам; возвращает (обновлено активов, не найдено устройств)."""
+    seen: dict[int, datetime] = {}
+
+    def merge(asset_id: int, ts: datetime) -> None:
+        if asset_id not in seen or ts > seen[asset_id]:
+            seen[asset_id] = ts
+
+    unmatched = 0
+    if by_id:
+        existing = await asset_repo.get_existing_ids(db, list(by_id))
+        unmatched += len(by_id) - len(existing)
+        for asset_id in existing:
+            merge(asset_id, by_id[asset_id])
+    for source, resolved in (
+        (by_serial, await asset_repo.get_ids_by_serial_numbers(db, list(by_serial)) if by_serial else {}),
+        (by_ip, await asset_repo.get_ids_by_ips(db, list(by_ip)) if by_ip else {}),
+    ):
+        unmatched += len(source) - len(resolved)
+        for key, asset_id in resolved.items():
+            merge(asset_id, source[key])
+    if not seen:
+        return 0, unmatched
+    threshold = datetime.utcnow() - timedelta(days=INACTIVE_DAYS_THRESHOLD)
+    revived = await asset_repo.count_inactive_among(db, list(seen), threshold)
+    await asset_repo.bulk_update_last_seen(db, seen)
+    if revived:
+        await bump_data_version(db)
+    return len(seen), unmatched
+
+
+async def flush_loop() -> None:
+    """Фоновая задача (из main.lifespan): периодический сброс и финальный сброс при остановке."""
+    from app.database import AsyncSessionLocal
+
+    async def _flush_once() -> None:
+        if not heartbeat_buffer.pending():
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                await flush_heartbeats(db, commit=True)
+        except Exception:
+            logger.exception("Не удалось записать heartbeat в БД")
+
+    try:
+        while True:
+            await asyncio.sleep(HEARTBEAT_FLUSH_INTERVAL)
+            await _flush_once()
+    finally:
+        await asyncio.shield(_flush_once())
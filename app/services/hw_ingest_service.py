@@ -0,0 +1,113 @@
+"""
+Приём отчётов агентов об оборудовании: технические поля карточки обновляются только при изменениях.
+Отчёт нормализуется и хешируется; совпадение с Asset.hw_report_hash — отчёт пропускается без чтения
+карточки. Изменённые карточки обновляются пакетным UPDATE, события «Изменение» с changes_json
+(тот же формат, что у формы редактирования) вставляются одним INSERT.
+"""
+import hashlib
+import json
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.asset import AssetEventType
+from app.repositories import asset_repo
+from app.schemas.api import HardwareReport
+from app.services.data_version_service import bump_data_version
+from app.services.heartbeat_service import heartbeat_buffer
+from app.utils.asset_changes import build_asset_changes
+from app.utils.ip_addresses import ip_rows_for
+from app.utils.specs import spec_numbers
+
+logger = logging.getLogger(__name__)
+
+# Поля карточки, которые заполняет агент
+HW_REPORT_FIELDS = (
+    "cpu", "ram", "disk1_type", "disk1_capacity", "network_card", "motherboard", "os", "network_interfaces",
+)
+
+
+def normalize_hw_report(report: HardwareReport) -> dict:
+    """Значения колонок Asset из отчёта: только переданные агентом поля, пустые строки -> None."""
+    data = {}
+    for key in HW_REPORT_FIELDS:
+        if key not in report.model_fields_set:
+            continue
+        value = getattr(report, key)
+        if key == "network_interfaces":
+            interfaces = [
+                {"label": (i.label or "").strip(), "type": i.type or "network", "ip": (i.ip or "").strip()}
+                for i in value or []
+            ]
+            data[key] = json.dumps(interfaces, ensure_ascii=False) if interfaces else None
+        else:
+            data[key] = (value or "").strip() or None
+    return data
+
+
+def hw_report_hash(data: dict) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+async def ingest_hw_reports(
+    db: AsyncSession,
+    reports: list[HardwareReport],
+    created_by_id: int | None = None,
+) -> dict:
+    """
+    Применяет пакет отчётов. Возвращает счётчики received / updated / unchanged / unmatched.
+    Несколько отчётов об одном устройстве в пакете — действует последний.
+    """
+    serials = [r.serial_number.strip() for r in reports if r.asset_id is None and r.serial_number and r.serial_number.strip()]
+    serial_ids = await asset_repo.get_ids_by_serial_numbers(db, serials) if serials else {}
+    by_id: dict[int, dict] = {}
+    resolved: list[int | None] = []
+    for report in reports:
+        asset_id = report.asset_id
+        if asset_id is None and report.serial_number:
+            asset_id = serial_ids.get(report.serial_number.strip())
+        resolved.append(asset_id)
+        if asset_id is not None:
+            by_id[asset_id] = normalize_hw_report(report)
+
+    stored = await asset_repo.get_hw_report_hashes(db, list(by_id))
+    hashes = {asset_id: hw_report_hash(data) for asset_id, data in by_id.items() if asset_id in stored}
+    changed_ids = [asset_id for asset_id, h in hashes.items() if stored[asset_id] != h]
+
+    rows, hash_only, events, company_ids = [], [], [], set()
+    ip_rows: dict[int, list[dict]] = {}
+    for asset in await asset_repo.get_assets_by_ids(db, changed_ids):
+        data = by_id[asset.id]
+        changes = build_asset_changes(asset, data)
+        if changes:
+            if (rows_for_ips := ip_rows_for(data, asset)) is not None:
+                ip_rows[asset.id] = rows_for_ips
+            rows.append({"id": asset.id, **data, **spec_numbers(data, asset), "hw_report_hash": hashes[asset.id]})
+            events.append({
+                "asset_id": asset.id,
+                "event_type": AssetEventType.updated,
+                "description": "Отчёт агента об оборудовании",
+                "created_by_id": created_by_id,
+                "changes_json": json.dumps(changes, ensure_ascii=False),
+            })
+            company_ids.add(asset.company_id)
+        else:
+            # Карточка уже совпадает с отчётом — запоминаем только хеш
+            hash_only.append({"id": asset.id, "hw_report_hash": hashes[asset.id]})
+    await asset_repo.bulk_update_assets(db, rows)
+    await asset_repo.bulk_update_assets(db, hash_only, touch=False)
+    await asset_repo.bulk_insert_events(db, events)
+    await asset_repo.replace_asset_ips(db, ip_rows)
+    if events:
+        await bump_data_version(db, *company_ids)
+    # Отчёт агента — заодно и отметка «устройство в сети»
+    for asset_id in hashes:
+        heartbeat_buffer.add(asset_id=asset_id)
+    result = {
+        "received": len(reports),
+        "updated": len(events),
+        "unchanged": len(hashes) - len(events),
+        "unmatched": sum(1 for asset_id in resolved if asset_id not in stored),
+    }
+    logger.info("hw_reports_ingested %s", result)
+    return result
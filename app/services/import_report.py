@@ -0,0 +1,63 @@
+"""
+Отчёт проверки импорта (dry-run): одна строка отчёта на строку файла — что с ней будет и почему.
+CSV отдаётся потоком построчно; XLSX пишется в режиме write_only (без хранения ячеек в памяти).
+"""
+import csv
+from collections.abc import Iterator
+from io import BytesIO, StringIO
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+REPORT_HEADERS = ["Файл / лист", "Строка", "Серийный номер", "Название", "Результат", "Замечания"]
+
+ACTION_LABELS = {
+    "create": "Будет создана",
+    "update": "Будет обновлена",
+    "unchanged": "Без изменений",
+    "skip": "Будет пропущена",
+}
+
+
+def _report_values(entry: dict) -> list:
+    return [
+        entry.get("source") or "",
+        entry["row_number"],
+        entry.get("serial_number") or "",
+        entry.get("name") or "",
+        ACTION_LABELS.get(entry["action"], entry["action"]),
+        "; ".join(entry.get("notes") or []),
+    ]
+
+
+def iter_import_report_csv(report: list[dict]) -> Iterator[bytes]:
+    """CSV (UTF-8 с BOM, разделитель «;» — открывается в Excel) по строкам."""
+    buf = StringIO()
+    writer = csv.writer(buf, delimiter=";")
+    buf.write("\ufeff")
+    writer.writerow(REPORT_HEADERS)
+    for entry in report:
+        writer.writerow(_report_values(entry))
+        if buf.tell() > 64 * 1024:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue().encode("utf-8")
+
+
+def build_import_report_xlsx(report: list[dict]) -> BytesIO:
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Проверка импорта")
+    header = []
+    for h in REPORT_HEADERS:
+        cell = WriteOnlyCell(ws, value=h)
+        cell.font = Font(bold=True)
+        header.append(cell)
+    ws.append(header)
+    for entry in report:
+        ws.append(_report_values(entry))
+    buf = BytesIO()
+    wb.save(buf)
+    buf.seek(0)
+    return buf
@@ -0,0 +1,202 @@
+"""
+Импорт оборудования из разобранных строк файла (см. import_xlsx): пакетное сопоставление организаций
+и серийных номеров, пакетные INSERT/UPDATE и события.
+Режимы: create — строки с уже существующим серийным номером пропускаются; upsert — такие строки
+сравниваются с карточкой, и обновляются только отличающиеся поля (повторный импорт той же выгрузки
+ничего не пишет). dry_run — та же проверка всех строк без записи, итог по каждой строке в report.
+"""
+import json
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.asset import AssetEventType, AssetStatus, EquipmentKind
+from app.repositories import asset_repo, reference_repo
+from app.services.assets_service import MOVE_FIELDS
+from app.services.data_version_service import bump_data_version
+from app.services.hw_ingest_service import HW_REPORT_FIELDS
+from app.services.import_xlsx import HEADER_TO_FIELD
+from app.utils.asset_changes import build_asset_changes
+from app.utils.ip_addresses import ip_rows_for
+from app.utils.specs import SPEC_NUMBER_FIELDS, spec_numbers
+
+logger = logging.getLogger(__name__)
+
+IMPORT_MODES = ("create", "upsert")
+IMPORT_EVENT_DESCRIPTION = "Импорт из Excel"
+
+# Поля Asset, которые может заполнить импорт (организация приходит по имени и становится company_id)
+IMPORT_ASSET_FIELDS = tuple(
+    "company_id" if field == "company_name" else field for field in HEADER_TO_FIELD.values()
+)
+
+
+def _row_label(row: dict) -> str:
+    """«Строка N» или «файл / лист, строка N» — при импорте нескольких файлов и листов."""
+    if row.get("source"):
+        return f"{row['source']}, строка {row['row_number']}"
+    return f"Строка {row['row_number']}"
+
+
+def _row_ref(row: dict) -> str:
+    """Ссылка на строку внутри сообщения: «строка N» или «файл / лист, строка N»."""
+    return _row_label(row) if row.get("source") else f"строка {row['row_number']}"
+
+
+def _asset_data(row: dict, company_ids: dict[str, int], notes: list[str]) -> dict:
+    """
+    Строка импорта -> значения колонок Asset (только столбцы, что есть в файле).
+    Нераспознанные статус и организация не передаются: новая карточка получит значение по умолчанию,
+    существующая сохранит своё.
+    """
+    data = {}
+    for key, value in row.items():
+        if key in ("row_number", "source", "issues"):
+            continue
+        if key == "company_name":
+            if value is None:
+                data["company_id"] = None
+            elif value.lower() in company_ids:
+                data["company_id"] = company_ids[value.lower()]
+            else:
+                notes.append(f"Организация «{value}» не найдена")
+        elif key == "equipment_kind":
+            data[key] = EquipmentKind(value) if value else None
+        elif key == "status":
+            if value is not None:
+                data[key] = value
+        else:
+            data[key] = value
+    return data
+
+
+async def import_assets(
+    db: AsyncSession,
+    rows: list[dict],
+    created_by_id: int,
+    mode: str = "create",
+    dry_run: bool = False,
+) -> dict:
+    """
+    Применяет строки импорта. Возвращает счётчики created / updated / unchanged / skipped,
+    messages — причины пропуска строк («Строка N: ...») и report — итог по каждой строке
+    (row_number, source, serial_number, name, action: create / update / unchanged / skip, notes).
+    Строки нескольких файлов и листов приходят одним пакетом: повтор серийного номера между ними
+    пропускается с указанием, где номер встретился впервые; запись — одной транзакцией.
+    Серийные номера сопоставляются одним запросом на пакет; новые карточки и события вставляются
+    пакетно, изменённые — пакетным UPDATE с событием «Изменение» (changes_json «было → стало»);
+    адреса из «IP адрес» пересобираются в asset_ip_addresses одним DELETE/INSERT на пакет.
+    dry_run — ничего не записывать.
+    """
+    if mode not in IMPORT_MODES:
+        raise ValueError(f"Неизвестный режим импорта: {mode}")
+    company_ids = await reference_repo.get_company_ids_by_name(db) if any("company_name" in r for r in rows) else {}
+    serials = list(dict.fromkeys(r["serial_number"] for r in rows if r.get("serial_number")))
+    # network_interfaces — чтобы пересобрать адреса при смене «IP адрес»
+    columns = [*IMPORT_ASSET_FIELDS, "network_interfaces"] if mode == "upsert" else []
+    existing = {row.serial_number: row for row in await asset_repo.get_rows_by_serial_numbers(db, serials, columns)}
+    deleted = await asset_repo.get_deleted_serial_numbers(db, [s for s in serials if s not in existing])
+
+    creates, updates, events, touched_companies = [], [], [], set()
+    ip_rows: dict[int, list[dict]] = {}
+    seen_serials: dict[str, dict] = {}
+    messages: list[str] = []
+    report: list[dict] = []
+    unchanged = 0
+    for r in rows:
+        notes = list(r.get("issues") or [])
+        data = _asset_data(r, company_ids, notes)
+        serial = data.get("serial_number")
+        entry = {
+            "row_number": r["row_number"], "source": r.get("source"),
+            "serial_number": serial, "name": data.get("name"), "notes": notes,
+        }
+        report.append(entry)
+        skip_reason = None
+        current = existing.get(serial) if serial else None
+        if serial and serial in seen_serials:
+            skip_reason = f"серийный номер «{serial}» повторяется в файле — впервые {_row_ref(seen_serials[serial])}"
+        elif serial in deleted:
+            skip_reason = f"серийный номер «{serial}» принадлежит удалённой записи"
+        elif current is not None and mode == "create":
+            skip_reason = f"серийный номер «{serial}» уже есть в базе"
+        if serial:
+            seen_serials.setdefault(serial, r)
+        if skip_reason:
+            entry["action"] = "skip"
+            notes.insert(0, skip_reason)
+            messages.append(f"{_row_label(r)}: {skip_reason}")
+            continue
+        if current is None:
+            entry["action"] = "create"
+            creates.append(data)
+            continue
+        diff = {k: v for k, v in data.items() if getattr(current, k) != v}
+        changes = build_asset_changes(current, diff)
+        if not changes:
+            entry["action"] = "unchanged"
+            unchanged += 1
+            continue
+        if current.status == AssetStatus.retired and any(k in diff for k in MOVE_FIELDS):
+            skip_reason = f"«{serial}» списано — перемещение и выдача запрещены"
+            entry["action"] = "skip"
+            notes.insert(0, skip_reason)
+            messages.append(f"{_row_label(r)}: {skip_reason}")
+            continue
+        entry["action"] = "update"
+        notes.extend(f"{c['field_label']}: {c['old']} → {c['new']}" for c in changes)
+        diff.update(spec_numbers(diff, current))
+        if (rows_for_ips := ip_rows_for(diff, current)) is not None:
+            ip_rows[current.id] = rows_for_ips
+        if any(k in HW_REPORT_FIELDS for k in diff):
+            # Поля агента изменены импортом — следующий отчёт агента снова применится
+            diff["hw_report_hash"] = None
+        updates.append({"id": current.id, **diff})
+        events.append({
+            "asset_id": current.id,
+            "event_type": AssetEventType.updated,
+            "description": IMPORT_EVENT_DESCRIPTION,
+            "created_by_id": created_by_id,
+            "changes_json": json.dumps(changes, ensure_ascii=False),
+        })
+        touched_companies.update((current.company_id, diff.get("company_id", current.company_id)))
+
+    result = {
+        "created": len(creates),
+        "updated": len(updates),
+        "unchanged": unchanged,
+        "skipped": len(messages),
+    }
+    if dry_run:
+        logger.info("assets_import_checked mode=%s %s", mode, result)
+        return {**result, "messages": messages, "report": report}
+
+    if creates:
+        # Один набор колонок на все строки — одна пакетная вставка
+        defaults = {field: None for field in IMPORT_ASSET_FIELDS + SPEC_NUMBER_FIELDS}
+        defaults["status"] = AssetStatus.active
+        new_ids = await asset_repo.bulk_insert_assets(
+            db, [{**defaults, **data, **spec_numbers(data)} for data in creates]
+        )
+        events.extend(
+            {
+                "asset_id": asset_id,
+                "event_type": AssetEventType.created,
+                "description": IMPORT_EVENT_DESCRIPTION,
+                "created_by_id": created_by_id,
+            }
+            for asset_id in new_ids
+        )
+        touched_companies.update(data.get("company_id") for data in creates)
+        ip_rows.update(
+            (asset_id, rows_for_ips)
+            for asset_id, data in zip(new_ids, creates)
+            if (rows_for_ips := ip_rows_for(data))
+        )
+    await asset_repo.bulk_update_assets(db, updates)
+    await asset_repo.replace_asset_ips(db, ip_rows)
+    await asset_repo.bulk_insert_events(db, events)
+    if events:
+        await bump_data_version(db, *touched_companies)
+    logger.info("assets_imported mode=%s %s created_by_id=%s", mode, result, created_by_id)
+    return {**result, "messages": messages, "report": report}
@@ -0,0 +1,261 @@
+"""
+Источники строк для импорта оборудования: Excel (.xlsx), OpenDocument (.ods), CSV и NDJSON.
+Каждый источник отдаёт записи (номер строки, {заголовок как в файле: значение}) потоком,
+дальше общий путь: синонимы заголовков и нормализация (import_xlsx.parse_import_records),
+пакетная запись (import_service). CSV — самый быстрый формат для больших выгрузок.
+Несколько файлов и листов книги разбираются параллельно в пуле процессов (parse_import_files).
+"""
+import asyncio
+import codecs
+import csv
+import html
+import io
+import json
+import re
+import zipfile
+from collections.abc import Callable, Iterator, Sequence
+from itertools import zip_longest
+from typing import Any
+from xml.etree import ElementTree
+
+from openpyxl import load_workbook
+
+from app.services.import_xlsx import parse_import_records
+from app.utils.process_pool import run_in_process
+
+# Сколько байт начала CSV смотреть для определения кодировки и разделителя
+CSV_SNIFF_BYTES = 64 * 1024
+CSV_DELIMITERS = ";,\t|"
+
+_ODS_TABLE = "{urn:oasis:names:tc:opendocument:xmlns:table:1.0}"
+_ODS_OFFICE = "{urn:oasis:names:tc:opendocument:xmlns:office:1.0}"
+_ODS_TEXT_P = "{urn:oasis:names:tc:opendocument:xmlns:text:1.0}p"
+# Пустые ячейки в ODS хранятся как «повторить N раз» до конца листа — столько хватает для любых заголовков
+_ODS_MAX_EMPTY_REPEAT = 1024
+
+
+NO_HEADER_ERROR = "Не найдена строка заголовков (первая строка)."
+
+
+class ImportFileError(ValueError):
+    """Файл не читается: повреждён, неизвестная кодировка, нет строки заголовков."""
+
+
+def records_from_table(rows: Iterator[Sequence[Any]]) -> Iterator[tuple[int, dict[Any, Any]]]:
+    """Табличный источник (первая строка — заголовки) -> записи {заголовок: значение}."""
+    header = [h if h is not None and str(h).strip() else None for h in next(rows, ())]
+    if not any(header):
+        raise ImportFileError(NO_HEADER_ERROR)
+    for row_number, values in enumerate(rows, start=2):
+        # Короткая строка (хвост пустых ячеек не записан) — недостающие ячейки пустые, а не «нет столбца»
+        yield row_number, {h: v for h, v in zip_longest(header, values) if h is not None}
+
+
+def xlsx_rows(content: bytes, sheet: str | None = None) -> Iterator[tuple]:
+    """
+    Строки листа Excel (по умолчанию активного): read_only + iter_rows, без обращения к ячейкам по адресу.
+    Листа sheet в книге нет — ImportFileError.
+    """
+    try:
+        wb = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    except Exception as e:
+        raise ImportFileError(f"Не удалось открыть файл: {e}")
+    if sheet is not None and sheet not in wb.sheetnames:
+        wb.close()
+        raise ImportFileError(f"В файле нет листа «{sheet}».")
+    ws = wb[sheet] if sheet is not None else wb.active
+    if ws is None:
+        raise ImportFileError("В файле нет листа.")
+    try:
+        yield from ws.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def _sniff_encoding(sample: bytes) -> str:
+    """UTF-8 (с BOM или без) или cp1251 — CSV из Excel с русской локалью."""
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        # final=False: обрезанный на границе выборки многобайтный символ — не ошибка
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "cp1251"
+
+
+def csv_rows(content: bytes, sheet: str | None = None) -> Iterator[list[str]]:
+    """Строки CSV: кодировка и разделитель определяются по началу файла, текст декодируется потоком."""
+    sample = content[:CSV_SNIFF_BYTES]
+    encoding = _sniff_encoding(sample)
+    head = sample.decode(encoding, errors="ignore")
+    try:
+        delimiter = csv.Sniffer().sniff("\n".join(head.splitlines()[:20]), CSV_DELIMITERS).delimiter
+    except csv.Error:
+        delimiter = ";"
+    text = io.TextIOWrapper(io.BytesIO(content), encoding=encoding, newline="")
+    try:
+        yield from csv.reader(text, delimiter=delimiter)
+    except UnicodeDecodeError:
+        raise ImportFileError(f"Файл не в кодировке {encoding}: сохраните CSV в UTF-8")
+
+
+def _ods_cell_value(cell) -> str | None:
+    value_type = cell.get(f"{_ODS_OFFICE}value-type")
+    if value_type == "date":
+        return (cell.get(f"{_ODS_OFFICE}date-value") or "")[:10] or None
+    if value_type in ("float", "percentage", "currency"):
+        return cell.get(f"{_ODS_OFFICE}value")
+    if value_type == "boolean":
+        return cell.get(f"{_ODS_OFFICE}boolean-value")
+    text = "\n".join("".join(p.itertext()) for p in cell.iter(_ODS_TEXT_P))
+    return text or None
+
+
+def ods_rows(content: bytes, sheet: str | None = None) -> Iterator[list]:
+    """
+    Строки листа OpenDocument (по умолчанию первого): content.xml разбирается потоком (iterparse).
+    Листа sheet в книге нет — ImportFileError.
+    """
+    try:
+        zf = zipfile.ZipFile(io.BytesIO(content))
+        xml = zf.open("content.xml")
+    except (zipfile.BadZipFile, KeyError) as e:
+        raise ImportFileError(f"Не удалось открыть файл: {e}")
+    tables, active = 0, False
+    with zf, xml:
+        try:
+            for event, el in ElementTree.iterparse(xml, events=("start", "end")):
+                if el.tag == f"{_ODS_TABLE}table":
+                    if event == "start":
+                        tables += 1
+                        active = el.get(f"{_ODS_TABLE}name") == sheet if sheet is not None else tables == 1
+                    elif active:
+                        return
+                    continue
+                if event != "end" or el.tag != f"{_ODS_TABLE}table-row":
+                    continue
+                if active:
+                    values = []
+                    for cell in el:
+                        if cell.tag not in (f"{_ODS_TABLE}table-cell", f"{_ODS_TABLE}covered-table-cell"):
+                            continue
+                        value = _ods_cell_value(cell)
+                        repeat = int(cell.get(f"{_ODS_TABLE}number-columns-repeated", "1"))
+                        values.extend([value] * (repeat if value is not None else min(repeat, _ODS_MAX_EMPTY_REPEAT)))
+                    while values and values[-1] is None:
+                        values.pop()
+                    # Повтор пустых строк (хвост листа) не разворачиваем
+                    repeat = int(el.get(f"{_ODS_TABLE}number-rows-repeated", "1")) if values else 1
+                    for _ in range(repeat):
+                        yield values
+                el.clear()
+        except ElementTree.ParseError as e:
+            raise ImportFileError(f"Не удалось разобрать файл: {e}")
+    if sheet is not None:
+        raise ImportFileError(f"В файле нет листа «{sheet}».")
+
+
+def ndjson_records(content: bytes, sheet: str | None = None) -> Iterator[tuple[int, dict[Any, Any]]]:
+    """NDJSON: по объекту {заголовок или имя поля: значение} на строку; пустые строки пропускаются."""
+    for line_number, line in enumerate(io.BytesIO(content), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise ImportFileError(f"Строка {line_number}: некорректный JSON")
+        if not isinstance(record, dict):
+            raise ImportFileError(f"Строка {line_number}: ожидается JSON-объект")
+        yield line_number, record
+
+
+# Расширение файла -> источник записей (content, лист или None — активный/первый)
+ROW_SOURCES: dict[str, Callable[[bytes, str | None], Iterator[tuple[int, dict[Any, Any]]]]] = {
+    ".xlsx": lambda content, sheet: records_from_table(xlsx_rows(content, sheet)),
+    ".ods": lambda content, sheet: records_from_table(ods_rows(content, sheet)),
+    ".csv": lambda content, sheet: records_from_table(csv_rows(content)),
+    ".ndjson": ndjson_records,
+    ".jsonl": ndjson_records,
+}
+IMPORT_EXTENSIONS = tuple(ROW_SOURCES)
+
+# Где у книги список листов: расширение -> (файл в zip, регулярное выражение имени листа)
+_SHEET_LISTS = {
+    ".xlsx": ("xl/workbook.xml", re.compile(rb'<(?:\w+:)?sheet\s[^>]*?\bname="([^"]*)"')),
+    ".ods": ("content.xml", re.compile(rb'<\w+:table\s[^>]*?\w+:name="([^"]*)"')),
+}
+
+
+def import_file_extension(filename: str | None) -> str | None:
+    """Расширение из ROW_SOURCES или None — формат не поддерживается."""
+    name = (filename or "").lower()
+    return next((ext for ext in IMPORT_EXTENSIONS if name.endswith(ext)), None)
+
+
+def sheet_names(filename: str, content: bytes) -> list[str]:
+    """
+    Имена листов книги (.xlsx, .ods) без разбора самих листов: из оглавления внутри zip.
+    Для форматов без листов и нечитаемых файлов — пустой список.
+    """
+    spec = _SHEET_LISTS.get(import_file_extension(filename) or "")
+    if spec is None:
+        return []
+    member, pattern = spec
+    try:
+        with zipfile.ZipFile(io.BytesIO(content)) as zf:
+            data = zf.read(member)
+    except (zipfile.BadZipFile, KeyError):
+        return []
+    return [html.unescape(m.decode("utf-8")) for m in pattern.findall(data)]
+
+
+def parse_import_sheet(filename: str, content: bytes, sheet: str | None = None) -> tuple[list[dict[str, Any]], list[str]]:
+    """
+    Один файл (или один лист книги) -> (строки импорта, ошибки) — см. parse_import_records.
+    Объявлена на уровне модуля: выполняется в пуле процессов.
+    """
+    ext = import_file_extension(filename)
+    if ext is None:
+        return [], [f"Поддерживаются файлы: {', '.join(IMPORT_EXTENSIONS)}"]
+    try:
+        return parse_import_records(ROW_SOURCES[ext](content, sheet))
+    except ImportFileError as e:
+        return [], [str(e)]
+
+
+def parse_import_file(filename: str, content: bytes) -> tuple[list[dict[str, Any]], list[str]]:
+    """Файл любого поддерживаемого формата (у книги — активный лист) -> (строки импорта, ошибки)."""
+    return parse_import_sheet(filename, content)
+
+
+async def parse_import_files(
+    files: list[tuple[str, bytes]],
+    all_sheets: bool = False,
+) -> tuple[list[dict[str, Any]], list[str]]:
+    """
+    Несколько файлов и (all_sheets) все листы книг: каждый файл или лист разбирается отдельной задачей
+    в пуле процессов, результаты склеиваются в один пакет в порядке файлов и листов.
+    При нескольких источниках у строк есть source («файл / лист») — для сообщений и отчёта;
+    повторы серийных номеров между листами и файлами находит import_service на общем пакете.
+    Листы без заголовков (пустые) при all_sheets пропускаются.
+    """
+    units: list[tuple[str, bytes, str | None]] = []
+    for filename, content in files:
+        if import_file_extension(filename) is None:
+            return [], [f"{filename}: поддерживаются файлы {', '.join(IMPORT_EXTENSIONS)}"]
+        sheets = sheet_names(filename, content) if all_sheets else []
+        units.extend((filename, content, sheet) for sheet in sheets or [None])
+    results = await asyncio.gather(*(run_in_process(parse_import_sheet, *unit) for unit in units))
+    if len(units) == 1:
+        return results[0]
+
+    rows: list[dict[str, Any]] = []
+    errors: list[str] = []
+    for (filename, _, sheet), (unit_rows, unit_errors) in zip(units, results):
+        source = f"{filename} / {sheet}" if sheet is not None else filename
+        if sheet is not None and unit_errors == [NO_HEADER_ERROR]:
+            continue
+        errors.extend(f"{source}: {e}" for e in unit_errors)
+        rows.extend({**row, "source": source} for row in unit_rows)
+    return rows, errors
@@ -1,16 +1,18 @@
 """
-Импорт оборудования из Excel. Первая строка — заголовки.
+Импорт оборудования: заголовки и их синонимы, нормализация значений строки, шаблон Excel.
+Чтение файлов разных форматов — import_sources. Первая строка таблицы — заголовки.
 Поддерживаются: название, модель, тип техники, серийный номер, расположение, статус,
 категория, описание, организация, пользователь; плюс технические поля: CPU, ОЗУ, тип/объём диска,
 IP адрес, мат. плата, ОС, блок питания, диагональ экрана/монитора, разрешение, юниты (U), дата выпуска.
 """
 from __future__ import annotations
 
+from collections.abc import Iterable
 from datetime import date, datetime
 from io import BytesIO
 from typing import Any
 
-from openpyxl import Workbook, load_workbook
+from openpyxl import Workbook
 
 from app.models.asset import AssetStatus
 
@@ -142,6 +144,11 @@ def _normalize_header(cell_value: Any) -> str | None:
 def _normalize_cell(cell_value: Any) -> str:
     if cell_value is None:
         return ""
+    if isinstance(cell_value, datetime):
+        # Ячейка с форматом даты: время не нужно
+        return cell_value.date().isoformat()
+    if isinstance(cell_value, date):
+        return cell_value.isoformat()
     return str(cell_value).strip()
 
 
@@ -149,7 +156,8 @@ def _map_header(raw: str) -> str | None:
     if not raw:
         return None
     lower = raw.lower().strip()
-    return HEADER_ALIASES.get(lower) or (raw if raw in IMPORT_HEADERS else None)
+    # Имена полей (serial_number, cpu, ...) — для выгрузок из других систем
+    return HEADER_ALIASES.get(lower) or (raw if raw in IMPORT_HEADERS else None) or FIELD_TO_HEADER.get(lower)
 
 
 def _parse_date(s: str) -> date | None:
@@ -175,6 +183,73 @@ def _parse_int(s: str) -> int | None:
         return None
 
 
+# Заголовок шаблона -> ключ строки импорта (поле Asset; организация — по имени)
+HEADER_TO_FIELD = {
+    "Название": "name",
+    "Модель": "model",
+    "Тип техники": "equipment_kind",
+    "Серийный номер": "serial_number",
+    "Расположение": "location",
+    "Статус": "status",
+    "Категория": "asset_type",
+    "Описание": "description",
+    "Организация": "company_name",
+    "Пользователь (кто использует)": "current_user",
+    "CPU": "cpu",
+    "ОЗУ": "ram",
+    "Тип диска": "disk1_type",
+    "Объём диска": "disk1_capacity",
+    "IP адрес": "network_card",
+    "Мат. плата": "motherboard",
+    "ОС": "os",
+    "Блок питания": "power_supply",
+    "Диагональ экрана": "screen_diagonal",
+    "Разрешение экрана": "screen_resolution",
+    "Диагональ монитора": "monitor_diagonal",
+    "Юниты (U)": "rack_units",
+    "Дата выпуска": "manufacture_date",
+}
+FIELD_TO_HEADER = {field: header for header, field in HEADER_TO_FIELD.items()}
+
+
+def _parse_equipment_kind(s: str) -> str | None:
+    kind_raw = (s or "").strip().lower()
+    for label, value in EQUIPMENT_KIND_LABELS_TO_VALUE.items():
+        if label == kind_raw or kind_raw == value:
+            return value
+    # Неизвестный тип не подставляем — в карточке будет «—», можно поправить вручную
+    return None
+
+
+def normalize_import_row(row_data: dict[str, str]) -> dict[str, Any]:
+    """
+    Строка файла (стандартный заголовок -> текст ячейки) -> поля строки импорта.
+    В результат попадают только столбцы, которые есть в файле: при обновлении по серийному номеру
+    отсутствующий столбец не затирает значение в карточке. Пустая ячейка -> None;
+    пустой статус — «Активно», нераспознанный — None.
+    Нераспознанные значения описываются в issues (строка всё равно импортируется, значение — пустое).
+    """
+    out: dict[str, Any] = {}
+    issues: list[str] = []
+    for header, raw in row_data.items():
+        field = HEADER_TO_FIELD[header]
+        value = (raw or "").strip()
+        if field == "status":
+            out[field] = STATUS_MAP.get(value.lower()) if value else AssetStatus.active
+        elif field == "equipment_kind":
+            out[field] = _parse_equipment_kind(value)
+        elif field == "rack_units":
+            out[field] = _parse_int(value)
+        elif field == "manufacture_date":
+            out[field] = _parse_date(value)
+        else:
+            out[field] = value or None
+        if value and out[field] is None:
+            issues.append(f"{header} «{value}» не распознано")
+    out["issues"] = issues
+    return out
+
+
 def build_import_template_xlsx() -> BytesIO:
     """Генерирует пустой шаблон Excel с одной строкой заголовков для импорта."""
     wb = Workbook()
@@ -188,88 +263,28 @@ def build_import_template_xlsx() -> BytesIO:
     return buf
 
 
-def parse_import_xlsx(content: bytes) -> tuple[list[dict[str, Any]], list[str]]:
+def parse_import_records(records: Iterable[tuple[int, dict[Any, Any]]]) -> tuple[list[dict[str, Any]], list[str]]:
     """
-    Парсит загруженный Excel. Первая строка — заголовки.
-    Возвращает (список строк как dict с ключами полей Asset, список ошибок).
+    Общий этап для всех форматов файла: записи (номер строки, {заголовок как в файле: значение})
+    -> строки импорта. Заголовки распознаются по HEADER_ALIASES, значения — normalize_import_row.
+    Возвращает (список строк как dict с ключами полей Asset, row_number — номером строки в файле
+    и issues — замечаниями к значениям; список ошибок).
     """
-    errors = []
     rows_out = []
-    try:
-        wb = load_workbook(BytesIO(content), read_only=True, data_only=True)
-        ws = wb.active
-        if ws is None:
-            errors.append("В файле нет листа.")
-            return [], errors
-    except Exception as e:
-        errors.append(f"Не удалось открыть файл: {e}")
-        return [], errors
-
-    # Собираем заголовки первой строки и маппим в стандартные имена
-    header_row = []
-    max_col = ws.max_column or 0
-    for c in range(1, max_col + 1):
-        val = ws.cell(row=1, column=c).value
-        raw = _normalize_header(val)
-        mapped = _map_header(raw) if raw else None
-        header_row.append(mapped)
-
-    if not any(header_row):
-        errors.append("Не найдена строка заголовков (первая строка).")
-        return [], errors
-
-    if "Название" not in header_row:
-        errors.append("Обязательный столбец «Название» не найден. Переименуйте столбец с названием оборудования в «Название».")
-
-    # Читаем данные
-    for row_idx in range(2, (ws.max_row or 1) + 1):
+    header_map: dict[Any, str | None] = {}
+    for row_number, record in records:
         row_data = {}
-        for col_idx, std_name in enumerate(header_row):
-            if not std_name:
-                continue
-            cell_val = ws.cell(row=row_idx, column=col_idx + 1).value
-            row_data[std_name] = _normalize_cell(cell_val)
-
-        name = row_data.get("Название", "").strip()
-        if not name:
+        for raw, cell_val in record.items():
+            if raw not in header_map:
+                header_map[raw] = _map_header(_normalize_header(raw) or "")
+            std_name = header_map[raw]
+            if std_name:
+                row_data[std_name] = _normalize_cell(cell_val)
+        if not row_data.get("Название", "").strip():
             continue  # пустая строка — пропускаем
+        rows_out.append({"row_number": row_number, **normalize_import_row(row_data)})
 
-        # Преобразуем в поля модели
-        status_val = row_data.get("Статус", "").strip().lower()
-        status = STATUS_MAP.get(status_val) if status_val else AssetStatus.active
-
-        kind_raw = row_data.get("Тип техники", "").strip().lower()
-        equipment_kind = None
-        for label, value in EQUIPMENT_KIND_LABELS_TO_VALUE.items():
-            if label == kind_raw or kind_raw == value:
-                equipment_kind = value
-                break
-        # Неизвестный тип не подставляем — в карточке будет «—», можно поправить вручную
-
-        rows_out.append({
-            "name": name,
-            "model": row_data.get("Модель", "") or None,
-            "equipment_kind": equipment_kind or None,
-            "serial_number": row_data.get("Серийный номер", "") or None,
-            "location": row_data.get("Расположение", "") or None,
-            "status": status,
-            "asset_type": row_data.get("Категория", "") or None,
-            "description": row_data.get("Описание", "") or None,
-            "company_name": row_data.get("Организация", "").strip() or None,
-            "current_user": row_data.get("Пользователь (кто использует)", "") or None,
-            "cpu": row_data.get("CPU", "") or None,
-            "ram": row_data.get("ОЗУ", "") or None,
-            "disk1_type": row_data.get("Тип диска", "") or None,
-            "disk1_capacity": row_data.get("Объём диска", "") or None,
-            "network_card": row_data.get("IP адрес", "") or None,
-            "motherboard": row_data.get("Мат. плата", "") or None,
-            "os": row_data.get("ОС", "") or None,
-            "power_supply": row_data.get("Блок питания", "") or None,
-            "screen_diagonal": row_data.get("Диагональ экрана", "") or None,
-            "screen_resolution": row_data.get("Разрешение экрана", "") or None,
-            "monitor_diagonal": row_data.get("Диагональ монитора", "") or None,
-            "rack_units": _parse_int(row_data.get("Юниты (U)", "")),
-            "manufacture_date": _parse_date(row_data.get("Дата выпуска", "")),
-        })
-
+    errors = []
+    if header_map and "Название" not in header_map.values():
+        errors.append("Обязательный столбец «Название» не найден. Переименуйте столбец с названием оборудования в «Название».")
     return rows_out, errors
@@ -1,6 +1,7 @@
 """
 Бизнес-логика инвентаризации: кампании, пункты, отметка «найдено», формирование объёма проверки.
 Все записи в БД (add/flush) — в сервисе; роутеры только вызывают эти функции.
+Каждое изменение увеличивает глобальную версию данных (HTTP-кэш страниц).
 """
 import logging
 from datetime import datetime
@@ -9,6 +10,7 @@ from sqlalchemy import select, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import InventoryCampaign, InventoryItem
+from app.services.data_version_service import bump_data_version
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +28,7 @@ async def create_campaign(
         company_id=company_id,
     )
     db.add(campaign)
-    await db.flush()
+    await bump_data_version(db)
     return campaign
 
 
@@ -45,7 +47,7 @@ async def update_campaign(
     campaign.company_id = company_id
     campaign.started_at = started_at
     campaign.finished_at = finished_at
-    await db.flush()
+    await bump_data_version(db)
 
 
 async def finish_campaign(db: AsyncSession, campaign_id: int) -> bool:
@@ -55,7 +57,7 @@ async def finish_campaign(db: AsyncSession, campaign_id: int) -> bool:
     if not campaign:
         return False
     campaign.finished_at = datetime.utcnow()
-    await db.flush()
+    await bump_data_version(db)
     logger.info("inventory_campaign_finished campaign_id=%s", campaign_id)
     return True
 
@@ -75,7 +77,7 @@ async def generate_campaign_scope(db: AsyncSession, campaign_id: int) -> int:
     for aid in asset_ids:
         item = InventoryItem(campaign_id=campaign_id, asset_id=aid)
         db.add(item)
-    await db.flush()
+    await bump_data_version(db)
     logger.info("inventory_scope_generated campaign_id=%s items_count=%s", campaign_id, len(asset_ids))
     return len(asset_ids)
 
@@ -95,7 +97,7 @@ async def add_campaign_item(
         notes=notes or None,
     )
     db.add(item)
-    await db.flush()
+    await bump_data_version(db)
 
 
 async def mark_item_found_by_id(
@@ -110,7 +112,7 @@ async def mark_item_found_by_id(
         return False
     item.found = True
     item.found_at = datetime.utcnow()
-    await db.flush()
+    await bump_data_version(db)
     logger.info("inventory_item_found campaign_id=%s item_id=%s", campaign_id, item_id)
     return True
 
@@ -138,5 +140,5 @@ async def mark_asset_found(
     else:
         item.found = True
         item.found_at = datetime.utcnow()
-    await db.flush()
+    await bump_data_version(db)
     logger.info("inventory_asset_found campaign_id=%s asset_id=%s", campaign_id, asset_id)
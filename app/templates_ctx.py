@@ -1,9 +1,11 @@
 from pathlib import Path
 import contextvars
 from datetime import timezone, timedelta
+from functools import lru_cache
 from fastapi.templating import Jinja2Templates
 
 from app.config import DISPLAY_TIMEZONE, DISPLAY_UTC_OFFSET_HOURS
+from app.utils.static_files import static_url, vendor_url
 from app.constants import (
     equipment_kind_label,
     status_label,
@@ -16,25 +18,22 @@ from app.constants import (
 _request_ctx: contextvars.ContextVar = contextvars.ContextVar("request", default=None)
 
 
+@lru_cache(maxsize=64)
 def _get_display_tz(offset_hours=None):
     """
     Часовой пояс для отображения.
     Если offset_hours задан (из cookie) — timezone(UTC+offset).
-    Иначе — ZoneInfo или конфиг по умолчанию (кэш).
+    Иначе — ZoneInfo или конфиг по умолчанию.
+    Кэш — в памяти процесса: значение зависит только от аргумента и конфига, поэтому
+    у каждого воркера он одинаков и не требует синхронизации.
     """
     if offset_hours is not None:
         return timezone(timedelta(hours=int(offset_hours)))
-    if _get_display_tz._default_tz is not None:
-        return _get_display_tz._default_tz
     try:
         from zoneinfo import ZoneInfo
-        _get_display_tz._default_tz = ZoneInfo(DISPLAY_TIMEZONE)
+        return ZoneInfo(DISPLAY_TIMEZONE)
     except Exception:
-        _get_display_tz._default_tz = timezone(timedelta(hours=DISPLAY_UTC_OFFSET_HOURS))
-    return _get_display_tz._default_tz
-
-
-_get_display_tz._default_tz = None
+        return timezone(timedelta(hours=DISPLAY_UTC_OFFSET_HOURS))
 
 
 def get_display_tz_offset():
@@ -74,3 +73,5 @@ templates.env.globals["flash_error_messages"] = FLASH_ERROR_MESSAGES
 templates.env.globals["get_display_tz_offset"] = get_display_tz_offset
 templates.env.globals["timezone_options"] = TIMEZONE_OPTIONS
 templates.env.filters["format_local_time"] = format_local_time
+templates.env.globals["static_url"] = static_url
+templates.env.globals["vendor_url"] = vendor_url
@@ -0,0 +1,86 @@
+"""
+Журнал изменений карточки: значения полей в человекочитаемом виде и список «было → стало»
+(AssetEvent.changes_json). Общий для формы редактирования и пакетных путей (агенты, массовые изменения).
+"""
+import json
+
+from app.constants import ASSET_FIELD_LABELS, EXTRA_COMPONENT_TYPES
+
+
+def format_event_value(val) -> str:
+    if val is None:
+        return "—"
+    if hasattr(val, "value"):
+        return str(val.value)
+    if hasattr(val, "isoformat"):
+        return val.isoformat()[:19].replace("T", " ")
+    return str(val)
+
+
+def format_network_interfaces_for_changes(json_str) -> str:
+    if not json_str:
+        return "—"
+    try:
+        arr = json.loads(json_str)
+        if not isinstance(arr, list) or not arr:
+            return "—"
+        parts = []
+        for x in arr:
+            label = str(x.get("label") or "Интерфейс").strip()
+            ip = str(x.get("ip") or "").strip()
+            kind = str(x.get("type") or "network")
+            if kind == "oob":
+                parts.append(f"OOB: {ip}" if ip else "OOB")
+            else:
+                parts.append(f"{label}: {ip}" if ip else label)
+        return "; ".join(parts)
+    except (TypeError, json.JSONDecodeError):
+        return "—"
+
+
+def format_extra_components_for_changes(json_str) -> str:
+    if not json_str:
+        return "—"
+    try:
+        arr = json.loads(json_str)
+        if not isinstance(arr, list) or not arr:
+            return "—"
+        type_labels = {t["value"]: t["label"] for t in EXTRA_COMPONENT_TYPES}
+        parts = []
+        for x in arr:
+            t = x.get("type") or "other"
+            name = (x.get("name") or "").strip()
+            lbl = type_labels.get(t, t)
+            parts.append(f"{lbl}: {name}" if name else lbl)
+        return "; ".join(parts)
+    except (TypeError, json.JSONDecodeError):
+        return "—"
+
+
+def build_asset_changes(asset, data: dict) -> list[dict]:
+    """Список {field_label, old, new} для журнала «было → стало»: поля data, отличающиеся от asset."""
+    changes = []
+    for key, new_val in data.items():
+        if key == "extra_components":
+            old_raw = getattr(asset, key, None)
+            old_str = format_extra_components_for_changes(old_raw)
+            new_str = format_extra_components_for_changes(new_val)
+            if old_str != new_str:
+                changes.append({"field_label": ASSET_FIELD_LABELS.get(key, key), "old": old_str, "new": new_str})
+            continue
+        if key == "network_interfaces":
+            old_raw = getattr(asset, key, None)
+            old_str = format_network_interfaces_for_changes(old_raw)
+            new_str = format_network_interfaces_for_changes(new_val)
+            if old_str != new_str:
+                changes.append({"field_label": ASSET_FIELD_LABELS.get(key, key), "old": old_str, "new": new_str})
+            continue
+        old_val = getattr(asset, key, None)
+        if old_val == new_val:
+            continue
+        old_str = format_event_value(old_val)
+        new_str = format_event_value(new_val)
+        if old_str == new_str:
+            continue
+        changes.append({"field_label": ASSET_FIELD_LABELS.get(key, key), "old": old_str, "new": new_str})
+    return changes
@@ -0,0 +1,37 @@
+"""
+Доп. устройства техники для таблицы asset_components: строки из JSON Asset.extra_components
+([{"type": "ram", "name": "8 ГБ DDR4"}, ...]). По таблице карточка показывает устройства без разбора JSON,
+а поиск отбирает технику по типу устройства по индексу.
+"""
+import json
+
+# Поле Asset, из которого строится таблица
+COMPONENT_SOURCE_FIELD = "extra_components"
+
+
+def component_rows(extra_components: str | None) -> list[dict]:
+    """
+    Строки asset_components (без asset_id): position, type, name — в порядке списка.
+    Битый JSON и элементы-не-объекты пропускаются; тип по умолчанию — «other».
+    """
+    try:
+        items = json.loads(extra_components) if extra_components else []
+    except (TypeError, ValueError):
+        return []
+    rows = []
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        rows.append({
+            "position": len(rows),
+            "type": str(item.get("type") or "other").strip()[:32] or "other",
+            "name": str(item.get("name") or "").strip()[:256] or None,
+        })
+    return rows
+
+
+def component_rows_for(data: dict, current=None) -> list[dict] | None:
+    """Новые строки устройств, если data меняет extra_components относительно current; иначе None."""
+    if COMPONENT_SOURCE_FIELD not in data or data[COMPONENT_SOURCE_FIELD] == getattr(current, COMPONENT_SOURCE_FIELD, None):
+        return None
+    return component_rows(data[COMPONENT_SOURCE_FIELD])
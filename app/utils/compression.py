@@ -0,0 +1,107 @@
+"""
+Сжатие ответов gzip (ASGI-middleware): HTML-таблицы, JSON, CSV и т.п.
+Не сжимаются: маленькие тела (< COMPRESS_MIN_SIZE), уже сжатые форматы (xlsx, zip, pdf, png, jpeg),
+ответы с Content-Encoding (предсжатая статика) и 204/304. Потоковые ответы сжимаются на лету.
+"""
+from __future__ import annotations
+
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import COMPRESS_LEVEL, COMPRESS_MIN_SIZE
+
+# Форматы, которые уже сжаты: повторное сжатие только тратит CPU
+SKIP_CONTENT_TYPES = {
+    "application/zip",
+    "application/gzip",
+    "application/pdf",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "application/vnd.oasis.opendocument.spreadsheet",
+    "application/octet-stream",
+    "text/event-stream",
+}
+
+
+def accepts_gzip(scope: Scope) -> bool:
+    """Клиент принимает gzip: кодировка gzip или * в Accept-Encoding и не с q=0."""
+    for part in Headers(scope=scope).get("accept-encoding", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def _compressible(status: int, headers: MutableHeaders, minimum_size: int) -> bool:
+    if status < 200 or status in (204, 304) or "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in SKIP_CONTENT_TYPES or content_type.startswith(("video/", "audio/")):
+        return False
+    if content_type.startswith("image/") and content_type != "image/svg+xml":
+        return False
+    length = headers.get("content-length")
+    return length is None or int(length) >= minimum_size
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESS_MIN_SIZE, level: int = COMPRESS_LEVEL) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not accepts_gzip(scope):
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _GzipResponder(send, self.minimum_size, self.level).send)
+
+
+class _GzipResponder:
+    """Откладывает http.response.start до первого куска тела, чтобы решить, сжимать ли ответ."""
+
+    def __init__(self, send: Send, minimum_size: int, level: int) -> None:
+        self._send = send
+        self.minimum_size = minimum_size
+        self.level = level
+        self._start: Message | None = None
+        self._compressor = None
+        self._passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self._start = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self._start is not None:
+            start, self._start = self._start, None
+            headers = MutableHeaders(raw=list(start["headers"]))
+            if not _compressible(start["status"], headers, self.minimum_size) or (
+                not more_body and len(body) < self.minimum_size
+            ):
+                self._passthrough = True
+                await self._send(start)
+                await self._send(message)
+                return
+            self._compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+            del headers["content-length"]
+            headers["content-encoding"] = "gzip"
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                # Сжатое представление побайтно отличается: сильный ETag становится слабым
+                headers["etag"] = f"W/{etag}"
+            await self._send({**start, "headers": headers.raw})
+        if self._passthrough:
+            await self._send(message)
+            return
+        data = self._compressor.compress(body)
+        if not more_body:
+            data += self._compressor.flush()
+        if data or not more_body:
+            await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
@@ -0,0 +1,70 @@
+"""
+Межпроцессные блокировки на файлах (flock) для режима с несколькими воркерами:
+выбор одного воркера для планировщика, запрет параллельных бекапов из разных воркеров.
+Файлы лежат во временной папке и привязаны к БД (хеш DATABASE_URL).
+На платформах без fcntl (Windows) межпроцессной блокировки нет (там поддерживается только один воркер),
+остаётся защита внутри процесса: занятый объект FileLock повторно не берётся.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+from app.config import DATABASE_URL
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+def shared_path(name: str) -> Path:
+    """Путь к служебному файлу name, общему для всех воркеров с этой БД (блокировки, маркеры, метрики)."""
+    key = hashlib.sha1(DATABASE_URL.encode()).hexdigest()[:12]
+    return Path(tempfile.gettempdir()) / f"vkr-{key}-{name}"
+
+
+class FileLock:
+    """
+    Неблокирующая эксклюзивная блокировка: acquire() -> True, если захвачена этим вызовом.
+    Не реентерабельна: пока блокировка держится, повторный acquire() того же объекта возвращает False —
+    так один объект защищает и от других воркеров, и от параллельных задач своего процесса
+    (в том числе без fcntl).
+    """
+
+    def __init__(self, name: str) -> None:
+        self.path = shared_path(f"{name}.lock")
+        self._fd: int | None = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self) -> bool:
+        if self._fd is not None:
+            return False
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                return False
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+
+    def __enter__(self) -> bool:
+        return self.acquire()
+
+    def __exit__(self, *exc) -> None:
+        self.release()
@@ -0,0 +1,90 @@
+"""
+Кэш отрендеренных фрагментов страниц (таблицы списка техники и отчётов) в памяти процесса.
+Ключ — имя фрагмента, версия данных (PageValidators.data_key), параметры фильтра, base URL и
+часовой пояс из cookie; фрагменты не содержат данных пользователя и переиспользуются между
+пользователями. Объём ограничен FRAGMENT_CACHE_MB, вытеснение — LRU.
+У каждого воркера свой кэш: ключ зависит от версии в БД, поэтому устаревшие записи не выдаются.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import Request
+from markupsafe import Markup
+
+from app import metrics
+from app.config import FRAGMENT_CACHE_MB
+from app.templates_ctx import templates
+
+
+class FragmentCache:
+    """LRU по суммарному размеру HTML (в символах UTF-8 ≈ байтах для оценки)."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._items: OrderedDict[str, Markup] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Markup | None:
+        with self._lock:
+            html = self._items.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def put(self, key: str, html: str) -> Markup:
+        html = Markup(html)
+        size = len(html)
+        if size > self.max_bytes:
+            return html
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._items[key] = html
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+        return html
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+            self.hits = self.misses = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+fragment_cache = FragmentCache(FRAGMENT_CACHE_MB * 1024 * 1024)
+
+
+def fragment_key(fragment: str, request: Request, data_key: str, /, **params) -> str:
+    """Ключ фрагмента: параметры фильтра в любом порядке дают один ключ."""
+    parts = [fragment, data_key, str(request.base_url), request.cookies.get("display_tz_offset", "")]
+    parts += [f"{k}={params[k]}" for k in sorted(params)]
+    return hashlib.sha1("\x1f".join(parts).encode()).hexdigest()
+
+
+def render_fragment(template_name: str, context: dict) -> str:
+    """Рендер шаблона-фрагмента (без base.html) в строку; время учитывается в метриках запроса."""
+    started = time.perf_counter()
+    try:
+        return templates.get_template(template_name).render(context)
+    finally:
+        metrics.add_template_time(time.perf_counter() - started)
@@ -0,0 +1,103 @@
+"""
+Условные GET для HTML-страниц: ETag и Last-Modified из версии данных (DataVersion),
+304 Not Modified по If-None-Match / If-Modified-Since.
+ETag учитывает адрес с параметрами, пользователя (шапка страницы), часовой пояс из cookie,
+поколение файла БД (восстановление из бекапа) и — для страниц с расчётом «сколько дней назад» —
+интервал времени PAGE_CACHE_TIME_BUCKET.
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.config import PAGE_CACHE_TIME_BUCKET
+from app.database import read_db_generation
+
+# Браузер хранит страницу, но перед показом всегда переспрашивает сервер (дешёвый 304)
+PAGE_CACHE_CONTROL = "private, no-cache"
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Слабое сравнение If-None-Match с ETag (RFC 9110): префикс W/ не учитывается — gzip-middleware
+    ослабляет ETag сжатых ответов, и браузер присылает его обратно в виде W/"...".
+    """
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+@dataclass
+class PageValidators:
+    etag: str
+    last_modified: datetime
+    # Ключ состояния данных без привязки к пользователю и адресу (для кэша фрагментов)
+    data_key: str
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(self.last_modified, usegmt=True),
+            "Cache-Control": PAGE_CACHE_CONTROL,
+            "Vary": "Cookie",
+        }
+
+    def is_fresh(self, request: Request) -> bool:
+        """True, если у клиента актуальная копия (If-None-Match приоритетнее If-Modified-Since)."""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            return etag_matches(if_none_match, self.etag)
+        if_modified_since = request.headers.get("if-modified-since")
+        if not if_modified_since:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return self.last_modified <= since
+
+    def not_modified(self) -> Response:
+        return Response(status_code=304, headers=self.headers)
+
+    def apply(self, response: Response) -> Response:
+        response.headers.update(self.headers)
+        return response
+
+
+def make_page_validators(request: Request, user, version, time_dependent: bool = True) -> PageValidators:
+    """
+    version — DataVersion или None (данные ещё не менялись).
+    time_dependent — страница зависит от текущего времени (неактивность, возраст), ETag меняется по интервалам.
+    """
+    stamps = [datetime.fromtimestamp(0, timezone.utc)]
+    data_parts = []
+    if version is not None:
+        updated_at = version.updated_at
+        if updated_at.tzinfo is None:
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+        stamps.append(updated_at)
+        data_parts += [version.scope, str(version.version), updated_at.isoformat()]
+    generation = read_db_generation()
+    if generation:
+        stamps.append(datetime.fromtimestamp(generation / 1e9, timezone.utc))
+        data_parts.append(str(generation))
+    if time_dependent:
+        bucket = int(time.time()) // PAGE_CACHE_TIME_BUCKET
+        stamps.append(datetime.fromtimestamp(bucket * PAGE_CACHE_TIME_BUCKET, timezone.utc))
+        data_parts.append(str(bucket))
+    data_key = hashlib.sha1("\x1f".join(data_parts).encode()).hexdigest()
+    page_parts = [data_key, str(request.url), str(user.id), user.role.value, user.username, user.avatar or "",
+                  request.cookies.get("display_tz_offset", "")]
+    digest = hashlib.sha1("\x1f".join(page_parts).encode()).hexdigest()
+    # Last-Modified в HTTP — с точностью до секунды
+    return PageValidators(
+        etag=f'W/"{digest}"', last_modified=max(stamps).replace(microsecond=0), data_key=data_key,
+    )
@@ -0,0 +1,88 @@
+"""
+IP-адреса техники для таблицы asset_ip_addresses: из JSON network_interfaces и старого поля network_card.
+Адрес хранится 128-битным числом (16 байт big-endian, IPv4 — в виде ::ffff:a.b.c.d): одно упорядоченное
+пространство для IPv4 и IPv6, точный поиск и подсеть CIDR — равенство и BETWEEN по индексу.
+"""
+import ipaddress
+import json
+import re
+
+from app.constants import ASSET_FIELD_LABELS
+
+# Поля Asset, из которых берутся адреса
+IP_SOURCE_FIELDS = ("network_interfaces", "network_card")
+
+# Разделители адресов в свободном тексте network_card («10.0.0.5, 10.0.0.6», «Realtek 10.0.0.5»)
+_TOKEN_SPLIT_RE = re.compile(r"[\s,;]+")
+
+
+def ip_key(address: ipaddress.IPv4Address | ipaddress.IPv6Address) -> bytes:
+    """Ключ адреса: 16 байт; IPv4 отображается в ::ffff:0:0/96."""
+    if address.version == 4:
+        address = ipaddress.IPv6Address(b"\x00" * 10 + b"\xff\xff" + address.packed)
+    return address.packed
+
+
+def parse_ip(value: str | None) -> ipaddress.IPv4Address | ipaddress.IPv6Address | None:
+    """Адрес из строки или None."""
+    try:
+        return ipaddress.ip_address(str(value or "").strip())
+    except ValueError:
+        return None
+
+
+def ip_range(value: str | None) -> tuple[bytes, bytes] | None:
+    """
+    Диапазон ключей для поиска: адрес («10.2.3.4») — сам адрес, подсеть («10.2.0.0/16») — от первого
+    до последнего адреса. Не адрес и не подсеть — None.
+    """
+    text = str(value or "").strip()
+    if not text:
+        return None
+    try:
+        network = ipaddress.ip_network(text, strict=False)
+    except ValueError:
+        return None
+    return ip_key(network.network_address), ip_key(network.broadcast_address)
+
+
+def asset_ip_rows(network_interfaces: str | None, network_card: str | None) -> list[dict]:
+    """
+    Строки asset_ip_addresses (без asset_id): ip, ip_bin, label, type. Повтор адреса на карточке —
+    одна строка (первый интерфейс); битый JSON и не-адреса пропускаются.
+    """
+    rows: dict[bytes, dict] = {}
+
+    def add(address, label, iface_type):
+        key = ip_key(address)
+        rows.setdefault(key, {"ip": str(address), "ip_bin": key, "label": label or None, "type": iface_type})
+
+    try:
+        interfaces = json.loads(network_interfaces) if network_interfaces else []
+    except ValueError:
+        interfaces = []
+    for iface in interfaces if isinstance(interfaces, list) else []:
+        if not isinstance(iface, dict):
+            continue
+        address = parse_ip(iface.get("ip"))
+        if address is not None:
+            iface_type = "oob" if iface.get("type") == "oob" else "network"
+            add(address, str(iface.get("label") or "").strip(), iface_type)
+    for token in _TOKEN_SPLIT_RE.split(network_card or ""):
+        address = parse_ip(token)
+        if address is not None:
+            add(address, ASSET_FIELD_LABELS["network_card"], "network")
+    return list(rows.values())
+
+
+def ip_rows_for(data: dict, current=None) -> list[dict] | None:
+    """
+    Новые строки адресов, если data меняет network_interfaces или network_card относительно current
+    (карточки или строки БД; недостающее в data поле берётся из неё); None — адреса не изменились.
+    """
+    if not any(key in data and data[key] != getattr(current, key, None) for key in IP_SOURCE_FIELDS):
+        return None
+    network_interfaces, network_card = (
+        data[key] if key in data else getattr(current, key, None) for key in IP_SOURCE_FIELDS
+    )
+    return asset_ip_rows(network_interfaces, network_card)
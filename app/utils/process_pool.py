@@ -0,0 +1,35 @@
+"""
+Общий пул процессов для CPU-тяжёлых задач (рендер QR-кодов и листов этикеток, разбор файлов импорта).
+Создаётся лениво при первом обращении, закрывается при остановке приложения (main.lifespan).
+Функции, отправляемые в пул, должны быть объявлены на уровне модуля (pickle).
+"""
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+from app.config import PROCESS_POOL_WORKERS
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Возвращает общий ProcessPoolExecutor (создаёт при первом вызове)."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=PROCESS_POOL_WORKERS or None)
+    return _pool
+
+
+async def run_in_process(fn, *args):
+    """Выполняет fn(*args) в пуле процессов, не блокируя event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), fn, *args)
+
+
+def shutdown_process_pool() -> None:
+    """Останавливает пул (вызывается при завершении приложения)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
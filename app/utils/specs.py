@@ -0,0 +1,87 @@
+"""
+Числовые значения технических характеристик из свободного текста: «8 ГБ» -> ram_mb=8192,
+«512GB SSD» -> disk_gb=512, «23,8"» -> diagonal_in=23.8. Общий разбор для форм, импорта,
+отчётов агентов и миграции заполнения; по числовым колонкам работают фильтры-диапазоны поиска.
+"""
+import re
+
+# Число с необязательным множителем «2x8» и единицей; цифры внутри слов («DDR4») не считаются
+_AMOUNT_RE = re.compile(
+    r"(?<![a-zа-я\d.,])(?:(\d+)\s*[xх×*]\s*)?(\d+(?:[.,]\d+)?)\s*(тб|tb|т|t|гб|gb|г|g|мб|mb|м|m)?(?![a-zа-я])",
+    re.IGNORECASE,
+)
+_DIAGONAL_RE = re.compile(r"(\d+(?:[.,]\d+)?)")
+
+# Числовые колонки Asset, которые заполняет spec_numbers
+SPEC_NUMBER_FIELDS = ("ram_mb", "disk_gb", "diagonal_in")
+
+
+def _amount(text: str | None) -> tuple[float, str] | None:
+    """
+    (количество с учётом множителя, единица в нижнем регистре или "").
+    Предпочитается первое число с единицей, иначе — первое число.
+    """
+    if not text:
+        return None
+    matches = list(_AMOUNT_RE.finditer(str(text)))
+    if not matches:
+        return None
+    m = next((x for x in matches if x.group(3)), matches[0])
+    value = float(m.group(2).replace(",", ".")) * int(m.group(1) or 1)
+    return value, (m.group(3) or "").lower()
+
+
+def parse_ram_mb(text: str | None) -> int | None:
+    """ОЗУ в МБ. Без единицы: до 256 — гигабайты, больше — мегабайты."""
+    amount = _amount(text)
+    if amount is None:
+        return None
+    value, unit = amount
+    if unit in ("тб", "tb", "т", "t"):
+        value *= 1024 * 1024
+    elif unit in ("гб", "gb", "г", "g") or (not unit and value <= 256):
+        value *= 1024
+    return round(value) or None
+
+
+def parse_disk_gb(text: str | None) -> int | None:
+    """Объём диска в ГБ (ТБ — 1000 ГБ, как у производителей дисков). Без единицы — гигабайты."""
+    amount = _amount(text)
+    if amount is None:
+        return None
+    value, unit = amount
+    if unit in ("тб", "tb", "т", "t"):
+        value *= 1000
+    elif unit in ("мб", "mb", "м", "m"):
+        value /= 1000
+    return round(value) or None
+
+
+def parse_diagonal_in(text: str | None) -> float | None:
+    """Диагональ в дюймах: первое число в строке («23.8"», «15,6 дюйма»), от 1 до 200."""
+    if not text:
+        return None
+    m = _DIAGONAL_RE.search(str(text))
+    if not m:
+        return None
+    value = float(m.group(1).replace(",", "."))
+    return round(value, 1) if 1 <= value <= 200 else None
+
+
+def spec_numbers(data: dict, current=None) -> dict:
+    """
+    Значения числовых колонок для изменяемых полей data. Недостающий источник берётся из current
+    (карточка или строка БД): диагональ — экрана, а если её нет — монитора.
+    """
+    out = {}
+    if "ram" in data:
+        out["ram_mb"] = parse_ram_mb(data["ram"])
+    if "disk1_capacity" in data:
+        out["disk_gb"] = parse_disk_gb(data["disk1_capacity"])
+    if "screen_diagonal" in data or "monitor_diagonal" in data:
+        screen, monitor = (
+            data[key] if key in data else getattr(current, key, None)
+            for key in ("screen_diagonal", "monitor_diagonal")
+        )
+        out["diagonal_in"] = parse_diagonal_in(screen) or parse_diagonal_in(monitor)
+    return out
@@ -0,0 +1,74 @@
+"""
+Статика с отпечатками: static_url("style.css") -> /static/style.css?v=<sha256[:12]>.
+Файлы с отпечатком кэшируются браузером на год (immutable), без отпечатка — с перепроверкой.
+Если рядом лежит предсжатый файл (*.gz, scripts.build_static), он отдаётся клиентам с gzip.
+"""
+from __future__ import annotations
+
+import hashlib
+import mimetypes
+import os
+from functools import lru_cache
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app.config import STATIC_DIR
+from app.utils.compression import accepts_gzip
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Сторонние библиотеки: имя в static/vendor/ -> CDN (запасной вариант, пока локальная копия не собрана)
+VENDOR_ASSETS = {
+    "bootstrap.min.css": "https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css",
+    "bootstrap.bundle.min.js": "https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/js/bootstrap.bundle.min.js",
+    "chart.umd.min.js": "https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.min.js",
+    "jsQR.min.js": "https://cdn.jsdelivr.net/npm/jsqr@1.4.0/dist/jsQR.min.js",
+}
+
+
+@lru_cache(maxsize=256)
+def _fingerprint(path: str, mtime_ns: int) -> str:
+    return hashlib.sha256((STATIC_DIR / path).read_bytes()).hexdigest()[:12]
+
+
+def static_url(path: str) -> str:
+    """URL статического файла с отпечатком содержимого (пересчитывается при изменении файла)."""
+    try:
+        mtime_ns = (STATIC_DIR / path).stat().st_mtime_ns
+    except FileNotFoundError:
+        return f"/static/{path}"
+    return f"/static/{path}?v={_fingerprint(path, mtime_ns)}"
+
+
+def vendor_url(name: str) -> str:
+    """Локальная копия библиотеки из static/vendor/, если собрана; иначе CDN."""
+    if (STATIC_DIR / "vendor" / name).is_file():
+        return static_url(f"vendor/{name}")
+    return VENDOR_ASSETS[name]
+
+
+class FingerprintedStaticFiles(StaticFiles):
+    """StaticFiles с Cache-Control по отпечатку и отдачей предсжатых *.gz."""
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        gz_path = f"{full_path}.gz"
+        response = None
+        if accepts_gzip(scope) and os.path.isfile(gz_path):
+            gz_stat = os.stat(gz_path)
+            if gz_stat.st_mtime >= stat_result.st_mtime:
+                media_type = mimetypes.guess_type(str(full_path))[0] or "application/octet-stream"
+                response = FileResponse(gz_path, status_code=status_code, stat_result=gz_stat, media_type=media_type)
+                response.headers["content-encoding"] = "gzip"
+                if self.is_not_modified(response.headers, request_headers):
+                    response = NotModifiedResponse(response.headers)
+        if response is None:
+            response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers.add_vary_header("Accept-Encoding")
+        fingerprinted = b"v=" in scope.get("query_string", b"")
+        response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL if fingerprinted else REVALIDATE_CACHE_CONTROL
+        return response
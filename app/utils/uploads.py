@@ -0,0 +1,102 @@
+"""
+Потоковый приём файла из multipart/form-data сразу в файл на диске.
+UploadFile сначала буферизует загрузку во временный файл, и её приходится копировать ещё раз;
+здесь тело запроса порциями пишется в назначенный файл, а размер проверяется по ходу приёма.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import BinaryIO
+
+from fastapi import Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+# Запас на границы частей и текстовые поля формы при проверке Content-Length
+FORM_OVERHEAD = 64 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """Файл в запросе больше допустимого размера."""
+
+
+async def receive_file(request: Request, field: str, dest: BinaryIO, max_size: int) -> dict[str, str]:
+    """
+    Пишет содержимое файлового поля field формы в dest; возвращает остальные поля формы строками.
+    UploadTooLargeError — файл больше max_size байт (приём прерывается сразу, без дочитывания тела);
+    ValueError — не multipart/form-data, битая форма или нет поля field.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or not params.get(b"boundary"):
+        raise ValueError("Ожидается multipart/form-data")
+    too_large = UploadTooLargeError(f"Файл больше {max_size // (1024 * 1024)} МБ")
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > max_size + FORM_OVERHEAD:
+        raise too_large
+
+    fields: dict[str, str] = {}
+    pending: list[bytes] = []
+    headers: dict[bytes, bytes] = {}
+    header_field = header_value = b""
+    name, value, is_file = "", bytearray(), False
+    size, found = 0, False
+
+    def on_part_begin() -> None:
+        nonlocal name, value, is_file
+        headers.clear()
+        name, value, is_file = "", bytearray(), False
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        nonlocal header_field
+        header_field += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        nonlocal header_value
+        header_value += data[start:end]
+
+    def on_header_end() -> None:
+        nonlocal header_field, header_value
+        headers[header_field.lower()] = header_value
+        header_field = header_value = b""
+
+    def on_headers_finished() -> None:
+        nonlocal name, is_file, found
+        _, options = parse_options_header(headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        is_file = name == field and not found
+        found = found or is_file
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        nonlocal size
+        if is_file:
+            size += end - start
+            if size > max_size:
+                raise too_large
+            pending.append(data[start:end])
+        else:
+            value.extend(data[start:end])
+            if len(value) > FORM_OVERHEAD:
+                raise ValueError(f"Поле формы {name} слишком длинное")
+
+    def on_part_end() -> None:
+        if not is_file:
+            fields[name] = value.decode("utf-8", "replace")
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+    async for chunk in request.stream():
+        parser.write(chunk)
+        if pending:
+            data = b"".join(pending)
+            pending.clear()
+            await asyncio.to_thread(dest.write, data)
+    parser.finalize()
+    if not found:
+        raise ValueError(f"В форме нет файла {field}")
+    return fields
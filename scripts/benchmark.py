@@ -0,0 +1,247 @@
+"""
+Бенчмарк основных сценариев на ASGI-приложении (httpx.AsyncClient + ASGITransport, без сети):
+список, дашборд, расширенный поиск, карточка, экспорт, импорт, отметка при инвентаризации.
+Для каждого сценария — перцентили латентности и пик памяти Python (tracemalloc, отдельный прогон),
+сравнение с сохранённым базовым результатом.
+Страницы чтения (CACHEABLE) меряются дважды: без кэша (кэш фрагментов очищается перед каждым запросом,
+If-None-Match не отправляется) и с кэшем, как у браузера (If-None-Match из прошлого ответа, тёплый
+кэш фрагментов) — результат второго прогона в отчёте под именем «сценарий:cached».
+Запуск из корня проекта (данные — scripts.generate_fleet):
+    python -m scripts.benchmark --database-url sqlite+aiosqlite:///./bench.db --save-baseline bench_baseline.json
+    python -m scripts.benchmark --database-url sqlite+aiosqlite:///./bench.db --baseline bench_baseline.json
+Сценарий import добавляет технику в БД — запускайте бенчмарк на отдельной копии данных.
+Код выхода 1 — если какой-либо сценарий медленнее базового более чем на --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+from io import BytesIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+# Сценарии чтения, у которых есть ETag и/или кэш фрагментов: меряются без кэша и с кэшем
+CACHEABLE = ("list", "list_filtered", "dashboard", "search", "detail")
+CACHED_SUFFIX = ":cached"
+
+
+class RevalidatingClient:
+    """Клиент как у браузера: повторный GET того же адреса уходит с If-None-Match из прошлого ответа."""
+
+    def __init__(self, client) -> None:
+        self._client = client
+        self._etags: dict[str, str] = {}
+
+    async def get(self, url: str, params=None):
+        request = self._client.build_request("GET", url, params=params)
+        etag = self._etags.get(str(request.url))
+        if etag:
+            request.headers["If-None-Match"] = etag
+        response = await self._client.send(request)
+        if response.status_code == 200 and "etag" in response.headers:
+            self._etags[str(request.url)] = response.headers["etag"]
+        return response
+
+
+def uncached(fn):
+    """Сценарий без кэша фрагментов: кэш очищается перед каждым запросом."""
+    from app.utils.fragment_cache import fragment_cache
+
+    async def run(client, rng):
+        fragment_cache.clear()
+        return await fn(client, rng)
+
+    return run
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def _import_xlsx(rows: int) -> bytes:
+    """Excel для сценария импорта: rows строк с уникальными серийными номерами."""
+    from openpyxl import Workbook
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Название", "Серийный номер", "Расположение", "Тип техники", "Статус"])
+    tag = uuid.uuid4().hex[:8]
+    for i in range(rows):
+        ws.append([f"Бенчмарк {i}", f"BENCH-{tag}-{i}", "Бенчмарк", "desktop", "active"])
+    buf = BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def build_scenarios(ids: dict, import_rows: int) -> dict:
+    """Сценарии: имя -> функция (client, rng) -> awaitable Response."""
+    asset_ids, campaign_ids, company_ids = ids["assets"], ids["campaigns"], ids["companies"]
+
+    async def import_assets(client, rng):
+        content = _import_xlsx(import_rows)
+        return await client.post(
+            "/assets/import",
+            files={"file": ("bench.xlsx", content, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")},
+        )
+
+    async def inventory_scan(client, rng):
+        return await client.post(
+            f"/assets/{rng.choice(asset_ids)}/mark-inventory-found",
+            data={"campaign_id": str(rng.choice(campaign_ids))},
+        )
+
+    return {
+        "list": lambda client, rng: client.get("/assets"),
+        "list_filtered": lambda client, rng: client.get("/assets", params={"company_id": rng.choice(company_ids), "status": "active"}),
+        "dashboard": lambda client, rng: client.get("/dashboard"),
+        "search": lambda client, rng: client.get("/assets/advanced-search", params={"cpu": "i5", "ram": "16"}),
+        "detail": lambda client, rng: client.get(f"/assets/{rng.choice(asset_ids)}"),
+        "export": lambda client, rng: client.get("/assets/export", params={"company_id": rng.choice(company_ids)}),
+        "import": import_assets,
+        "inventory_scan": inventory_scan,
+    }
+
+
+async def run_scenario(client, fn, iterations: int, warmup: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    for _ in range(warmup):
+        await fn(client, rng)
+    latencies = []
+    statuses = set()
+    for _ in range(iterations):
+        started = time.perf_counter()
+        r = await fn(client, rng)
+        latencies.append((time.perf_counter() - started) * 1000)
+        statuses.add(r.status_code)
+    # Пик памяти — в отдельном прогоне: tracemalloc заметно замедляет выполнение
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    await fn(client, rng)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "iterations": iterations,
+        "p50_ms": round(_percentile(latencies, 0.50), 2),
+        "p95_ms": round(_percentile(latencies, 0.95), 2),
+        "p99_ms": round(_percentile(latencies, 0.99), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "peak_mem_mb": round(peak / 1024 / 1024, 2),
+        "statuses": sorted(statuses),
+    }
+
+
+def _load_ids(sync_url: str) -> dict:
+    from sqlalchemy import create_engine, select
+    from app.models import User, Asset, Company, InventoryCampaign
+    from app.models.user import UserRole
+    engine = create_engine(sync_url)
+    with engine.connect() as conn:
+        ids = {
+            "admin": conn.execute(select(User.id).where(User.role == UserRole.admin).limit(1)).scalar(),
+            "assets": list(conn.execute(select(Asset.id).where(Asset.deleted_at.is_(None)).limit(200_000)).scalars()),
+            "companies": list(conn.execute(select(Company.id)).scalars()),
+            "campaigns": list(conn.execute(select(InventoryCampaign.id)).scalars()),
+        }
+    engine.dispose()
+    if not ids["admin"] or not ids["assets"] or not ids["companies"] or not ids["campaigns"]:
+        raise SystemExit("В БД нет данных: сначала запустите python -m scripts.generate_fleet")
+    return ids
+
+
+def _compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    """Печатает изменения относительно базового результата; True — регрессий нет."""
+    ok = True
+    print("\nСравнение с базовым результатом:")
+    for name, res in results.items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            print(f"  {name:22s} нет в базовом результате")
+            continue
+        deltas = []
+        for key in ("p50_ms", "p95_ms", "peak_mem_mb"):
+            if base[key]:
+                change = (res[key] - base[key]) / base[key]
+                deltas.append(f"{key} {change:+.0%}")
+                if key != "peak_mem_mb" and change > tolerance:
+                    ok = False
+        print(f"  {name:22s} " + ", ".join(deltas))
+    return ok
+
+
+async def main_async(args) -> int:
+    from httpx import ASGITransport, AsyncClient
+    from app.main import app
+    from app.auth import create_session_token
+    from app.config import SESSION_COOKIE_NAME, SYNC_DATABASE_URL
+
+    ids = _load_ids(SYNC_DATABASE_URL)
+    scenarios = build_scenarios(ids, args.import_rows)
+    selected = args.scenarios.split(",") if args.scenarios else list(scenarios)
+    results = {}
+    transport = ASGITransport(app=app)
+    cookies = {SESSION_COOKIE_NAME: create_session_token(ids["admin"])}
+    async with AsyncClient(transport=transport, base_url="http://bench", cookies=cookies) as client:
+        # Прогоны: (имя в отчёте, клиент, сценарий); сценарии чтения — без кэша и с кэшем (--cache)
+        runs = []
+        for name in selected:
+            if name not in CACHEABLE:
+                runs.append((name, client, scenarios[name]))
+                continue
+            if args.cache in ("both", "off"):
+                runs.append((name, client, uncached(scenarios[name])))
+            if args.cache in ("both", "on"):
+                runs.append((name + CACHED_SUFFIX, RevalidatingClient(client), scenarios[name]))
+        print(f"{'сценарий':22s} {'p50':>9s} {'p95':>9s} {'p99':>9s} {'среднее':>9s} {'память':>9s}  коды")
+        for name, run_client, fn in runs:
+            iterations = max(1, args.iterations // 10) if name in ("import", "export") else args.iterations
+            res = await run_scenario(run_client, fn, iterations, args.warmup, args.seed)
+            results[name] = res
+            print(f"{name:22s} {res['p50_ms']:8.1f}м {res['p95_ms']:8.1f}м {res['p99_ms']:8.1f}м "
+                  f"{res['mean_ms']:8.1f}м {res['peak_mem_mb']:7.1f}МБ  {res['statuses']}")
+    report = {"created_at": time.strftime("%Y-%m-%d %H:%M:%S"), "assets": len(ids["assets"]), "scenarios": results}
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\nБазовый результат сохранён: {args.save_baseline}")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        if not _compare(results, baseline, args.tolerance):
+            print(f"\nРегрессия: латентность выросла более чем на {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк сценариев приложения")
+    parser.add_argument("--database-url", help="URL БД (async, как DATABASE_URL); по умолчанию — из окружения")
+    parser.add_argument("--scenarios", help="Через запятую: list,list_filtered,dashboard,search,detail,export,import,inventory_scan")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--import-rows", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--cache", choices=("both", "off", "on"), default="both",
+        help="Сценарии чтения: без кэша (off), с ETag и кэшем фрагментов (on) или оба прогона (both)",
+    )
+    parser.add_argument("--baseline", help="JSON базового результата для сравнения")
+    parser.add_argument("--save-baseline", help="Сохранить результат как базовый (JSON)")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Допустимый рост p50/p95 (доля)")
+    args = parser.parse_args()
+    if args.database_url:
+        # До импорта app: engine создаётся из DATABASE_URL при импорте app.database
+        os.environ["DATABASE_URL"] = args.database_url
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
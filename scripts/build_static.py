@@ -0,0 +1,80 @@
+"""
+Сборка статики: локальные копии сторонних библиотек (static/vendor/, см. VENDOR_ASSETS)
+и предсжатые *.gz для CSS/JS/SVG — их отдаёт FingerprintedStaticFiles без сжатия на лету.
+Страницы работают без доступа к CDN (изолированные сети). Запускается при сборке Docker-образа:
+если библиотеку скачать не удалось, скрипт завершается с кодом 1 и сборка образа падает.
+Запуск из корня проекта:
+    python -m scripts.build_static
+    python -m scripts.build_static --no-download   # только пересжать уже имеющиеся файлы
+"""
+import argparse
+import gzip
+import sys
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import STATIC_DIR
+from app.utils.static_files import VENDOR_ASSETS
+
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".svg", ".json", ".txt", ".map"}
+
+
+def download_vendor(force: bool) -> list[str]:
+    """Скачивает недостающие библиотеки; возвращает имена тех, что скачать не удалось."""
+    vendor_dir = STATIC_DIR / "vendor"
+    vendor_dir.mkdir(exist_ok=True)
+    failed = []
+    for name, url in VENDOR_ASSETS.items():
+        target = vendor_dir / name
+        if target.exists() and not force:
+            continue
+        try:
+            with urllib.request.urlopen(url, timeout=60) as response:
+                data = response.read()
+        except OSError as e:
+            print(f"  {name}: не удалось скачать ({e})")
+            failed.append(name)
+            continue
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(target)
+        print(f"  {name}: {len(data) // 1024} КБ")
+    return failed
+
+
+def precompress() -> None:
+    """*.gz рядом с файлом; mtime=0 — повторная сборка даёт те же байты."""
+    for path in sorted(STATIC_DIR.rglob("*")):
+        if not path.is_file() or path.suffix not in COMPRESSIBLE_SUFFIXES:
+            continue
+        gz_path = path.with_name(path.name + ".gz")
+        if gz_path.exists() and gz_path.stat().st_mtime >= path.stat().st_mtime:
+            continue
+        data = path.read_bytes()
+        packed = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(packed) >= len(data):
+            continue
+        gz_path.write_bytes(packed)
+        print(f"  {path.relative_to(STATIC_DIR)}: {len(data)} -> {len(packed)} байт")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сборка статики: vendor-библиотеки и предсжатые файлы")
+    parser.add_argument("--no-download", action="store_true", help="Не скачивать библиотеки из CDN")
+    parser.add_argument("--force", action="store_true", help="Скачать библиотеки заново")
+    args = parser.parse_args()
+    failed = []
+    if not args.no_download:
+        print("Библиотеки (static/vendor/):")
+        failed = download_vendor(args.force)
+    print("Предсжатие:")
+    precompress()
+    if failed:
+        # Без локальной копии страницы возьмут библиотеку из CDN — в изолированной сети интерфейс не заработает
+        sys.exit(f"Не скачаны библиотеки: {', '.join(failed)} — без них страницы зависят от CDN")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,4 +8,5 @@ alembic upgrade head
 # Если в базе нет ни одного пользователя — создаём admin (логин: admin, пароль: admin)
 python -m scripts.ensure_admin_if_empty
 
-exec uvicorn app.main:app --host 0.0.0.0 --port 8000
+# Число воркеров — UVICORN_WORKERS (по умолчанию 1); общее состояние воркеров — в БД и файлах блокировок
+exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers "${UVICORN_WORKERS:-1}"
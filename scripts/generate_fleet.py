@@ -0,0 +1,180 @@
+"""
+Синтетический парк оборудования для нагрузочных проверок и бенчмарков: организации, техника,
+история событий, кампании инвентаризации с пунктами. Вставка пакетами через SQLAlchemy Core.
+Запуск из корня проекта:
+    python -m scripts.generate_fleet --assets 100000 --companies 50
+    DATABASE_URL=sqlite+aiosqlite:///./bench.db python -m scripts.generate_fleet --assets 200000
+Повторный запуск добавляет данные (серийные номера не пересекаются с уже созданными).
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, func, select
+from werkzeug.security import generate_password_hash
+
+from app.config import SYNC_DATABASE_URL
+from app.database import Base
+from app.models import User, Asset, AssetEvent, AssetIpAddress, Company, InventoryCampaign, InventoryItem
+from app.models.asset import AssetStatus, AssetEventType, EquipmentKind
+from app.models.user import UserRole
+from app.utils.ip_addresses import asset_ip_rows
+from app.utils.specs import spec_numbers
+
+# Доли типов техники в парке
+KIND_WEIGHTS = {
+    EquipmentKind.desktop: 30, EquipmentKind.laptop: 20, EquipmentKind.monitor: 25,
+    EquipmentKind.mfu: 5, EquipmentKind.printer: 4, EquipmentKind.nettop: 4,
+    EquipmentKind.server: 3, EquipmentKind.switch: 3, EquipmentKind.sip_phone: 5, EquipmentKind.monoblock: 1,
+}
+STATUS_WEIGHTS = {AssetStatus.active: 80, AssetStatus.inactive: 8, AssetStatus.maintenance: 5, AssetStatus.retired: 7}
+MODELS = {
+    EquipmentKind.desktop: ["HP ProDesk 400 G6", "Lenovo ThinkCentre M720", "Dell OptiPlex 7090"],
+    EquipmentKind.laptop: ["Dell Latitude 5520", "HP ProBook 450 G8", "Lenovo ThinkPad T14"],
+    EquipmentKind.monitor: ["Dell P2222H", "LG 24MP88HV", "Samsung S24R350"],
+    EquipmentKind.mfu: ["HP LaserJet M428", "Kyocera M2040dn"],
+    EquipmentKind.printer: ["HP LaserJet Pro M404", "Brother HL-L2340"],
+    EquipmentKind.nettop: ["Intel NUC 10", "ASUS PN41"],
+    EquipmentKind.server: ["Dell PowerEdge R740", "HPE ProLiant DL380 Gen10"],
+    EquipmentKind.switch: ["Cisco SG350-28", "MikroTik CRS326"],
+    EquipmentKind.sip_phone: ["Yealink T46S", "Grandstream GXP1630"],
+    EquipmentKind.monoblock: ["Lenovo IdeaCentre AIO 3"],
+}
+CPUS = ["Intel Core i3-9100", "Intel Core i5-10500", "Intel Core i7-1185G7", "AMD Ryzen 5 5600G", "Intel Xeon Silver 4214"]
+RAMS = ["4 ГБ", "8 ГБ", "8 ГБ DDR4", "16 ГБ", "32 ГБ", "64 ГБ"]
+DISKS = [("SSD", "128 ГБ"), ("SSD", "256 ГБ"), ("SSD", "512 ГБ"), ("HDD", "1 ТБ"), ("NVMe", "1 ТБ")]
+OSES = ["Windows 10 Pro", "Windows 11 Pro", "Astra Linux 1.7", "Ubuntu 22.04"]
+DIAGONALS = ['21.5"', '23.8"', '24"', '27"', '14"', '15.6"']
+WITH_COMPUTE = {EquipmentKind.desktop, EquipmentKind.laptop, EquipmentKind.nettop, EquipmentKind.server, EquipmentKind.monoblock}
+
+
+def _weighted(rng: random.Random, weights: dict):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _asset_row(rng: random.Random, n: int, company_ids: list[int], now: datetime) -> dict:
+    kind = _weighted(rng, KIND_WEIGHTS)
+    company_id = rng.choice(company_ids)
+    row = {
+        "name": f"{kind.value} {n}",
+        "serial_number": f"FLT-{n:09d}",
+        "equipment_kind": kind,
+        "model": rng.choice(MODELS[kind]),
+        "location": f"Корпус {company_id % 7 + 1}, каб. {rng.randint(100, 450)}",
+        "status": _weighted(rng, STATUS_WEIGHTS),
+        "company_id": company_id,
+        "current_user": f"Сотрудник {rng.randint(1, 5000)}" if rng.random() < 0.6 else None,
+        "last_seen_at": now - timedelta(days=rng.expovariate(1 / 10)) if rng.random() < 0.9 else None,
+        "created_at": now - timedelta(days=rng.randint(30, 2000)),
+        "updated_at": now - timedelta(days=rng.randint(0, 30)),
+        "cpu": None, "ram": None, "disk1_type": None, "disk1_capacity": None, "os": None,
+        "screen_diagonal": None, "network_interfaces": None, "manufacture_date": None, "rack_units": None,
+    }
+    if kind in WITH_COMPUTE:
+        disk_type, disk_capacity = rng.choice(DISKS)
+        row.update(
+            cpu=rng.choice(CPUS), ram=rng.choice(RAMS), disk1_type=disk_type, disk1_capacity=disk_capacity,
+            os=rng.choice(OSES), manufacture_date=date(2014, 1, 1) + timedelta(days=rng.randint(0, 4000)),
+            network_interfaces=json.dumps(
+                [{"label": "Сетевая карта 1", "type": "network", "ip": f"10.{company_id % 250}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"}],
+                ensure_ascii=False,
+            ),
+        )
+    if kind in (EquipmentKind.monitor, EquipmentKind.laptop, EquipmentKind.monoblock):
+        row["screen_diagonal"] = rng.choice(DIAGONALS)
+    if kind == EquipmentKind.server:
+        row["rack_units"] = rng.choice([1, 2, 4])
+    row.update(spec_numbers(row))
+    return row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Генерация синтетического парка оборудования")
+    parser.add_argument("--database-url", default=SYNC_DATABASE_URL, help="Синхронный URL БД (по умолчанию из DATABASE_URL)")
+    parser.add_argument("--companies", type=int, default=50)
+    parser.add_argument("--assets", type=int, default=100_000)
+    parser.add_argument("--events-per-asset", type=float, default=3.0, help="Среднее число событий на единицу")
+    parser.add_argument("--campaigns", type=int, default=20)
+    parser.add_argument("--items-per-campaign", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=5000, help="Строк в одном INSERT")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+    engine = create_engine(args.database_url.replace("+aiosqlite", ""), echo=False)
+    Base.metadata.create_all(engine)
+    started = time.perf_counter()
+
+    with engine.begin() as conn:
+        admin_id = conn.execute(select(User.id).where(User.role == UserRole.admin).limit(1)).scalar()
+        if admin_id is None:
+            admin_id = conn.execute(User.__table__.insert().values(
+                username="admin", password_hash=generate_password_hash("admin"), role=UserRole.admin, is_active=True,
+            )).inserted_primary_key[0]
+        first_company = (conn.execute(select(func.max(Company.id))).scalar() or 0) + 1
+        conn.execute(Company.__table__.insert(), [
+            {"name": f"Организация {first_company + i}", "short_info": "Синтетические данные"} for i in range(args.companies)
+        ])
+        company_ids = list(conn.execute(select(Company.id)).scalars())
+        first_asset = (conn.execute(select(func.max(Asset.id))).scalar() or 0) + 1
+
+    asset_table, event_table = Asset.__table__, AssetEvent.__table__
+    event_types = [AssetEventType.moved, AssetEventType.updated, AssetEventType.assigned, AssetEventType.maintenance]
+    done = 0
+    while done < args.assets:
+        size = min(args.batch, args.assets - done)
+        rows = [_asset_row(rng, first_asset + done + i, company_ids, now) for i in range(size)]
+        with engine.begin() as conn:
+            conn.execute(asset_table.insert(), rows)
+            ids = list(conn.execute(
+                select(Asset.id).where(Asset.id >= first_asset + done).order_by(Asset.id).limit(size)
+            ).scalars())
+            events = []
+            for asset_id, row in zip(ids, rows):
+                events.append({"asset_id": asset_id, "event_type": AssetEventType.created, "description": "Генерация парка",
+                               "created_at": row["created_at"], "created_by_id": admin_id, "changes_json": None})
+                for _ in range(int(rng.expovariate(1 / max(args.events_per_asset - 1, 0.01)))):
+                    events.append({"asset_id": asset_id, "event_type": rng.choice(event_types),
+                                   "description": "Синтетическое событие",
+                                   "created_at": row["created_at"] + timedelta(days=rng.randint(1, 900)),
+                                   "created_by_id": admin_id, "changes_json": None})
+            conn.execute(event_table.insert(), events)
+            ip_rows = [
+                {"asset_id": asset_id, **ip_row}
+                for asset_id, row in zip(ids, rows)
+                for ip_row in asset_ip_rows(row["network_interfaces"], None)
+            ]
+            if ip_rows:
+                conn.execute(AssetIpAddress.__table__.insert(), ip_rows)
+        done += size
+        print(f"  техника: {done}/{args.assets}", end="\r", flush=True)
+    print()
+
+    with engine.begin() as conn:
+        all_ids = list(conn.execute(select(Asset.id).where(Asset.id >= first_asset)).scalars())
+        for c in range(args.campaigns):
+            campaign_id = conn.execute(InventoryCampaign.__table__.insert().values(
+                name=f"Синтетическая инвентаризация {c + 1}", description="Генерация парка",
+                started_at=now - timedelta(days=rng.randint(0, 365)),
+                finished_at=None if c % 3 == 0 else now, company_id=rng.choice(company_ids),
+            )).inserted_primary_key[0]
+            sample = rng.sample(all_ids, min(args.items_per_campaign, len(all_ids)))
+            conn.execute(InventoryItem.__table__.insert(), [
+                {"campaign_id": campaign_id, "asset_id": asset_id, "expected_location": None,
+                 "found": rng.random() < 0.5, "found_at": None, "notes": None, "created_at": now}
+                for asset_id in sample
+            ])
+    engine.dispose()
+    print(f"Готово за {time.perf_counter() - started:.1f} с: организаций {args.companies}, техники {args.assets}, "
+          f"кампаний {args.campaigns}.")
+
+
+if __name__ == "__main__":
+    main()
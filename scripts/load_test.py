@@ -0,0 +1,257 @@
+"""
+Нагрузочный тест: конкурентные виртуальные пользователи с разными ролями (сканировщики инвентаризации,
+просмотр дашборда и списков, выгрузки, импорт). Каждый пользователь входит через настоящую форму
+/login (CSRF-токен из страницы и cookie). Итог — пропускная способность, доля ошибок, p50/p95/p99 по действиям.
+Цель — ASGI-приложение в том же процессе (по умолчанию) или запущенный сервер (--url).
+Запуск из корня проекта:
+    python -m scripts.load_test --database-url sqlite+aiosqlite:///./bench.db --users 30 --duration 60
+    python -m scripts.load_test --url http://127.0.0.1:8000 --users 50 --mix scanner=6,viewer=3,exporter=1,importer=1
+Импортёры добавляют технику — запускайте на копии данных.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.benchmark import _import_xlsx, _percentile
+
+CSRF_RE = re.compile(r'name="csrf_token"\s+value="([^"]+)"')
+ASSET_LINK_RE = re.compile(r'href="[^"]*/assets/(\d+)"')
+CAMPAIGN_LINK_RE = re.compile(r'href="[^"]*/inventory/(\d+)"')
+XLSX_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+DEFAULT_MIX = "scanner=5,viewer=3,exporter=1,importer=1"
+
+
+class Stats:
+    """Латентности и ошибки по действиям."""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.error_samples: dict[str, str] = {}
+        self.db_locked = 0
+
+    def record(self, action: str, started: float, response=None, error: str | None = None) -> None:
+        self.latencies[action].append((time.perf_counter() - started) * 1000)
+        if response is not None and response.status_code >= 400:
+            error = f"HTTP {response.status_code}"
+            if "database is locked" in response.text:
+                self.db_locked += 1
+                error += " database is locked"
+        if error:
+            self.errors[action] += 1
+            self.error_samples.setdefault(action, error)
+
+
+async def login(client, username: str, password: str) -> None:
+    """Вход через форму: GET /login (CSRF-токен и cookie), затем POST /login."""
+    r = await client.get("/login")
+    match = CSRF_RE.search(r.text)
+    if not match:
+        raise RuntimeError("На странице /login не найден csrf_token")
+    r = await client.post("/login", data={"username": username, "password": password, "csrf_token": match.group(1)})
+    if r.status_code != 302:
+        raise RuntimeError(f"Не удалось войти: HTTP {r.status_code}")
+
+
+async def discover_ids(client) -> tuple[list[int], list[int]]:
+    """id техники и кампаний со страниц списков (работает и для удалённого сервера)."""
+    assets = sorted({int(x) for x in ASSET_LINK_RE.findall((await client.get("/assets")).text)})
+    campaigns = sorted({int(x) for x in CAMPAIGN_LINK_RE.findall((await client.get("/inventory")).text)})
+    if not assets or not campaigns:
+        raise SystemExit("Нет техники или кампаний инвентаризации: сначала запустите python -m scripts.generate_fleet")
+    return assets, campaigns
+
+
+def make_roles(asset_ids: list[int], campaign_ids: list[int], import_rows: int) -> dict:
+    """Роль -> список (действие, функция(client, rng) -> awaitable Response)."""
+
+    async def scan(client, rng):
+        return await client.post(
+            f"/assets/{rng.choice(asset_ids)}/mark-inventory-found",
+            data={"campaign_id": str(rng.choice(campaign_ids))},
+        )
+
+    async def import_assets(client, rng):
+        return await client.post(
+            "/assets/import", files={"file": ("load.xlsx", _import_xlsx(import_rows), XLSX_TYPE)},
+        )
+
+    return {
+        "scanner": [
+            ("asset_detail", lambda c, rng: c.get(f"/assets/{rng.choice(asset_ids)}")),
+            ("qr_image", lambda c, rng: c.get(f"/assets/{rng.choice(asset_ids)}/qr-image")),
+            ("inventory_scan", scan),
+        ],
+        "viewer": [
+            ("dashboard", lambda c, rng: c.get("/dashboard")),
+            ("assets_list", lambda c, rng: c.get("/assets", params={"status": "active"})),
+            ("reports", lambda c, rng: c.get("/reports")),
+            ("inventory_detail", lambda c, rng: c.get(f"/inventory/{rng.choice(campaign_ids)}")),
+        ],
+        "exporter": [
+            ("assets_export", lambda c, rng: c.get("/assets/export")),
+            ("equipment_export", lambda c, rng: c.get("/reports/equipment/export.xlsx")),
+        ],
+        "importer": [
+            ("assets_import", import_assets),
+        ],
+    }
+
+
+async def virtual_user(make_client, role: str, actions, args, stats: Stats, deadline: float, seed: int) -> None:
+    rng = random.Random(seed)
+    async with make_client() as client:
+        started = time.perf_counter()
+        try:
+            await login(client, args.username, args.password)
+            stats.record("login", started)
+        except Exception as e:
+            stats.record("login", started, error=str(e))
+            return
+        while time.perf_counter() < deadline:
+            for action, fn in actions:
+                if time.perf_counter() >= deadline:
+                    break
+                started = time.perf_counter()
+                try:
+                    stats.record(action, started, response=await fn(client, rng))
+                except Exception as e:
+                    stats.record(action, started, error=f"{type(e).__name__}: {e}")
+                if args.think:
+                    await asyncio.sleep(rng.expovariate(1 / args.think))
+
+
+def parse_mix(mix: str, roles: dict) -> dict[str, int]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in roles:
+            raise SystemExit(f"Неизвестная роль «{name}»: {', '.join(roles)}")
+        weights[name.strip()] = int(weight or 1)
+    return weights
+
+
+def allocate_users(weights: dict[str, int], users: int) -> dict[str, int]:
+    """Делит пользователей по ролям пропорционально весам (каждой роли с весом > 0 — хотя бы один, если хватает)."""
+    total = sum(weights.values())
+    active = [r for r, w in weights.items() if w > 0]
+    counts = {r: (1 if users >= len(active) and r in active else 0) for r in weights}
+    rest = users - sum(counts.values())
+    shares = {r: rest * w / total for r, w in weights.items()}
+    for r in weights:
+        counts[r] += int(shares[r])
+    leftover = users - sum(counts.values())
+    for r in sorted(weights, key=lambda r: shares[r] - int(shares[r]), reverse=True)[:leftover]:
+        counts[r] += 1
+    return counts
+
+
+def report(stats: Stats, elapsed: float, users_by_role: dict[str, int]) -> dict:
+    actions = {}
+    total = errors = 0
+    all_latencies = []
+    for action, values in sorted(stats.latencies.items()):
+        total += len(values)
+        errors += stats.errors[action]
+        all_latencies.extend(values)
+        actions[action] = {
+            "requests": len(values),
+            "errors": stats.errors[action],
+            "error_sample": stats.error_samples.get(action),
+            "rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(_percentile(values, 0.50), 1),
+            "p95_ms": round(_percentile(values, 0.95), 1),
+            "p99_ms": round(_percentile(values, 0.99), 1),
+            "max_ms": round(max(values), 1),
+        }
+    return {
+        "duration_s": round(elapsed, 1),
+        "users": users_by_role,
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2),
+        "error_rate": round(errors / total, 4) if total else 0,
+        "db_locked": stats.db_locked,
+        "p95_ms": round(_percentile(all_latencies, 0.95), 1) if all_latencies else None,
+        "p99_ms": round(_percentile(all_latencies, 0.99), 1) if all_latencies else None,
+        "actions": actions,
+    }
+
+
+def print_report(rep: dict) -> None:
+    print(f"\nДлительность {rep['duration_s']} с, пользователи {rep['users']}")
+    print(f"Запросов {rep['requests']}, {rep['throughput_rps']} запр/с, ошибок {rep['error_rate']:.2%}, "
+          f"«database is locked»: {rep['db_locked']}, p95 {rep['p95_ms']} мс, p99 {rep['p99_ms']} мс\n")
+    print(f"{'действие':18s} {'запр.':>7s} {'ошиб.':>6s} {'запр/с':>8s} {'p50':>8s} {'p95':>8s} {'p99':>8s} {'max':>8s}")
+    for name, a in rep["actions"].items():
+        print(f"{name:18s} {a['requests']:7d} {a['errors']:6d} {a['rps']:8.2f} {a['p50_ms']:8.1f} "
+              f"{a['p95_ms']:8.1f} {a['p99_ms']:8.1f} {a['max_ms']:8.1f}" + (f"  {a['error_sample']}" if a["error_sample"] else ""))
+
+
+async def main_async(args) -> int:
+    from httpx import ASGITransport, AsyncClient, Timeout
+
+    timeout = Timeout(args.timeout)
+    if args.url:
+        def make_client():
+            return AsyncClient(base_url=args.url, timeout=timeout)
+    else:
+        from app.main import app
+        transport = ASGITransport(app=app)
+
+        def make_client():
+            return AsyncClient(transport=transport, base_url="http://load", timeout=timeout)
+
+    async with make_client() as probe:
+        await login(probe, args.username, args.password)
+        asset_ids, campaign_ids = await discover_ids(probe)
+    roles = make_roles(asset_ids, campaign_ids, args.import_rows)
+    weights = parse_mix(args.mix, roles)
+    users_by_role = allocate_users(weights, args.users)
+    assigned = [role for role, n in users_by_role.items() for _ in range(n)]
+
+    stats = Stats()
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(
+        virtual_user(make_client, role, roles[role], args, stats, deadline, args.seed + i)
+        for i, role in enumerate(assigned)
+    ))
+    rep = report(stats, time.perf_counter() - started, users_by_role)
+    print_report(rep)
+    if args.report:
+        Path(args.report).write_text(json.dumps(rep, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 1 if rep["error_rate"] > args.max_error_rate else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Нагрузочный тест с конкурентными пользователями")
+    parser.add_argument("--url", help="Адрес запущенного сервера; без него — ASGI-приложение в этом процессе")
+    parser.add_argument("--database-url", help="URL БД для ASGI-режима (как DATABASE_URL)")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30, help="Секунд нагрузки")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Веса ролей: scanner, viewer, exporter, importer")
+    parser.add_argument("--think", type=float, default=0.5, help="Средняя пауза пользователя между действиями, с")
+    parser.add_argument("--username", default=os.getenv("ADMIN_USER", "admin"))
+    parser.add_argument("--password", default=os.getenv("ADMIN_PASSWORD", "admin"))
+    parser.add_argument("--import-rows", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--report", help="Сохранить отчёт в JSON")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Код выхода 1, если доля ошибок выше")
+    args = parser.parse_args()
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,7 @@ from app.config import SYNC_DATABASE_URL, BASE_DIR
 from app.database import Base
 from app.models import User, Asset, AssetEvent, InventoryCampaign, InventoryItem, Company
 from app.models.asset import AssetStatus
+from app.utils.specs import spec_numbers
 
 # Организации с кратким описанием
 COMPANIES = [
@@ -139,6 +140,7 @@ def main():
                     screen_diagonal=a.get("screen_diagonal"),
                     screen_resolution=a.get("screen_resolution"),
                     rack_units=a.get("rack_units"),
+                    **spec_numbers(a),
                 )
                 session.add(asset)
                 assets_created += 1
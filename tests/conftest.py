@@ -3,12 +3,14 @@
 """
 import asyncio
 from collections.abc import AsyncGenerator, Generator
+from contextlib import contextmanager
 
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
+from app import metrics, query_profiler
 from app.database import Base, get_db
 from app.main import app
 from app.models import User
@@ -23,6 +25,9 @@ test_engine = create_async_engine(
     TEST_DATABASE_URL,
     echo=False,
 )
+# Метрики SQL-запросов собираются и с тестового engine (как с основного в app.main)
+metrics.install_db_hooks(test_engine.sync_engine)
+query_profiler.attach(test_engine.sync_engine)
 TestSessionLocal = async_sessionmaker(
     test_engine,
     class_=AsyncSession,
@@ -136,3 +141,24 @@ async def client_anon(db_commit) -> AsyncGenerator[AsyncClient, None]:
             yield ac
     finally:
         app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Бюджет SQL-запросов: with query_budget(10): await client.get(...).
+    Тест падает, если в блоке выполнено больше max_queries запросов или один запрос
+    повторился max_repeats и более раз (N+1). В сообщении — список запросов с местом вызова.
+    """
+    @contextmanager
+    def _budget(max_queries: int, max_repeats: int = 3):
+        with query_profiler.trace_queries() as trace:
+            yield trace
+        repeated = trace.repeated(max_repeats)
+        if trace.count > max_queries or repeated:
+            pytest.fail(
+                f"Превышен бюджет SQL: {trace.count} запросов (лимит {max_queries}), "
+                f"повторов ≥{max_repeats}: {len(repeated)}\n{trace.report()}",
+                pytrace=False,
+            )
+    return _budget
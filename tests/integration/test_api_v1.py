@@ -0,0 +1,176 @@
+"""
+Интеграционные тесты JSON API v1: keyset-пагинация, fields=, фильтры, ошибки, Bearer-токен.
+"""
+import json
+
+import pytest
+from httpx import AsyncClient
+
+from app.models import Asset, AssetEvent, Company
+from app.models.asset import AssetEventType, AssetStatus
+
+
+@pytest.mark.asyncio
+async def test_api_assets_keyset_pagination_and_fields(client: AsyncClient, db_commit, query_budget):
+    """Страницы не пересекаются и покрывают всё; fields= ограничивает ключи ответа."""
+    for i in range(5):
+        db_commit.add(Asset(name=f"API page {i}", serial_number=f"SN-API-PAGE-{i}", status=AssetStatus.active,
+                            location="API-Page", cpu="Intel Core i5"))
+    await db_commit.commit()
+
+    seen, cursor = [], None
+    while True:
+        params = {"location": "API-Page", "limit": 2, "fields": "name,serial_number"}
+        if cursor:
+            params["cursor"] = cursor
+        with query_budget(3):
+            r = await client.get("/api/v1/assets", params=params)
+        assert r.status_code == 200
+        body = r.json()
+        for item in body["items"]:
+            assert set(item) == {"id", "name", "serial_number"}
+        seen.extend(item["id"] for item in body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == 5
+    assert seen == sorted(seen)
+
+    full = (await client.get("/api/v1/assets", params={"location": "API-Page", "cpu": "i5", "limit": 1})).json()
+    item = full["items"][0]
+    assert item["status"] == "active"
+    assert item["cpu"] == "Intel Core i5"
+    assert "network_interfaces" in item
+
+    r = await client.get("/api/v1/assets", params={"fields": "name,nope"})
+    assert r.status_code == 400
+    assert r.json()["code"] == "bad_request"
+
+
+@pytest.mark.asyncio
+async def test_api_asset_detail_events_and_refs(client: AsyncClient, db_commit):
+    company = Company(name="API company")
+    db_commit.add(company)
+    await db_commit.flush()
+    asset = Asset(name="API detail", serial_number="SN-API-DETAIL", status=AssetStatus.active, company_id=company.id)
+    db_commit.add(asset)
+    await db_commit.flush()
+    db_commit.add(AssetEvent(asset_id=asset.id, event_type=AssetEventType.moved, description="Перемещено",
+                             changes_json='[{"field_label": "Расположение", "old": "A", "new": "B"}]'))
+    await db_commit.commit()
+
+    r = await client.get(f"/api/v1/assets/{asset.id}", params={"fields": "company_id"})
+    assert r.json() == {"id": asset.id, "company_id": company.id}
+
+    events = (await client.get(f"/api/v1/assets/{asset.id}/events")).json()
+    assert events["items"][0]["event_type"] == "moved"
+    assert events["items"][0]["changes"][0]["new"] == "B"
+
+    missing = await client.get("/api/v1/assets/999999")
+    assert missing.status_code == 404
+    assert missing.json()["code"] == "not_found"
+
+    companies = (await client.get("/api/v1/companies")).json()
+    assert any(c["id"] == company.id for c in companies)
+    assert (await client.get("/api/v1/campaigns")).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_api_bearer_token(client_anon: AsyncClient, test_user):
+    """Без авторизации — 401 JSON; токен из /auth/token принимается в Authorization: Bearer."""
+    r = await client_anon.get("/api/v1/companies")
+    assert r.status_code == 401
+    assert r.json()["code"] == "unauthorized"
+
+    bad = await client_anon.post("/api/v1/auth/token", json={"username": "testadmin", "password": "wrong"})
+    assert bad.status_code == 401
+
+    r = await client_anon.post("/api/v1/auth/token", json={"username": "testadmin", "password": "testpass"})
+    assert r.status_code == 200
+    token = r.json()["access_token"]
+    r = await client_anon.get("/api/v1/companies", headers={"Authorization": f"Bearer {token}"})
+    assert r.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_api_assets_spec_ranges(client: AsyncClient, db_commit):
+    """Диапазоны ОЗУ, диска и диагонали — по числовым колонкам, заполненным при создании и правке."""
+    from app.services import assets_service
+
+    small = await assets_service.create_asset(
+        db_commit, {"name": "Spec small", "serial_number": "SN-SPEC-1", "status": AssetStatus.active,
+                    "location": "API-Spec", "ram": "8 ГБ", "disk1_capacity": "256GB SSD"},
+        created_by_id=None,
+    )
+    big = await assets_service.create_asset(
+        db_commit, {"name": "Spec big", "serial_number": "SN-SPEC-2", "status": AssetStatus.active,
+                    "location": "API-Spec", "ram": "2x16GB", "disk1_capacity": "1 TB", "screen_diagonal": '15,6"'},
+        created_by_id=None,
+    )
+    await db_commit.commit()
+    assert (small.ram_mb, small.disk_gb, big.ram_mb, big.diagonal_in) == (8192, 256, 32768, 15.6)
+
+    async def names(**params):
+        r = await client.get("/api/v1/assets", params={"location": "API-Spec", **params})
+        assert r.status_code == 200
+        return [item["name"] for item in r.json()["items"]]
+
+    assert await names(ram_gb_from=16) == ["Spec big"]
+    assert await names(disk_gb_to=500) == ["Spec small"]
+    assert await names(diagonal_from=15, diagonal_to=16) == ["Spec big"]
+
+    await assets_service.update_asset(db_commit, small, {"ram": "64 GB"}, changes=[], updated_by_id=None)
+    await db_commit.commit()
+    assert await names(ram_gb_from=16) == ["Spec small", "Spec big"]
+
+    r = await client.get("/assets/advanced-search", params={"location": "API-Spec", "ram_gb_from": "40"})
+    assert r.status_code == 200
+    assert "Spec small" in r.text and "Spec big" not in r.text
+
+
+@pytest.mark.asyncio
+async def test_api_assets_ip_search(client: AsyncClient, db_commit):
+    """Поиск по адресу и подсети — по asset_ip_addresses, которую ведут создание и правка карточки."""
+    from app.services import assets_service
+
+    def interfaces(*ips):
+        return json.dumps([{"label": f"eth{i}", "type": "network", "ip": ip} for i, ip in enumerate(ips)])
+
+    srv = await assets_service.create_asset(
+        db_commit, {"name": "IP server", "serial_number": "SN-IP-1", "status": AssetStatus.active,
+                    "network_interfaces": interfaces("10.42.3.4", "2001:db8::5")},
+        created_by_id=None,
+    )
+    await assets_service.create_asset(
+        db_commit, {"name": "IP printer", "serial_number": "SN-IP-2", "status": AssetStatus.active,
+                    "network_card": "10.42.200.9"},
+        created_by_id=None,
+    )
+    await db_commit.commit()
+
+    async def names(ip):
+        r = await client.get("/api/v1/assets", params={"ip": ip, "fields": "name"})
+        assert r.status_code == 200
+        return [item["name"] for item in r.json()["items"]]
+
+    assert await names("10.42.3.4") == ["IP server"]
+    assert await names("10.42.0.0/16") == ["IP server", "IP printer"]
+    assert await names("2001:db8::/64") == ["IP server"]
+    assert await names("10.42.3.5") == []
+    r = await client.get("/api/v1/assets", params={"ip": "10.42.0.0/99"})
+    assert r.status_code == 422
+
+    await assets_service.update_asset(
+        db_commit, srv, {"network_interfaces": interfaces("10.43.0.1")}, changes=[], updated_by_id=None,
+    )
+    await db_commit.commit()
+    assert await names("10.42.0.0/16") == ["IP printer"]
+    assert await names("10.43.0.1") == ["IP server"]
+
+    r = await client.get("/assets/advanced-search", params={"ip": "10.43.0.0/24"})
+    assert "IP server" in r.text and "IP printer" not in r.text
+
+    # Опечатка в адресе на странице: подсказка у поля и пустой результат, а не вся техника
+    r = await client.get("/assets/advanced-search", params={"ip": "10.0.0.300"})
+    assert "Ожидается IP-адрес или подсеть CIDR" in r.text
+    assert "IP server" not in r.text and "IP printer" not in r.text
@@ -1,6 +1,8 @@
 """
 Интеграционные тесты: эндпоинты CRUD (список активов, экспорт).
 """
+import json
+
 import pytest
 from httpx import AsyncClient
 
@@ -34,3 +36,36 @@ async def test_equipment_export_ok(client: AsyncClient):
     ct = r.headers.get("content-type", "").lower()
     cd = r.headers.get("content-disposition", "").lower()
     assert "spreadsheet" in ct or "xlsx" in cd
+
+
+@pytest.mark.asyncio
+async def test_asset_components_from_form(client: AsyncClient):
+    """Доп. устройства из формы попадают в asset_components: карточка, форма правки и поиск по типу."""
+    components = [{"type": "ram", "name": "8 ГБ DDR4"}, {"type": "disk", "name": "SSD 256"}]
+    r = await client.post("/assets/create", data={
+        "name": "ПК с модулями", "serial_number": "SN-COMP-1", "status": "active",
+        "extra_components": json.dumps(components, ensure_ascii=False),
+    })
+    assert r.status_code == 302
+    detail_url = r.headers["location"]
+    asset_id = int(detail_url.rsplit("/", 1)[1])
+
+    r = await client.get(detail_url)
+    assert "8 ГБ DDR4" in r.text and "SSD 256" in r.text
+
+    async def names(component_type):
+        r = await client.get("/api/v1/assets", params={"component_type": component_type, "name": "модулями"})
+        return [item["name"] for item in r.json()["items"]]
+
+    assert await names("ram") == ["ПК с модулями"]
+    assert await names("cpu") == []
+
+    r = await client.post(f"/assets/{asset_id}/edit", data={
+        "name": "ПК с модулями", "serial_number": "SN-COMP-1", "status": "active",
+        "extra_components": json.dumps([{"type": "cpu", "name": "Xeon"}]),
+    })
+    assert r.status_code == 302
+    assert await names("ram") == []
+    assert await names("cpu") == ["ПК с модулями"]
+    r = await client.get(f"/assets/{asset_id}/edit")
+    assert '"name": "Xeon"' in r.text and "8 ГБ DDR4" not in r.text
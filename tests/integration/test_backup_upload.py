@@ -0,0 +1,42 @@
+"""
+Интеграционные тесты: загрузка архива для восстановления пишется потоково, с лимитом размера.
+"""
+import pytest
+from httpx import AsyncClient
+
+from app.routers import admin_router
+from app.services import backup
+
+NOT_A_ZIP = b"not a zip archive" * 1024
+
+
+def _uploads() -> list:
+    return list(backup.DB_PATH.parent.glob(".upload_*"))
+
+
+@pytest.mark.asyncio
+async def test_upload_restore_over_limit_returns_413(client: AsyncClient, monkeypatch):
+    """Архив больше MAX_RESTORE_UPLOAD_MB отклоняется с 413, временный файл удаляется."""
+    monkeypatch.setattr(admin_router, "MAX_RESTORE_UPLOAD_MB", 0)
+    before = _uploads()
+    r = await client.post(
+        "/admin/backups/upload-restore", data={"confirm": "yes"},
+        files={"file": ("backup.zip", NOT_A_ZIP, "application/zip")},
+    )
+    assert r.status_code == 413
+    assert _uploads() == before
+
+
+@pytest.mark.asyncio
+async def test_upload_restore_reads_form_from_stream(client: AsyncClient):
+    """Поля формы читаются из потока: без подтверждения — редирект, битый архив — 400."""
+    files = {"file": ("backup.zip", NOT_A_ZIP, "application/zip")}
+    r = await client.post("/admin/backups/upload-restore", files=files)
+    assert r.status_code == 302
+    assert "error=confirm" in r.headers["location"]
+
+    r = await client.post("/admin/backups/upload-restore", data={"confirm": "yes"}, files=files)
+    assert r.status_code == 400
+
+    r = await client.post("/admin/backups/upload-restore", data={"confirm": "yes"})
+    assert r.status_code == 400
@@ -0,0 +1,68 @@
+"""
+Интеграционные тесты массового изменения техники (API и страница).
+"""
+import json
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.models import Asset, AssetEvent
+from app.models.asset import AssetStatus
+
+
+async def _make_assets(db, location: str, count: int, retired: int = 0) -> list[Asset]:
+    assets = [
+        Asset(name=f"{location} {i}", location=location, status=AssetStatus.retired if i < retired else AssetStatus.active)
+        for i in range(count)
+    ]
+    db.add_all(assets)
+    await db.commit()
+    return assets
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_by_filter_skips_retired(client: AsyncClient, db_commit, query_budget):
+    """Один набор запросов на любое число активов; списанные не перемещаются."""
+    assets = await _make_assets(db_commit, "Bulk-Old", 30, retired=2)
+    with query_budget(12, max_repeats=4):
+        r = await client.post("/api/v1/assets/bulk-update", json={
+            "filter": {"location": "Bulk-Old"},
+            "changes": {"location": "Bulk-New", "current_user": "Иванов"},
+        })
+    assert r.status_code == 200
+    assert r.json() == {"matched": 30, "updated": 28, "unchanged": 0, "skipped_retired": 2}
+
+    rows = dict((await db_commit.execute(
+        select(Asset.id, Asset.location).where(Asset.id.in_([a.id for a in assets]))
+    )).tuples().all())
+    assert rows[assets[0].id] == "Bulk-Old"
+    assert rows[assets[5].id] == "Bulk-New"
+    event = (await db_commit.execute(select(AssetEvent).where(AssetEvent.asset_id == assets[5].id))).scalar_one()
+    changes = json.loads(event.changes_json)
+    assert {"field_label": "Расположение", "old": "Bulk-Old", "new": "Bulk-New"} in changes
+
+    # Повтор — изменять нечего
+    r = await client.post("/api/v1/assets/bulk-update", json={
+        "ids": [a.id for a in assets[2:]], "changes": {"location": "Bulk-New"},
+    })
+    assert r.json()["unchanged"] == 28
+
+    bad = await client.post("/api/v1/assets/bulk-update", json={"changes": {"location": "x"}})
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_bulk_edit_page(client: AsyncClient, db_commit):
+    assets = await _make_assets(db_commit, "Bulk-Page", 3)
+    r = await client.get("/assets/bulk-edit", params={"location": "Bulk-Page"})
+    assert r.status_code == 200
+    assert "<strong>3</strong>" in r.text
+
+    r = await client.post("/assets/bulk-edit?location=Bulk-Page", data={"status": "maintenance"})
+    assert r.status_code == 302
+    assert "updated=3" in r.headers["location"]
+    statuses = (await db_commit.execute(
+        select(Asset.status).where(Asset.id.in_([a.id for a in assets]))
+    )).scalars().all()
+    assert set(statuses) == {AssetStatus.maintenance}
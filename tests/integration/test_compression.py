@@ -0,0 +1,62 @@
+"""
+Интеграционные тесты: сжатие ответов и статика с отпечатками и предсжатыми файлами.
+"""
+import gzip
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from app.utils.static_files import IMMUTABLE_CACHE_CONTROL, FingerprintedStaticFiles, static_url
+
+
+@pytest.mark.asyncio
+async def test_html_compressed_xlsx_not(client: AsyncClient):
+    """Большая HTML-страница сжимается gzip, Excel (уже zip) — нет."""
+    r = await client.get("/assets", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in r.headers["vary"].lower()
+    assert r.num_bytes_downloaded < len(r.content)
+
+    export = await client.get("/assets/export", headers={"Accept-Encoding": "gzip"})
+    assert export.status_code == 200
+    assert "content-encoding" not in export.headers
+
+    plain = await client.get("/assets", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+
+@pytest.mark.asyncio
+async def test_fingerprinted_static_is_immutable(client: AsyncClient):
+    """URL из static_url содержит отпечаток и кэшируется навсегда; без отпечатка — с перепроверкой."""
+    url = static_url("style.css")
+    assert "?v=" in url
+    r = await client.get(url)
+    assert r.status_code == 200
+    assert r.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    r2 = await client.get("/static/style.css")
+    assert r2.headers["cache-control"] == "no-cache"
+
+
+@pytest.mark.asyncio
+async def test_precompressed_static_served(tmp_path):
+    """Если рядом лежит свежий *.gz, он отдаётся как есть с Content-Encoding: gzip."""
+    css = b"body { color: red; }\n" * 200
+    (tmp_path / "app.css").write_bytes(css)
+    (tmp_path / "app.css.gz").write_bytes(gzip.compress(css))
+    static_app = Starlette(routes=[Mount("/static", FingerprintedStaticFiles(directory=str(tmp_path)))])
+    async with AsyncClient(transport=ASGITransport(app=static_app), base_url="http://test") as ac:
+        r = await ac.get("/static/app.css", headers={"Accept-Encoding": "gzip"})
+        assert r.headers["content-encoding"] == "gzip"
+        assert r.headers["content-type"].startswith("text/css")
+        assert r.content == css
+        assert r.num_bytes_downloaded < len(css)
+        r304 = await ac.get("/static/app.css", headers={"Accept-Encoding": "gzip", "If-None-Match": r.headers["etag"]})
+        assert r304.status_code == 304
+        identity = await ac.get("/static/app.css", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in identity.headers
+        assert identity.content == css
+        refused = await ac.get("/static/app.css", headers={"Accept-Encoding": "gzip;q=0, identity"})
+        assert "content-encoding" not in refused.headers
+        assert refused.content == css
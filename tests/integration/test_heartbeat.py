@@ -0,0 +1,103 @@
+"""
+Интеграционные тесты heartbeat: приём отметок без записи в БД и пакетный сброс в last_seen_at.
+"""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.models import Asset
+from app.models.asset import AssetStatus
+from app.services.assets_service import create_asset
+from app.services.heartbeat_service import HeartbeatBuffer, flush_heartbeats, heartbeat_buffer
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_endpoint_buffers_pings(client: AsyncClient, client_anon: AsyncClient, query_budget):
+    heartbeat_buffer.drain()
+    with query_budget(2):
+        r = await client.post("/api/v1/heartbeat", json=[
+            {"serial_number": "SN-HB-X"}, {"serial_number": "SN-HB-X"}, {"ip": "not-an-ip"}, {"asset_id": 1},
+        ])
+    assert r.status_code == 202
+    assert r.json() == {"accepted": 3, "rejected": 1, "pending": 2}
+    assert (await client.post("/api/v1/heartbeat", json={"ip": "10.0.0.1"})).json()["pending"] == 3
+    assert (await client_anon.post("/api/v1/heartbeat", json={"asset_id": 1})).status_code == 401
+    heartbeat_buffer.drain()
+
+
+@pytest.mark.asyncio
+async def test_flush_resolves_serial_ip_and_keeps_latest(db_commit, query_budget):
+    """Отметки по id, серийному номеру и IP одного устройства сливаются в одну запись — самую позднюю."""
+    old = datetime.utcnow() - timedelta(days=90)
+    # Через сервис: адреса интерфейсов попадают в asset_ip_addresses
+    a = await create_asset(db_commit, {
+        "name": "HB 1", "serial_number": "SN-HB-1", "status": AssetStatus.active, "last_seen_at": old,
+        "network_interfaces": json.dumps([{"label": "eth0", "type": "network", "ip": "10.9.8.7"}]),
+    }, created_by_id=None)
+    b = Asset(name="HB 2", serial_number="SN-HB-2", status=AssetStatus.active)
+    db_commit.add(b)
+    await db_commit.commit()
+
+    buffer = HeartbeatBuffer()
+    now = datetime.utcnow()
+    buffer.add(asset_id=a.id, seen_at=now - timedelta(minutes=5))
+    buffer.add(serial_number="SN-HB-1", seen_at=now - timedelta(minutes=1))
+    buffer.add(ip="10.9.8.7", seen_at=now - timedelta(minutes=3))
+    buffer.add(serial_number="SN-HB-2", seen_at=now + timedelta(days=1))  # из будущего — обрезается
+    buffer.add(serial_number="SN-HB-UNKNOWN")
+    with query_budget(10):
+        updated = await flush_heartbeats(db_commit, buffer)
+    await db_commit.commit()
+    assert updated == 2
+    assert buffer.pending() == 0
+    assert buffer.unmatched == 1
+
+    rows = dict((await db_commit.execute(
+        select(Asset.id, Asset.last_seen_at).where(Asset.id.in_([a.id, b.id]))
+    )).tuples().all())
+    assert abs(rows[a.id].replace(tzinfo=None) - (now - timedelta(minutes=1))) < timedelta(seconds=1)
+    assert rows[b.id].replace(tzinfo=None) <= datetime.utcnow()
+
+    # Более ранняя отметка не затирает более позднюю
+    buffer.add(asset_id=a.id, seen_at=now - timedelta(hours=1))
+    await flush_heartbeats(db_commit, buffer)
+    await db_commit.commit()
+    seen = (await db_commit.execute(select(Asset.last_seen_at).where(Asset.id == a.id))).scalar()
+    assert seen.replace(tzinfo=None) > now - timedelta(minutes=2)
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_returns_pings_to_buffer(db_commit, monkeypatch):
+    """Если UPDATE не удался (например, БД занята восстановлением), отметки остаются в буфере."""
+    from app.repositories import asset_repo
+
+    a = Asset(name="HB fail", serial_number="SN-HB-FAIL", status=AssetStatus.active)
+    db_commit.add(a)
+    await db_commit.commit()
+    asset_id = a.id
+    buffer = HeartbeatBuffer()
+    now = datetime.utcnow()
+    buffer.add(asset_id=asset_id, seen_at=now - timedelta(minutes=5))
+
+    async def locked(*args, **kwargs):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(asset_repo, "bulk_update_last_seen", locked)
+    with pytest.raises(RuntimeError):
+        await flush_heartbeats(db_commit, buffer)
+    assert buffer.by_id == {asset_id: now - timedelta(minutes=5)}
+    await db_commit.rollback()
+    # Пинг во время неудачного сброса новее возвращённого — остаётся он
+    buffer.add(asset_id=asset_id, seen_at=now - timedelta(minutes=1))
+    buffer.restore(({asset_id: now - timedelta(minutes=10)}, {}, {}))
+    assert buffer.pending() == 1 and buffer.flushed == 0
+    assert buffer.by_id[asset_id] == now - timedelta(minutes=1)
+
+    monkeypatch.undo()
+    assert await flush_heartbeats(db_commit, buffer, commit=True) == 1
+    assert buffer.pending() == 0
+    seen = (await db_commit.execute(select(Asset.last_seen_at).where(Asset.id == asset_id))).scalar()
+    assert abs(seen.replace(tzinfo=None) - (now - timedelta(minutes=1))) < timedelta(seconds=1)
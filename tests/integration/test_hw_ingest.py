@@ -0,0 +1,51 @@
+"""
+Интеграционные тесты приёма отчётов агентов об оборудовании: запись только изменений.
+"""
+import json
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from app.models import Asset, AssetEvent, AssetIpAddress
+from app.models.asset import AssetStatus
+from app.services.heartbeat_service import heartbeat_buffer
+
+
+@pytest.mark.asyncio
+async def test_hw_report_writes_only_changes(client: AsyncClient, db_commit, query_budget):
+    asset = Asset(name="HW agent", serial_number="SN-HW-1", status=AssetStatus.active, cpu="Intel Core i3", ram="8 ГБ")
+    same = Asset(name="HW same", serial_number="SN-HW-2", status=AssetStatus.active, cpu="AMD Ryzen 5")
+    db_commit.add_all([asset, same])
+    await db_commit.commit()
+    report = {
+        "serial_number": "SN-HW-1", "cpu": "Intel Core i5-10500", "ram": "8 ГБ",
+        "network_interfaces": [{"label": "eth0", "ip": "10.1.1.1"}],
+    }
+    payload = [report, {"serial_number": "SN-HW-2", "cpu": "AMD Ryzen 5"}, {"serial_number": "SN-HW-NOPE", "cpu": "x"}]
+
+    r = await client.post("/api/v1/hardware-reports", json=payload)
+    assert r.status_code == 200
+    assert r.json() == {"received": 3, "updated": 1, "unchanged": 1, "unmatched": 1}
+
+    events = (await db_commit.execute(
+        select(AssetEvent).where(AssetEvent.asset_id == asset.id)
+    )).scalars().all()
+    assert len(events) == 1
+    changes = {c["field_label"]: c for c in json.loads(events[0].changes_json)}
+    assert changes["Процессор"] == {"field_label": "Процессор", "old": "Intel Core i3", "new": "Intel Core i5-10500"}
+    assert "ОЗУ" not in changes
+    row = (await db_commit.execute(select(Asset.cpu, Asset.network_interfaces).where(Asset.id == asset.id))).one()
+    assert row.cpu == "Intel Core i5-10500"
+    assert json.loads(row.network_interfaces)[0]["ip"] == "10.1.1.1"
+    ips = (await db_commit.execute(select(AssetIpAddress.ip).where(AssetIpAddress.asset_id == asset.id))).scalars().all()
+    assert ips == ["10.1.1.1"]
+
+    # Повтор тех же отчётов: только поиск по серийным номерам и сравнение хешей, без записи
+    with query_budget(4) as trace:
+        r = await client.post("/api/v1/hardware-reports", json=payload)
+    assert r.json() == {"received": 3, "updated": 0, "unchanged": 2, "unmatched": 1}
+    assert not [q for q in trace.queries if q.statement.lstrip().upper().startswith(("UPDATE", "INSERT"))]
+    count = (await db_commit.execute(select(func.count(AssetEvent.id)).where(AssetEvent.asset_id == asset.id))).scalar()
+    assert count == 1
+    heartbeat_buffer.drain()
@@ -0,0 +1,211 @@
+"""
+Интеграционные тесты импорта оборудования из Excel: создание, обновление по серийному номеру, проверка без записи,
+несколько файлов и листов в одном пакете.
+"""
+import json
+from io import BytesIO
+from urllib.parse import unquote_plus
+
+import pytest
+from httpx import AsyncClient
+from openpyxl import Workbook
+from sqlalchemy import func, select
+
+from app.models import Asset, AssetEvent, AssetIpAddress, Company
+from app.models.asset import AssetStatus
+
+XLSX_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _xlsx(rows: list[list]) -> bytes:
+    wb = Workbook()
+    ws = wb.active
+    for row in rows:
+        ws.append(row)
+    buf = BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+async def _import(client: AsyncClient, content: bytes, mode: str = "create"):
+    return await client.post(
+        "/assets/import", files={"file": ("import.xlsx", content, XLSX_TYPE)}, data={"mode": mode},
+    )
+
+
+@pytest.mark.asyncio
+async def test_import_create_skips_existing_serials(client: AsyncClient, db_commit):
+    db_commit.add(Asset(name="Уже есть", serial_number="IMP-C-1", status=AssetStatus.active))
+    await db_commit.commit()
+    content = _xlsx([
+        ["Название", "Серийный номер", "Тип техники", "Статус"],
+        ["Старый", "IMP-C-1", "ноутбук", "активно"],
+        ["Новый", "IMP-C-2", "ноутбук", ""],
+        ["Дубль", "IMP-C-2", "ноутбук", ""],
+    ])
+    r = await _import(client, content)
+    assert r.status_code == 302
+    assert "imported=1" in r.headers["location"]
+    created = (await db_commit.execute(select(Asset).where(Asset.serial_number == "IMP-C-2"))).scalar_one()
+    assert created.name == "Новый"
+    assert created.equipment_kind.value == "laptop"
+    assert created.status == AssetStatus.active
+    name = (await db_commit.execute(select(Asset.name).where(Asset.serial_number == "IMP-C-1"))).scalar_one()
+    assert name == "Уже есть"
+
+
+@pytest.mark.asyncio
+async def test_import_upsert_updates_changed_only(client: AsyncClient, db_commit, query_budget):
+    company = Company(name="Импорт-Орг")
+    db_commit.add(company)
+    await db_commit.flush()
+    kept = Asset(name="ПК 1", serial_number="IMP-U-1", location="101", cpu="i3", company_id=company.id,
+                 description="не трогать")
+    moved = Asset(name="ПК 2", serial_number="IMP-U-2", location="101")
+    retired = Asset(name="ПК 3", serial_number="IMP-U-3", location="101", status=AssetStatus.retired)
+    db_commit.add_all([kept, moved, retired])
+    await db_commit.commit()
+    header = ["Название", "Серийный номер", "Расположение", "Организация", "CPU", "Статус"]
+    content = _xlsx([
+        header,
+        ["ПК 1", "IMP-U-1", "101", "импорт-орг", "i3", "активно"],
+        ["ПК 2", "IMP-U-2", "205", "", "i5", "активно"],
+        ["ПК 3", "IMP-U-3", "205", "", "", "списано"],
+        ["ПК 4", "IMP-U-4", "205", "", "", ""],
+    ])
+
+    r = await _import(client, content, mode="upsert")
+    location = r.headers["location"]
+    assert "imported=1" in location and "updated=1" in location and "unchanged=1" in location
+    rows = {row.serial_number: row for row in (await db_commit.execute(
+        select(Asset.serial_number, Asset.location, Asset.cpu, Asset.description)
+        .where(Asset.serial_number.like("IMP-U-%"))
+    )).all()}
+    assert rows["IMP-U-2"].location == "205" and rows["IMP-U-2"].cpu == "i5"
+    assert rows["IMP-U-3"].location == "101"
+    assert rows["IMP-U-1"].description == "не трогать"
+    event = (await db_commit.execute(select(AssetEvent).where(AssetEvent.asset_id == moved.id))).scalar_one()
+    changes = json.loads(event.changes_json)
+    assert {"field_label": "Расположение", "old": "101", "new": "205"} in changes
+
+    # Повторный импорт той же выгрузки: только чтение, без записи
+    events_before = (await db_commit.execute(select(func.count(AssetEvent.id)))).scalar()
+    with query_budget(8) as trace:
+        r = await _import(client, content, mode="upsert")
+    assert "imported=0" in r.headers["location"] and "unchanged=3" in r.headers["location"]
+    assert not [q for q in trace.queries if q.statement.lstrip().upper().startswith(("UPDATE", "INSERT"))]
+    assert (await db_commit.execute(select(func.count(AssetEvent.id)))).scalar() == events_before
+
+
+@pytest.mark.asyncio
+async def test_import_syncs_ip_addresses(client: AsyncClient, db_commit):
+    """«IP адрес» из файла попадает в asset_ip_addresses; при обновлении адреса интерфейсов сохраняются."""
+    db_commit.add(Asset(name="Коммутатор", serial_number="IMP-IP-1", network_card="10.5.0.1",
+                        network_interfaces=json.dumps([{"label": "mgmt", "type": "oob", "ip": "10.6.0.1"}])))
+    await db_commit.commit()
+    content = _xlsx([
+        ["Название", "Серийный номер", "IP адрес"],
+        ["Коммутатор", "IMP-IP-1", "10.5.0.2"],
+        ["Принтер", "IMP-IP-2", "10.5.0.3"],
+    ])
+    r = await _import(client, content, mode="upsert")
+    assert "imported=1" in r.headers["location"] and "updated=1" in r.headers["location"]
+    rows = (await db_commit.execute(
+        select(Asset.serial_number, AssetIpAddress.ip, AssetIpAddress.type)
+        .join(AssetIpAddress, AssetIpAddress.asset_id == Asset.id)
+        .where(Asset.serial_number.like("IMP-IP-%"))
+        .order_by(Asset.serial_number, AssetIpAddress.ip)
+    )).all()
+    assert [tuple(row) for row in rows] == [
+        ("IMP-IP-1", "10.5.0.2", "network"), ("IMP-IP-1", "10.6.0.1", "oob"), ("IMP-IP-2", "10.5.0.3", "network"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_import_dry_run_report(client: AsyncClient, db_commit, query_budget):
+    deleted = Asset(name="Удалён", serial_number="IMP-D-1")
+    db_commit.add_all([deleted, Asset(name="Есть", serial_number="IMP-D-2", location="1")])
+    await db_commit.flush()
+    deleted.deleted_at = deleted.created_at
+    await db_commit.commit()
+    content = _xlsx([
+        ["Название", "Серийный номер", "Тип техники", "Организация", "Дата выпуска", "Расположение"],
+        ["Новый", "IMP-D-3", "тостер", "Нет такой", "31.02.2020", "1"],
+        ["Повтор", "IMP-D-3", "", "", "", "1"],
+        ["Удалённый", "IMP-D-1", "", "", "", "1"],
+        ["Есть", "IMP-D-2", "", "", "2020-01-15", "2"],
+    ])
+    with query_budget(8) as trace:
+        r = await client.post(
+            "/assets/import", files={"file": ("import.xlsx", content, XLSX_TYPE)},
+            data={"mode": "upsert", "dry_run": "true"},
+        )
+    assert r.status_code == 200
+    assert "import_check.csv" in r.headers["content-disposition"]
+    assert not [q for q in trace.queries if q.statement.lstrip().upper().startswith(("UPDATE", "INSERT"))]
+    lines = r.content.decode("utf-8-sig").splitlines()
+    assert lines[0] == "Файл / лист;Строка;Серийный номер;Название;Результат;Замечания"
+    by_row = {line.split(";")[1]: line for line in lines[1:]}
+    assert "Будет создана" in by_row["2"]
+    assert "Тип техники «тостер» не распознано" in by_row["2"]
+    assert "Дата выпуска «31.02.2020» не распознано" in by_row["2"]
+    assert "Организация «Нет такой» не найдена" in by_row["2"]
+    assert "повторяется в файле — впервые строка 2" in by_row["3"]
+    assert "удалённой записи" in by_row["4"]
+    assert "Будет обновлена" in by_row["5"] and "Расположение: 1 → 2" in by_row["5"]
+    assert (await db_commit.execute(select(func.count(Asset.id)).where(Asset.serial_number == "IMP-D-3"))).scalar() == 0
+
+    r = await client.post(
+        "/assets/import", files={"file": ("import.xlsx", content, XLSX_TYPE)},
+        data={"dry_run": "true", "report_format": "xlsx"},
+    )
+    assert r.headers["content-type"].startswith(XLSX_TYPE)
+
+
+@pytest.mark.asyncio
+async def test_import_csv_upload(client: AsyncClient, db_commit):
+    content = "Название;Серийный номер;Расположение\nCSV ПК;IMP-CSV-1;300\n".encode("cp1251")
+    r = await client.post("/assets/import", files={"file": ("site.csv", content, "text/csv")})
+    assert "imported=1" in r.headers["location"]
+    location = (await db_commit.execute(select(Asset.location).where(Asset.serial_number == "IMP-CSV-1"))).scalar_one()
+    assert location == "300"
+
+    r = await client.post("/assets/import", files={"file": ("site.txt", content, "text/plain")})
+    assert "errors=" in r.headers["location"]
+
+
+@pytest.mark.asyncio
+async def test_import_all_sheets_and_files(client: AsyncClient, db_commit):
+    wb = Workbook()
+    floor1 = wb.active
+    floor1.title = "Этаж 1"
+    floor1.append(["Название", "Серийный номер", "Расположение"])
+    floor1.append(["ПК 101", "IMP-M-1", "101"])
+    floor2 = wb.create_sheet("Этаж 2")
+    floor2.append(["Наименование", "S/N", "Кабинет"])
+    floor2.append(["ПК 201", "IMP-M-2", "201"])
+    floor2.append(["ПК 202", "IMP-M-1", "202"])
+    wb.create_sheet("Пустой")
+    buf = BytesIO()
+    wb.save(buf)
+    csv_content = "Название;Серийный номер\nНоутбук;IMP-M-3\nДубль;IMP-M-2\n".encode("utf-8")
+
+    r = await client.post(
+        "/assets/import",
+        files=[("file", ("site.xlsx", buf.getvalue(), XLSX_TYPE)), ("file", ("extra.csv", csv_content, "text/csv"))],
+        data={"all_sheets": "true"},
+    )
+    location = unquote_plus(r.headers["location"])
+    assert "imported=3" in location
+    assert "site.xlsx / Этаж 2, строка 3: серийный номер «IMP-M-1» повторяется в файле — впервые site.xlsx / Этаж 1, строка 2" in location
+    assert "extra.csv, строка 3: серийный номер «IMP-M-2»" in location
+    rows = dict((await db_commit.execute(
+        select(Asset.serial_number, Asset.location).where(Asset.serial_number.like("IMP-M-%"))
+    )).tuples().all())
+    assert rows == {"IMP-M-1": "101", "IMP-M-2": "201", "IMP-M-3": None}
+
+    # Без all_sheets — только активный лист
+    r = await client.post(
+        "/assets/import", files={"file": ("site.xlsx", buf.getvalue(), XLSX_TYPE)}, data={"dry_run": "true"},
+    )
+    assert len(r.content.decode("utf-8-sig").splitlines()) == 2
@@ -0,0 +1,33 @@
+"""
+Интеграционные тесты: метрики производительности по маршрутам и эндпоинт /metrics.
+"""
+import pytest
+from httpx import AsyncClient
+
+from app import metrics
+
+
+@pytest.mark.asyncio
+async def test_metrics_collected_per_route_template(client: AsyncClient, client_anon: AsyncClient):
+    """Запросы учитываются по шаблону пути; /metrics отдаёт формат Prometheus только администратору."""
+    metrics.reset()
+    r = await client.get("/assets")
+    assert r.status_code == 200
+    data = metrics.snapshot()
+    rs = data[("GET", "/assets")]
+    assert rs.count == 1
+    assert rs.db_queries > 0
+    assert rs.template_time > 0
+    # Размер ответа — переданный по сети (после сжатия gzip)
+    assert r.headers["content-encoding"] == "gzip"
+    assert rs.response_bytes == r.num_bytes_downloaded
+
+    r = await client.get("/metrics")
+    assert r.status_code == 200
+    assert 'http_request_duration_seconds_count{method="GET",route="/assets"} 1' in r.text
+    assert "http_db_queries_total" in r.text
+
+    r = await client_anon.get("/metrics")
+    assert r.status_code == 401
+    r = await client.get("/admin/metrics")
+    assert r.status_code == 200
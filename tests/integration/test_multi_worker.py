@@ -0,0 +1,132 @@
+"""
+Интеграционный тест: сервер uvicorn с двумя воркерами на одной SQLite-БД.
+Конкурентные записи и чтения не дают 5xx («database is locked»), все записи сохраняются,
+метрики /metrics суммируются по воркерам.
+"""
+import asyncio
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+from sqlalchemy import create_engine, func, select
+from werkzeug.security import generate_password_hash
+
+from app.auth import create_session_token
+from app.config import SESSION_COOKIE_NAME
+from app.database import Base
+from app.models import Asset, User
+from app.models.user import UserRole
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+WRITES = 40
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _prepare_db(path: Path) -> int:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        admin_id = conn.execute(User.__table__.insert().values(
+            username="admin", password_hash=generate_password_hash("admin"), role=UserRole.admin, is_active=True,
+        )).inserted_primary_key[0]
+    engine.dispose()
+    return admin_id
+
+
+def _count_assets(path: Path) -> tuple[int, str]:
+    """Число техники и режим журнала БД."""
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.connect() as conn:
+        count = conn.execute(select(func.count(Asset.id))).scalar()
+        journal_mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+    engine.dispose()
+    return count, journal_mode
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Сервер с двумя воркерами на временной БД: (base_url, cookies, путь к БД)."""
+    db_path = tmp_path / "multi.db"
+    admin_id = _prepare_db(db_path)
+    port = _free_port()
+    env = {**os.environ, "DATABASE_URL": f"sqlite+aiosqlite:///{db_path}", "UVICORN_WORKERS": "2"}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--workers", "2"],
+        cwd=PROJECT_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                if httpx.get(f"{base_url}/login").status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline or proc.poll() is not None:
+                pytest.fail("Сервер с несколькими воркерами не запустился")
+            time.sleep(0.2)
+        yield base_url, {SESSION_COOKIE_NAME: create_session_token(admin_id)}, db_path
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="несколько воркеров uvicorn — только на POSIX")
+def test_concurrent_writes_with_two_workers(server):
+    base_url, cookies, db_path = server
+
+    async def run() -> list[int]:
+        # Отдельное соединение на запрос — запросы распределяются между воркерами
+        limits = httpx.Limits(max_keepalive_connections=0)
+        async with httpx.AsyncClient(base_url=base_url, cookies=cookies, timeout=60, limits=limits) as client:
+            writes = [
+                client.post("/assets/create", data={"name": f"Воркер {i}", "serial_number": f"MW-{i}"})
+                for i in range(WRITES)
+            ]
+            reads = [client.get("/assets") for _ in range(WRITES // 2)]
+            responses = await asyncio.gather(*writes, *reads)
+        return [r.status_code for r in responses]
+
+    statuses = asyncio.run(run())
+    assert all(code < 500 for code in statuses), statuses
+    assert statuses[:WRITES] == [302] * WRITES
+    assert _count_assets(db_path) == (WRITES, "wal")
+
+    # Каждый воркер сбрасывает метрики раз в FLUSH_INTERVAL; /metrics суммирует их
+    pattern = re.compile(r'http_request_duration_seconds_count\{method="POST",route="/assets/create"\} (\d+)')
+    deadline = time.monotonic() + 20
+    total = 0
+    while time.monotonic() < deadline:
+        match = pattern.search(httpx.get(f"{base_url}/metrics", cookies=cookies).text)
+        total = int(match.group(1)) if match else 0
+        if total == WRITES:
+            break
+        time.sleep(1)
+    assert total == WRITES
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="несколько воркеров uvicorn — только на POSIX")
+def test_restore_and_drop_refused_with_several_workers(server):
+    """Подмена файла БД закрыла бы соединения только одного воркера — при двух воркерах она запрещена."""
+    base_url, cookies, db_path = server
+    with httpx.Client(base_url=base_url, cookies=cookies, timeout=30) as client:
+        assert client.post("/assets/create", data={"name": "До очистки"}).status_code == 302
+        assert client.post("/admin/backups/drop", data={"confirm": "yes"}).status_code == 409
+        r = client.post(
+            "/admin/backups/upload-restore", data={"confirm": "yes"},
+            files={"file": ("backup.zip", b"PK\x05\x06" + b"\x00" * 18, "application/zip")},
+        )
+        assert r.status_code == 409
+    assert _count_assets(db_path) == (1, "wal")
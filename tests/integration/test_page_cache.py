@@ -0,0 +1,68 @@
+"""
+Интеграционные тесты: HTTP-кэширование страниц по версии данных (ETag, 304).
+"""
+import pytest
+from httpx import AsyncClient
+
+from app.models import Company
+
+
+@pytest.mark.asyncio
+async def test_assets_list_304_until_data_changes(client: AsyncClient, query_budget):
+    """Повтор с If-None-Match даёт 304 без запросов списка; после создания техники — новая страница."""
+    r = await client.get("/assets", params={"status": "active"})
+    assert r.status_code == 200
+    etag = r.headers["etag"]
+    assert r.headers["cache-control"] == "private, no-cache"
+
+    with query_budget(2):  # пользователь сессии и версия данных
+        r304 = await client.get("/assets", params={"status": "active"}, headers={"If-None-Match": etag})
+    assert r304.status_code == 304
+    assert r304.content == b""
+
+    other = await client.get("/assets", params={"status": "retired"})
+    assert other.headers["etag"] != etag
+
+    created = await client.post("/assets/create", data={"name": "Кэш ETag"})
+    assert created.status_code == 302
+    r2 = await client.get("/assets", params={"status": "active"}, headers={"If-None-Match": etag})
+    assert r2.status_code == 200
+    assert "Кэш ETag" in r2.text
+    assert r2.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_company_page_version_is_per_company(client: AsyncClient, db_commit):
+    """Изменения техники другой организации не сбрасывают кэш страницы организации."""
+    first, second = Company(name="Кэш-орг 1"), Company(name="Кэш-орг 2")
+    db_commit.add_all([first, second])
+    await db_commit.commit()
+    r = await client.get(f"/companies/{first.id}")
+    etag, last_modified = r.headers["etag"], r.headers["last-modified"]
+
+    await client.post("/assets/create", data={"name": "Чужая техника", "company_id": str(second.id)})
+    assert (await client.get(f"/companies/{first.id}", headers={"If-None-Match": etag})).status_code == 304
+    assert (await client.get(f"/companies/{first.id}", headers={"If-Modified-Since": last_modified})).status_code == 304
+
+    await client.post("/assets/create", data={"name": "Своя техника", "company_id": str(first.id)})
+    r2 = await client.get(f"/companies/{first.id}", headers={"If-None-Match": etag})
+    assert r2.status_code == 200
+    assert r2.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_assets_table_fragment_reused_without_list_query(client: AsyncClient, db_commit, query_budget):
+    """Повторная отрисовка списка без If-None-Match берёт таблицу из кэша фрагментов."""
+    from app.utils.fragment_cache import fragment_cache
+    db_commit.add(Company(name="Фрагмент-орг"))
+    await db_commit.commit()
+    fragment_cache.clear()
+    with query_budget(10) as first_trace:
+        first = await client.get("/assets", params={"location": "Фрагменты"})
+    with query_budget(10) as second_trace:
+        second = await client.get("/assets", params={"location": "Фрагменты"})
+    assert second.status_code == 200
+    assert fragment_cache.hits == 1
+    # Запрос списка техники (с загрузкой организаций) во второй раз не выполняется
+    assert second_trace.count < first_trace.count
+    assert first.text == second.text
@@ -0,0 +1,70 @@
+"""
+Интеграционные тесты: QR-коды на лету (ETag, 304) и листы QR-этикеток (PDF).
+"""
+import pytest
+from httpx import AsyncClient
+
+from app.models import Asset
+from app.models.asset import AssetStatus
+from app.services import attachments_service
+
+
+@pytest.mark.asyncio
+async def test_qr_labels_pdf_for_filter(client: AsyncClient, db_commit):
+    """Для результата фильтра по расположению отдаётся PDF с этикетками."""
+    db_commit.add(Asset(name="Ноутбук для этикетки", serial_number="SN-LABEL-1", status=AssetStatus.active, location="Этикетки-1"))
+    await db_commit.commit()
+    r = await client.get("/qr/labels.pdf", params={"location": "Этикетки-1"})
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/pdf"
+    assert r.content.startswith(b"%PDF")
+
+
+@pytest.mark.asyncio
+async def test_qr_image_rendered_on_the_fly_with_etag(client: AsyncClient, db_commit):
+    """QR рендерится без предварительной генерации; повтор с If-None-Match даёт 304."""
+    asset = Asset(name="QR on the fly", status=AssetStatus.active)
+    db_commit.add(asset)
+    await db_commit.commit()
+    r = await client.get(f"/assets/{asset.id}/qr-image")
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "image/png"
+    assert "immutable" in r.headers["cache-control"]
+    etag = r.headers["etag"]
+
+    r304 = await client.get(f"/assets/{asset.id}/qr-image", headers={"If-None-Match": etag})
+    assert r304.status_code == 304
+    assert r304.content == b""
+
+    svg = await client.get(f"/assets/{asset.id}/qr-image", params={"format": "svg"})
+    assert svg.status_code == 200
+    assert svg.headers["content-type"].startswith("image/svg+xml")
+    assert svg.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_gzipped_svg_qr_revalidates_with_weak_etag(client: AsyncClient, db_commit):
+    """Сжатый SVG отдаётся со слабым ETag; повтор с ним же даёт 304."""
+    asset = Asset(name="QR gzip", status=AssetStatus.active)
+    db_commit.add(asset)
+    await db_commit.commit()
+    url = f"/assets/{asset.id}/qr-image"
+    r = await client.get(url, params={"format": "svg"}, headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    etag = r.headers["etag"]
+    assert etag.startswith("W/")
+
+    r304 = await client.get(
+        url, params={"format": "svg"}, headers={"Accept-Encoding": "gzip", "If-None-Match": etag},
+    )
+    assert r304.status_code == 304
+
+
+def test_render_qr_is_cached():
+    """Повторный рендер той же ссылки берётся из LRU-кэша."""
+    attachments_service.render_qr.cache_clear()
+    first = attachments_service.render_qr("http://test/assets/1", "png")
+    second = attachments_service.render_qr("http://test/assets/1", "png")
+    assert first is second
+    assert attachments_service.render_qr.cache_info().hits == 1
@@ -0,0 +1,39 @@
+"""
+Интеграционные тесты: бюджет SQL-запросов страниц (число запросов не растёт с числом строк).
+"""
+import pytest
+from httpx import AsyncClient
+
+from app.models import Asset, Company
+from app.models.asset import AssetStatus
+
+
+@pytest.mark.asyncio
+async def test_assets_list_query_budget(client: AsyncClient, db_commit, query_budget):
+    """Список оборудования с организациями выполняется фиксированным числом запросов, без N+1."""
+    companies = [Company(name=f"Бюджет-орг {i}") for i in range(5)]
+    db_commit.add_all(companies)
+    await db_commit.flush()
+    db_commit.add_all(
+        Asset(name=f"Бюджет {i}", status=AssetStatus.active, company_id=companies[i % 5].id, location="Бюджет")
+        for i in range(30)
+    )
+    await db_commit.commit()
+    with query_budget(10) as trace:
+        r = await client.get("/assets", params={"location": "Бюджет"})
+    assert r.status_code == 200
+    assert trace.count > 0
+
+
+@pytest.mark.asyncio
+async def test_query_budget_detects_repeated_statements(db):
+    """Один и тот же запрос в цикле распознаётся как N+1."""
+    from app.query_profiler import trace_queries
+    from app.repositories import reference_repo
+    with trace_queries() as trace:
+        for name in ("a", "b", "c", "d"):
+            await reference_repo.find_company_by_name(db, name)
+    repeated = trace.repeated(3)
+    assert len(repeated) == 1
+    assert repeated[0][1] == 4
+    assert "tests/" not in repeated[0][2] and repeated[0][2].startswith("app/repositories/reference_repo.py")
@@ -0,0 +1,191 @@
+"""
+Unit-тесты: инкрементальные бекапы (хранилище объектов по хешу, манифесты, восстановление).
+"""
+import sqlite3
+
+import pytest
+from alembic.script import ScriptDirectory
+
+from app.services import backup
+
+
+def _app_schema(conn, revision: str | None = None) -> None:
+    """Минимум, по которому восстановление узнаёт БД приложения: alembic_version, assets, users."""
+    revision = revision or ScriptDirectory(str(backup.BASE_DIR / "alembic")).get_current_head()
+    conn.execute("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL PRIMARY KEY)")
+    conn.execute("INSERT INTO alembic_version VALUES (?)", (revision,))
+    conn.execute("CREATE TABLE assets (id INTEGER PRIMARY KEY)")
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY)")
+
+
+@pytest.fixture
+def backup_env(tmp_path, monkeypatch):
+    """Отдельные БД, папка аватарок и папка бекапов во временном каталоге."""
+    db_path = tmp_path / "app.db"
+    conn = sqlite3.connect(db_path)
+    _app_schema(conn)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+    conn.executemany("INSERT INTO t (v) VALUES (?)", [(f"row {i}",) for i in range(1000)])
+    conn.commit()
+    conn.close()
+    avatars = tmp_path / "avatars"
+    avatars.mkdir()
+    (avatars / "a.png").write_bytes(b"avatar-a")
+    monkeypatch.setattr(backup, "DB_PATH", db_path)
+    monkeypatch.setattr(backup, "AVATAR_DIR", avatars)
+    monkeypatch.setattr(backup, "BACKUP_DIR", tmp_path / "backups")
+    return db_path, avatars
+
+
+def test_incremental_backup_stores_only_changes_and_restores(backup_env):
+    """Повторный бекап без изменений не пишет новых объектов; восстановление возвращает данные."""
+    db_path, avatars = backup_env
+    first = backup.create_incremental_backup()
+    assert first["new_objects"] > 0
+    second = backup.create_incremental_backup()
+    assert second["new_objects"] == 0
+    assert second["stored_bytes"] == 0
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM t")
+    conn.commit()
+    conn.close()
+    (avatars / "a.png").write_bytes(b"changed")
+
+    backup.restore_backup(first["name"])
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1000
+    conn.close()
+    assert (avatars / "a.png").read_bytes() == b"avatar-a"
+    assert second["name"] != first["name"]
+    assert sum(b["incremental"] for b in backup.list_backups()) == 2
+
+
+def test_restore_rejects_corrupted_db_and_keeps_current(backup_env, tmp_path):
+    """Бекап с повреждённой БД не применяется: рабочий файл БД остаётся прежним."""
+    import zipfile
+    db_path, _ = backup_env
+    backup.BACKUP_DIR.mkdir()
+    with zipfile.ZipFile(backup.BACKUP_DIR / "backup_broken.zip", "w") as zf:
+        zf.writestr("app.db", b"SQLite format 3\x00" + b"\x00" * 100)
+    before = db_path.read_bytes()
+    with pytest.raises(ValueError):
+        backup.restore_backup("backup_broken.zip")
+    assert db_path.read_bytes() == before
+    assert not list(db_path.parent.glob(".restore_*"))
+
+
+def test_delete_backup_collects_unreferenced_objects(backup_env):
+    """Удаление манифеста убирает объекты, на которые больше никто не ссылается; список обновляется."""
+    _, avatars = backup_env
+    first = backup.create_incremental_backup()
+    (avatars / "a.png").write_bytes(b"avatar-b")
+    second = backup.create_incremental_backup()
+    assert second["new_objects"] == 1
+    assert len(backup.list_backups()) == 2
+
+    backup.delete_backups([first["name"]])
+    assert [b["name"] for b in backup.list_backups()] == [second["name"]]
+    objects = list((backup.BACKUP_DIR / "objects").glob("*/*"))
+    assert len(objects) == second["new_objects"] + first["new_objects"] - 1
+    backup.restore_backup(second["name"])
+    assert (avatars / "a.png").read_bytes() == b"avatar-b"
+
+
+def test_delete_and_gc_refuse_while_backup_runs(backup_env):
+    """Пока держится блокировка бекапа, удаление и сборка мусора объектов не выполняются."""
+    first = backup.create_incremental_backup()
+    assert backup.backup_lock.acquire()
+    try:
+        with pytest.raises(backup.BackupBusyError):
+            backup.delete_backups([first["name"]])
+        with pytest.raises(backup.BackupBusyError):
+            backup.collect_garbage()
+        # Владелец блокировки (плановый бекап с ретенцией) удаляет под ней
+        assert backup.collect_garbage(lock_held=True) == 0
+    finally:
+        backup.backup_lock.release()
+    assert [b["name"] for b in backup.list_backups()] == [first["name"]]
+
+
+def test_retention_prunes_only_scheduled_backups(backup_env, monkeypatch):
+    """Ретенция удаляет лишние плановые бекапы; ручной бекап того же дня остаётся."""
+    import os
+    from app.services import backup_scheduler
+    monkeypatch.setattr(backup_scheduler, "BACKUP_KEEP_DAILY", 1)
+    monkeypatch.setattr(backup_scheduler, "BACKUP_KEEP_WEEKLY", 0)
+    monkeypatch.setattr(backup_scheduler, "BACKUP_KEEP_MONTHLY", 0)
+    manual = backup.create_incremental_backup()["name"]
+    old_auto = backup.create_incremental_backup(scheduled=True)["name"]
+    new_auto = backup.create_incremental_backup(scheduled=True)["name"]
+    assert old_auto.startswith(backup.SCHEDULED_PREFIX) and not manual.startswith(backup.SCHEDULED_PREFIX)
+    now = os.stat(backup.BACKUP_DIR / new_auto).st_mtime
+    for offset, name in ((-120, manual), (-60, old_auto)):
+        os.utime(backup.BACKUP_DIR / name, (now + offset, now + offset))
+    # Бекапы того же дня: из плановых остаётся самый свежий, ручной не участвует
+    assert backup_scheduler.apply_retention() == [old_auto]
+    assert {b["name"] for b in backup.list_backups()} == {manual, new_auto}
+
+
+def _zip_with_db(tmp_path, fill):
+    import zipfile
+    db_file = tmp_path / "other.db"
+    conn = sqlite3.connect(db_file)
+    fill(conn)
+    conn.commit()
+    conn.close()
+    archive = tmp_path / "upload.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.write(db_file, "app.db")
+    return archive
+
+
+def test_restore_rejects_foreign_or_newer_database(backup_env, tmp_path):
+    """Целая, но чужая БД или БД новее кода не подменяет рабочую."""
+    def foreign(conn):
+        conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY)")
+
+    with pytest.raises(ValueError, match="нет таблиц"):
+        backup.stage_restore_from_zip(_zip_with_db(tmp_path, foreign))
+    with pytest.raises(ValueError, match="новее"):
+        backup.stage_restore_from_zip(_zip_with_db(tmp_path, lambda conn: _app_schema(conn, "999")))
+    assert not list(tmp_path.glob(".restore_*"))
+
+
+def test_restore_limits_unpacked_size(backup_env, tmp_path, monkeypatch):
+    """Архив, распаковка которого больше MAX_RESTORE_UNPACKED_MB, отклоняется."""
+    import zipfile
+    monkeypatch.setattr(backup, "MAX_RESTORE_UNPACKED_MB", 1)
+    archive = tmp_path / "bomb.zip"
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("avatars/big.png", b"\0" * (2 * 1024 * 1024))
+    assert archive.stat().st_size < 64 * 1024
+    with pytest.raises(ValueError, match="больше 1 МБ"):
+        backup.stage_restore_from_zip(archive)
+    assert not list(tmp_path.glob(".restore_*"))
+
+
+def test_streamed_zip_restores_via_staging(backup_env, tmp_path):
+    """Zip, сгенерированный на лету, распаковывается по записям; посторонние пути игнорируются."""
+    import io
+    import zipfile
+    db_path, avatars = backup_env
+    data = b"".join(backup.iter_backup_zip())
+    assert not backup.BACKUP_DIR.exists() or not list(backup.BACKUP_DIR.glob("backup_*"))
+    buf = io.BytesIO(data)
+    with zipfile.ZipFile(buf, "a") as zf:
+        assert sorted(zf.namelist()) == ["app.db", "avatars/a.png"]
+        zf.writestr("avatars/../../evil.txt", b"x")
+    upload = backup.new_upload_path()
+    upload.write_bytes(buf.getvalue())
+    try:
+        staging = backup.stage_restore_from_zip(upload)
+    finally:
+        upload.unlink()
+    (avatars / "a.png").write_bytes(b"changed")
+    backup.apply_restore(staging)
+    assert (avatars / "a.png").read_bytes() == b"avatar-a"
+    assert not (tmp_path / "evil.txt").exists()
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1000
+    conn.close()
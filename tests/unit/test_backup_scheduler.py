@@ -0,0 +1,77 @@
+"""
+Unit-тесты: разбор cron-расписания бекапов и GFS-ретенция.
+"""
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services import backup_scheduler
+from app.services.backup_scheduler import parse_cron, select_backups_to_keep
+
+
+def test_cron_next_run():
+    """Следующий запуск: каждый день в 3:00 и по будням каждые 15 минут в рабочие часы."""
+    daily = parse_cron("0 3 * * *")
+    assert daily.next_run(datetime(2026, 3, 1, 3, 0)) == datetime(2026, 3, 2, 3, 0)
+    assert daily.next_run(datetime(2026, 3, 1, 2, 59, 30)) == datetime(2026, 3, 1, 3, 0)
+    workdays = parse_cron("*/15 9-18 * * 1-5")
+    # 2026-03-07 — суббота
+    assert workdays.next_run(datetime(2026, 3, 6, 18, 50)) == datetime(2026, 3, 9, 9, 0)
+    with pytest.raises(ValueError):
+        parse_cron("61 * * * *")
+    with pytest.raises(ValueError):
+        parse_cron("* * *")
+    # 31 февраля не бывает: ошибка при разборе, а не в работающем планировщике
+    with pytest.raises(ValueError, match="никогда не срабатывает"):
+        parse_cron("0 0 31 2 *")
+
+
+def test_scheduler_start_fails_on_never_firing_schedule(monkeypatch):
+    monkeypatch.setattr(backup_scheduler, "BACKUP_SCHEDULE", "0 0 30 2 *")
+    with pytest.raises(ValueError):
+        backup_scheduler.start_backup_scheduler()
+
+
+def test_gfs_retention_keeps_daily_weekly_monthly():
+    """По два бекапа в день за 90 дней: остаётся по одному на день/неделю/месяц в пределах лимитов."""
+    start = datetime(2026, 1, 1, 3, 0)
+    backups = []
+    for i in range(180):
+        created = start + timedelta(hours=12 * i)
+        backups.append((f"b{i}", created))
+    keep = select_backups_to_keep(backups, daily=7, weekly=4, monthly=3)
+    assert "b179" in keep
+    kept = sorted((created for name, created in backups if name in keep), reverse=True)
+    # 7 дней + до 4 недель + до 3 месяцев, с пересечениями
+    assert 7 <= len(kept) <= 14
+    assert len({c.date() for c in kept}) == len(kept)
+    assert min(kept).month == 1
+    assert select_backups_to_keep([], 7, 4, 12) == set()
+
+
+@pytest.mark.asyncio
+async def test_backups_do_not_run_concurrently_in_one_worker(monkeypatch):
+    """Пока идёт бекап, второй (ручной или плановый) в том же процессе не запускается."""
+    started, release, calls = threading.Event(), threading.Event(), []
+
+    def slow_backup(kind, scheduled=False):
+        calls.append(kind)
+        started.set()
+        release.wait(5)
+        return f"backup-{kind}"
+
+    monkeypatch.setattr(backup_scheduler, "_run_backup", slow_backup)
+    monkeypatch.setattr(backup_scheduler, "_write_status", lambda **fields: None)
+    first = asyncio.create_task(backup_scheduler.run_backup("incremental"))
+    try:
+        assert await asyncio.to_thread(started.wait, 5)
+        assert backup_scheduler.is_backup_running()
+        assert await backup_scheduler.run_backup("full") is None
+        assert not backup_scheduler.run_backup_in_background("full")
+    finally:
+        release.set()
+    assert await first == "backup-incremental"
+    assert calls == ["incremental"]
+    assert not backup_scheduler.is_backup_running()
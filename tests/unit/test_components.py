@@ -0,0 +1,26 @@
+"""
+Unit-тесты: строки asset_components из JSON extra_components.
+"""
+import json
+
+from app.utils.components import component_rows, component_rows_for
+
+
+def test_component_rows():
+    raw = json.dumps([{"type": "ram", "name": " 8 ГБ "}, "мусор", {"name": "Без типа"}, {"type": "disk"}])
+    assert component_rows(raw) == [
+        {"position": 0, "type": "ram", "name": "8 ГБ"},
+        {"position": 1, "type": "other", "name": "Без типа"},
+        {"position": 2, "type": "disk", "name": None},
+    ]
+    assert component_rows("не JSON") == []
+    assert component_rows(None) == []
+
+
+def test_component_rows_for_only_on_change():
+    class Current:
+        extra_components = '[{"type": "ram"}]'
+
+    assert component_rows_for({"name": "x"}, Current()) is None
+    assert component_rows_for({"extra_components": '[{"type": "ram"}]'}, Current()) is None
+    assert component_rows_for({"extra_components": None}, Current()) == []
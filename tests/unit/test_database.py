@@ -0,0 +1,30 @@
+"""
+Unit-тесты: освобождение БД на время обслуживания (drained_connections) учитывает сессии самого запроса.
+"""
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app import database
+from app.database import drained_connections, get_db
+
+
+@pytest.mark.asyncio
+async def test_drain_does_not_wait_for_own_request_sessions():
+    """Запрос с сессией get_db (в т.ч. через зависимость авторизации) не ждёт сам себя."""
+    app = FastAPI()
+
+    async def auth(db=Depends(get_db)):
+        return db
+
+    @app.post("/maintenance")
+    async def maintenance(db=Depends(get_db), _=Depends(auth)):
+        await db.close()
+        async with drained_connections(timeout=1):
+            return {"own": database._request_sessions.get(), "active": database._active_sessions}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        r = await client.post("/maintenance")
+    assert r.status_code == 200
+    assert r.json() == {"own": 1, "active": 1}
+    assert database._active_sessions == 0
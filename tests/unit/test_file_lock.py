@@ -0,0 +1,25 @@
+"""
+Модульные тесты: межпроцессная блокировка на файле (выбор одного воркера).
+"""
+import sys
+
+import pytest
+
+from app.utils.file_lock import FileLock
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="flock недоступен на Windows")
+def test_file_lock_is_exclusive():
+    """Вторая блокировка с тем же именем не берётся, пока первая не освобождена."""
+    first, second = FileLock("test-exclusive"), FileLock("test-exclusive")
+    assert first.acquire()
+    try:
+        assert not first.acquire()  # не реентерабельна: повторно не берётся и своим владельцем
+        assert first.held
+        assert not second.acquire()
+        assert not second.held
+    finally:
+        first.release()
+    with second as acquired:
+        assert acquired
+    assert not second.held
@@ -0,0 +1,27 @@
+"""
+Модульные тесты: LRU-кэш отрендеренных фрагментов с ограничением по объёму.
+"""
+from app.utils.fragment_cache import FragmentCache
+
+
+def test_fragment_cache_evicts_least_recently_used():
+    """При превышении объёма вытесняется давно не использованный фрагмент."""
+    cache = FragmentCache(max_bytes=10)
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    assert cache.get("a") == "aaaa"  # «a» становится самым свежим
+    cache.put("c", "cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa" and cache.get("c") == "cccc"
+    assert cache.size == 8
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_fragment_cache_skips_oversized_fragment():
+    """Фрагмент больше всего кэша не сохраняется и не вытесняет остальные."""
+    cache = FragmentCache(max_bytes=10)
+    cache.put("a", "aaaa")
+    html = cache.put("big", "x" * 11)
+    assert html == "x" * 11
+    assert cache.get("big") is None
+    assert cache.get("a") == "aaaa"
@@ -0,0 +1,113 @@
+"""
+Unit-тесты: источники строк импорта (CSV, ODS, NDJSON) дают одинаковые строки после нормализации.
+"""
+import io
+import json
+import zipfile
+from datetime import date
+
+from app.models.asset import AssetStatus
+from app.services.import_sources import parse_import_file, parse_import_sheet, sheet_names
+
+EXPECTED = {
+    "row_number": 2,
+    "name": "ПК бухгалтерии",
+    "serial_number": "SRC-1",
+    "status": AssetStatus.maintenance,
+    "rack_units": 2,
+    "manufacture_date": date(2021, 3, 15),
+    "issues": [],
+}
+
+
+def _ods(rows: list[list]) -> bytes:
+    def cell(value):
+        if value is None:
+            return '<table:table-cell table:number-columns-repeated="1020"/>'
+        return f'<table:table-cell office:value-type="string"><text:p>{value}</text:p></table:table-cell>'
+
+    body = "".join(f"<table:table-row>{''.join(cell(v) for v in row)}</table:table-row>" for row in rows)
+    xml = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<office:document-content xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0"'
+        ' xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0"'
+        ' xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0">'
+        f'<office:body><office:spreadsheet><table:table table:name="Лист1">{body}'
+        '<table:table-row table:number-rows-repeated="1048000"><table:table-cell/></table:table-row>'
+        '</table:table><table:table table:name="Лист2"><table:table-row>'
+        '<table:table-cell office:value-type="string"><text:p>Название</text:p></table:table-cell>'
+        '</table:table-row></table:table></office:spreadsheet></office:body></office:document-content>'
+    )
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("mimetype", "application/vnd.oasis.opendocument.spreadsheet")
+        zf.writestr("content.xml", xml)
+    return buf.getvalue()
+
+
+def test_csv_cp1251_semicolon():
+    content = "Наименование;S/N;Статус;Юниты;Дата производства\r\nПК бухгалтерии;SRC-1;на обслуживании;2;15.03.2021\r\n"
+    rows, errors = parse_import_file("branch.csv", content.encode("cp1251"))
+    assert errors == []
+    assert rows == [EXPECTED]
+
+
+def test_csv_utf8_bom_comma_quoted():
+    content = '\ufeffНазвание,Серийный номер,Статус,Юниты (U),Дата выпуска,Описание\n' \
+              'ПК бухгалтерии,SRC-1,maintenance,2,2021-03-15,"каб. 5, стол 2"\n'
+    rows, errors = parse_import_file("export.CSV", content.encode("utf-8"))
+    assert errors == []
+    assert rows[0]["description"] == "каб. 5, стол 2"
+    assert {k: v for k, v in rows[0].items() if k != "description"} == EXPECTED
+
+
+def test_ods_first_sheet():
+    content = _ods([
+        ["Название", "Серийный номер", "Статус", "Юниты (U)", "Дата выпуска", "Модель", None],
+        ["ПК бухгалтерии", "SRC-1", "на обслуживании", "2", "2021-03-15", None],
+    ])
+    rows, errors = parse_import_file("site.ods", content)
+    assert errors == []
+    # Хвост пустых ячеек — пустые значения, а не отсутствующий столбец
+    assert rows == [{**EXPECTED, "model": None}]
+    assert sheet_names("site.ods", content) == ["Лист1", "Лист2"]
+    assert parse_import_sheet("site.ods", content, "Лист2") == ([], [])
+    assert parse_import_sheet("site.ods", content, "Лист3") == ([], ["В файле нет листа «Лист3»."])
+
+
+def test_unknown_sheet_is_an_error():
+    """Неизвестный лист книги — ошибка, а не молчаливый импорт активного листа."""
+    from openpyxl import Workbook
+    wb = Workbook()
+    wb.active.title = "Склад"
+    wb.active.append(["Название", "Серийный номер"])
+    wb.active.append(["ПК бухгалтерии", "SRC-1"])
+    buf = io.BytesIO()
+    wb.save(buf)
+    content = buf.getvalue()
+    assert parse_import_sheet("book.xlsx", content, "Склад")[0][0]["serial_number"] == "SRC-1"
+    assert parse_import_sheet("book.xlsx", content, "Офис") == ([], ["В файле нет листа «Офис»."])
+
+
+def test_ndjson_field_names_and_aliases():
+    lines = [
+        {"name": "ПК бухгалтерии", "serial_number": "SRC-1", "Статус": "на обслуживании",
+         "rack_units": 2, "manufacture_date": "2021-03-15"},
+        {},
+        {"name": "Без статуса", "status": "сломан"},
+    ]
+    content = "\n".join(json.dumps(x, ensure_ascii=False) for x in lines).encode("utf-8")
+    rows, errors = parse_import_file("agent.ndjson", content)
+    assert errors == []
+    assert rows[0] == {**EXPECTED, "row_number": 1}
+    assert rows[1]["issues"] == ["Статус «сломан» не распознано"]
+
+    _, errors = parse_import_file("agent.jsonl", b'{"name": "x"}\n[1, 2]\n')
+    assert errors == ["Строка 2: ожидается JSON-объект"]
+
+
+def test_unsupported_and_headerless():
+    assert parse_import_file("list.txt", b"x")[1] == ["Поддерживаются файлы: .xlsx, .ods, .csv, .ndjson, .jsonl"]
+    assert parse_import_file("empty.csv", b"")[1] == ["Не найдена строка заголовков (первая строка)."]
+    _, errors = parse_import_file("noname.csv", "Модель;S/N\nX;1\n".encode("utf-8"))
+    assert "«Название» не найден" in errors[0]
@@ -0,0 +1,45 @@
+"""
+Unit-тесты: адреса для asset_ip_addresses из network_interfaces / network_card и диапазоны поиска.
+"""
+import json
+
+from app.utils.ip_addresses import asset_ip_rows, ip_range, ip_rows_for
+
+
+def test_asset_ip_rows_sources_and_dedup():
+    interfaces = json.dumps([
+        {"label": "eth0", "type": "network", "ip": " 10.2.3.4 "},
+        {"label": "iLO", "type": "oob", "ip": "2001:DB8::1"},
+        {"label": "eth1", "type": "network", "ip": "10.2.3.4"},
+        {"label": "пусто", "ip": ""},
+    ])
+    rows = asset_ip_rows(interfaces, "Realtek, 192.168.0.5; 10.2.3.4")
+    assert [(r["ip"], r["label"], r["type"]) for r in rows] == [
+        ("10.2.3.4", "eth0", "network"),
+        ("2001:db8::1", "iLO", "oob"),
+        ("192.168.0.5", "IP адрес", "network"),
+    ]
+    assert all(len(r["ip_bin"]) == 16 for r in rows)
+    assert asset_ip_rows("не JSON", None) == []
+
+
+def test_ip_range_and_order():
+    low, high = ip_range("10.2.0.0/16")
+    exact = ip_range("10.2.3.4")[0]
+    assert low <= exact <= high
+    assert ip_range("10.3.0.1")[0] > high
+    # IPv4 и IPv6 в одном пространстве ключей, но не пересекаются
+    assert not (low <= ip_range("::a02:304")[0] <= high)
+    assert ip_range("10.2.3.4/33") is None
+    assert ip_range("абв") is None
+
+
+def test_ip_rows_for_only_on_change():
+    class Current:
+        network_interfaces = None
+        network_card = "10.0.0.1"
+
+    assert ip_rows_for({"name": "x"}, Current()) is None
+    assert ip_rows_for({"network_card": "10.0.0.1"}, Current()) is None
+    assert [r["ip"] for r in ip_rows_for({"network_card": "10.0.0.2"}, Current())] == ["10.0.0.2"]
+    assert ip_rows_for({"network_card": None}, Current()) == []
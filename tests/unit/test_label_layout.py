@@ -0,0 +1,32 @@
+"""
+Тесты раскладки листа QR-этикеток: перенос текста и проверка сетки.
+"""
+import pytest
+from PIL import Image, ImageDraw
+
+from app.services.attachments_service import _load_font, _wrap_text, label_layout
+
+
+def test_wrap_text_terminates_when_column_narrower_than_ellipsis():
+    """Колонка уже «…»: перенос не зацикливается, строки сокращаются до многоточия."""
+    draw = ImageDraw.Draw(Image.new("1", (10, 10), 1))
+    font = _load_font(20)
+    for width in (0, 1, int(draw.textlength("…", font=font))):
+        lines = _wrap_text(draw, "Очень длинное название ноутбука", font, width, 4)
+        assert lines and all(line == "…" for line in lines)
+
+
+def test_wrap_text_fits_lines_into_width():
+    draw = ImageDraw.Draw(Image.new("1", (10, 10), 1))
+    font = _load_font(20)
+    lines = _wrap_text(draw, "Ноутбук Lenovo ThinkPad T14 Gen 3", font, 120, 2)
+    assert len(lines) == 2
+    assert all(draw.textlength(line, font=font) <= 120 for line in lines)
+
+
+def test_label_layout_rejects_grid_without_text_column():
+    assert label_layout(3, 7)[3] > 0
+    with pytest.raises(ValueError):
+        label_layout(3, 1)
+    with pytest.raises(ValueError):
+        label_layout(0, 7)
@@ -0,0 +1,47 @@
+"""
+Unit-тесты: числовые значения характеристик из свободного текста (app.utils.specs).
+"""
+import pytest
+
+from app.utils.specs import parse_diagonal_in, parse_disk_gb, parse_ram_mb, spec_numbers
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("8 ГБ", 8192),
+    ("16GB DDR4", 16384),
+    ("DDR4 16GB", 16384),
+    ("2x8 Гб", 16384),
+    ("512 МБ", 512),
+    ("32", 32768),
+    ("4096", 4096),
+    ("", None),
+    ("нет", None),
+])
+def test_parse_ram_mb(text, expected):
+    assert parse_ram_mb(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("512GB SSD", 512),
+    ("1 ТБ", 1000),
+    ("1,5TB HDD", 1500),
+    ("256", 256),
+    (None, None),
+])
+def test_parse_disk_gb(text, expected):
+    assert parse_disk_gb(text) == expected
+
+
+def test_parse_diagonal_and_spec_numbers():
+    assert parse_diagonal_in('23,8"') == 23.8
+    assert parse_diagonal_in("15.6 дюйма") == 15.6
+    assert parse_diagonal_in("1920x1080") is None
+
+    # Только изменяемые поля; диагональ монитора — если у экрана её нет
+    assert spec_numbers({"ram": "8 ГБ"}) == {"ram_mb": 8192}
+
+    class Current:
+        screen_diagonal = None
+        monitor_diagonal = "27"
+
+    assert spec_numbers({"screen_diagonal": ""}, Current()) == {"diagonal_in": 27.0}